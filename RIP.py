@@ -8,6 +8,7 @@ class Router:
     def __init__(self, name):
         self.name = name
         self.routing_table = {name: {"cost": 0, "next_hop": name}}  # Initial routing table
+        self.route_changes = 0
 
     def update_routing_table(self, neighbor_table, neighbor, link_cost):
         updated = False
@@ -15,6 +16,7 @@ class Router:
             new_cost = info["cost"] + link_cost
             if dest not in self.routing_table or new_cost < self.routing_table[dest]["cost"]:
                 self.routing_table[dest] = {"cost": new_cost, "next_hop": neighbor}
+                self.route_changes += 1
                 updated = True
         return updated
 
@@ -30,18 +32,62 @@ class Network:
         self.links.setdefault(router1, {})[router2] = cost
         self.links.setdefault(router2, {})[router1] = cost
 
+    def run_round(self):
+        """Exchange tables over every link once; return (updated, messages sent)"""
+        updated = False
+        messages = 0
+        for router_name, router in self.routers.items():
+            for neighbor, cost in self.links.get(router_name, {}).items():
+                neighbor_table = self.routers[neighbor].routing_table
+                messages += 1
+                if router.update_routing_table(neighbor_table, neighbor, cost):
+                    updated = True
+        return updated, messages
+
     def simulate_rip(self, update_ui):
         converged = False
         while not converged:
-            converged = True
-            for router_name, router in self.routers.items():
-                for neighbor, cost in self.links.get(router_name, {}).items():
-                    neighbor_table = self.routers[neighbor].routing_table
-                    if router.update_routing_table(neighbor_table, neighbor, cost):
-                        converged = False
+            updated, _ = self.run_round()
+            converged = not updated
             update_ui()  # Update the UI with the latest routing tables
             time.sleep(1)  # Simulate periodic updates
 
+    def run_until_converged(self, max_rounds=None):
+        """
+        Run rounds back to back, without the UI or sleeping, until nothing changes
+
+        Returns a dict with rounds, messages, route_changes, entries_processed,
+        wall_time, peak_table_size and converged, matching core.stats.ConvergenceStats.
+        """
+        stats = {
+            "rounds": 0, "messages": 0, "route_changes": 0, "entries_processed": 0,
+            "wall_time": 0.0, "peak_table_size": 0, "converged": False
+        }
+        changes_before = sum(router.route_changes for router in self.routers.values())
+        start = time.perf_counter()
+
+        executed = 0
+        while max_rounds is None or executed < max_rounds:
+            stats["entries_processed"] += sum(
+                len(self.routers[neighbor].routing_table)
+                for router_name in self.routers
+                for neighbor in self.links.get(router_name, {})
+            )
+            updated, messages = self.run_round()
+            executed += 1
+            stats["messages"] += messages
+            stats["peak_table_size"] = max(
+                [stats["peak_table_size"]] + [len(router.routing_table) for router in self.routers.values()]
+            )
+            if not updated:
+                stats["converged"] = True
+                break
+            stats["rounds"] += 1
+
+        stats["wall_time"] = time.perf_counter() - start
+        stats["route_changes"] = sum(router.route_changes for router in self.routers.values()) - changes_before
+        return stats
+
 class RIPSimulatorUI:
     def __init__(self, root):
         self.root = root
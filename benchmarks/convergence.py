@@ -0,0 +1,179 @@
+"""
+RIP convergence benchmark suite.
+
+Runs generated topologies through core.router.Router / RIPSimulation and
+through the reference RIP.Network, and writes convergence rounds, CPU time,
+peak memory and message counts to JSON so results can be compared across
+commits.
+
+Run from the repository root:
+    python -m benchmarks.convergence --suite small --output bench.json
+"""
+import argparse
+import gc
+import json
+import logging
+import platform
+import subprocess
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks import topologies
+from benchmarks.topologies import Topology
+from core.router import ADVERTISE_MODES, Router
+from main import RIPSimulation
+
+SUITES: Dict[str, List[Callable[[], Topology]]] = {
+    "small": [
+        lambda: topologies.ring(32),
+        lambda: topologies.grid(8, 8, costs="uniform"),
+        lambda: topologies.random_geometric(100, 0.18),
+        lambda: topologies.barabasi_albert(100, 2, costs="exponential"),
+        lambda: topologies.fat_tree(4),
+    ],
+    "medium": [
+        lambda: topologies.ring(128),
+        lambda: topologies.grid(20, 20, costs="uniform"),
+        lambda: topologies.random_geometric(500, 0.08),
+        lambda: topologies.barabasi_albert(500, 3, costs="exponential"),
+        lambda: topologies.fat_tree(8),
+    ],
+}
+
+
+def build_simulation(topology: Topology, advertise_mode: str) -> RIPSimulation:
+    """Load a topology into a fresh RIPSimulation"""
+    simulation = RIPSimulation()
+    for name in topology.routers:
+        simulation.add_router(Router(name, advertise_mode=advertise_mode))
+    for router1, router2, cost in topology.links:
+        simulation.connect_routers(router1, router2, cost)
+    return simulation
+
+
+def run_router_engine(topology: Topology, advertise_mode: str) -> Dict[str, Any]:
+    simulation = build_simulation(topology, advertise_mode)
+    result = simulation.run_until_converged().as_dict()
+    result["advertisement"] = simulation.advertisement_counters[advertise_mode]
+    return result
+
+
+def run_event_engine(topology: Topology, advertise_mode: str) -> Dict[str, Any]:
+    simulation = build_simulation(topology, advertise_mode)
+    virtual_time = simulation.run_event_driven(seed=topology.params.get("seed", 0))
+    return {
+        "virtual_time": virtual_time,
+        "events": simulation.scheduler.events_processed,
+        "messages": simulation.messages_sent,
+        # Every table starts at version 1 from its own route
+        "route_changes": sum(router.routing_table.version - 1 for router in simulation.routers.values()),
+        "peak_table_size": max(len(router.routing_table) for router in simulation.routers.values()),
+        "advertisement": simulation.advertisement_counters[advertise_mode],
+        "triggered_updates": sum(trigger.sent for trigger in simulation.triggered.values()),
+        "suppressed_updates": simulation.suppressed_updates,
+    }
+
+
+def run_legacy_engine(topology: Topology, advertise_mode: str) -> Dict[str, Any]:
+    # The reference implementation has no advertisement filtering; advertise_mode is ignored
+    # RIP.py imports tkinter at module level, so only load it when asked for
+    from RIP import Network
+
+    network = Network()
+    for name in topology.routers:
+        network.add_router(name)
+    for router1, router2, cost in topology.links:
+        network.connect_routers(router1, router2, cost)
+    return network.run_until_converged()
+
+
+ENGINES: Dict[str, Callable[[Topology, str], Dict[str, Any]]] = {
+    "router": run_router_engine,
+    "event": run_event_engine,
+    "legacy": run_legacy_engine,
+}
+
+
+def measure(engine: Callable[[Topology, str], Dict[str, Any]], topology: Topology, advertise_mode: str,
+            memory: bool) -> Dict[str, Any]:
+    """
+    Run one engine on one topology
+
+    Timing comes from a plain run; when ``memory`` is set a second run under
+    tracemalloc records peak allocation, so tracing does not skew the timings.
+    """
+    gc.collect()
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    result = engine(topology, advertise_mode)
+    result["cpu_time"] = time.process_time() - cpu_start
+    # Includes building the topology, unlike an engine's own wall_time
+    result["total_wall_time"] = time.perf_counter() - wall_start
+
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        engine(topology, advertise_mode)
+        result["peak_memory_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def current_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RIP convergence benchmark suite")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="small")
+    parser.add_argument("--engines", nargs="+", choices=sorted(ENGINES), default=["router", "legacy"])
+    parser.add_argument("--advertise-mode", choices=ADVERTISE_MODES, default="split_horizon",
+                        help="Advertisement filtering used by the router and event engines")
+    parser.add_argument("--output", default="convergence_results.json", help="JSON file to write")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    # Per-update INFO logging would dominate the timings
+    logging.disable(logging.INFO)
+
+    results = []
+    for make_topology in SUITES[args.suite]:
+        topology = make_topology()
+        for engine_name in args.engines:
+            try:
+                metrics = measure(ENGINES[engine_name], topology, args.advertise_mode, memory=not args.no_memory)
+            except ImportError as e:
+                print(f"Skipping {engine_name}: {e}")
+                continue
+            results.append({
+                "topology": topology.name,
+                "params": topology.params,
+                "routers": len(topology.routers),
+                "links": len(topology.links),
+                "engine": engine_name,
+                "advertise_mode": args.advertise_mode,
+                **metrics,
+            })
+            print(f"{topology.name:18} {engine_name:7} routers={len(topology.routers):5} "
+                  f"rounds={metrics.get('rounds', '-')!s:>4} messages={metrics['messages']:8} "
+                  f"cpu={metrics['cpu_time']:.3f}s")
+
+    report = {
+        "commit": current_commit(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "suite": args.suite,
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Packet forwarding: longest-prefix match on a FIB built from the RIB.
+
+Every router of a scale-free topology originates an equal share of random CIDR
+prefixes (lengths drawn from a BGP-like mix dominated by /24s). After the
+in-memory RIPSimulation converges, one router builds its FIB, a
+core.fib.PrefixTrie, and destination addresses are looked up in it. The same
+addresses go through a naive scan of every prefix as the baseline, and the
+answers of both are compared.
+
+Half of the addresses fall inside an advertised prefix and half are uniformly
+random, most of which only a short prefix or nothing matches.
+
+Run from the repository root:
+    python -m benchmarks.fib_lookup --prefixes 100000 250000
+"""
+import argparse
+import gc
+import json
+import logging
+import random
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from benchmarks import topologies
+from benchmarks.convergence import build_simulation
+from core.fib import linear_lookup
+from core.router import SPLIT_HORIZON
+
+# (prefix length, weight), roughly the shape of a global routing table
+LENGTHS = ((8, 1), (12, 2), (14, 3), (16, 10), (18, 8), (19, 9), (20, 12), (21, 11), (22, 18), (23, 16), (24, 110))
+
+
+def random_prefixes(count: int, rng: random.Random) -> List[tuple]:
+    lengths = [length for length, _ in LENGTHS]
+    weights = [weight for _, weight in LENGTHS]
+    prefixes = set()
+    while len(prefixes) < count:
+        length = rng.choices(lengths, weights)[0]
+        network = rng.getrandbits(32) & ((0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF)
+        prefixes.add((network, length))
+    return sorted(prefixes)
+
+
+def random_addresses(prefixes: List[tuple], count: int, rng: random.Random) -> List[int]:
+    addresses = []
+    for i in range(count):
+        if i % 2:
+            addresses.append(rng.getrandbits(32))
+        else:
+            network, length = rng.choice(prefixes)
+            addresses.append(network | (rng.getrandbits(32) >> length))
+    return addresses
+
+
+def lookups_per_second(lookup, addresses: List[int], min_time: float) -> float:
+    """Repeat lookups over ``addresses`` for at least ``min_time`` seconds"""
+    done = 0
+    start = time.perf_counter()
+    while True:
+        for address in addresses:
+            lookup(address)
+        done += len(addresses)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return done / elapsed
+
+
+def measure(prefix_count: int, routers: int, lookups: int, linear_lookups: int, min_time: float,
+            seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    # A small diameter keeps every origin within RIP's 15 hops
+    simulation = build_simulation(topologies.barabasi_albert(routers, 2, seed=seed), SPLIT_HORIZON)
+    router_list = list(simulation.routers.values())
+    prefixes = random_prefixes(prefix_count, rng)
+    for i, prefix in enumerate(prefixes):
+        router_list[i % len(router_list)].prefixes.append(prefix)
+    simulation.run_until_converged()
+    router_id = router_list[0].id
+
+    start = time.perf_counter()
+    fib = simulation.build_fib(router_id)
+    # The first lookup builds the jump table
+    fib.lookup(0)
+    build_seconds = time.perf_counter() - start
+
+    gc.collect()
+    tracemalloc.start()
+    simulation.build_fib(router_id).lookup(0)
+    fib_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    addresses = random_addresses(prefixes, lookups, rng)
+    trie_rate = lookups_per_second(fib.lookup, addresses, min_time)
+    entries = list(fib.items())
+    sample = addresses[:linear_lookups]
+    linear_rate = lookups_per_second(lambda address: linear_lookup(entries, address), sample, min_time)
+    matches = sum(fib.lookup(address) == linear_lookup(entries, address) for address in sample)
+
+    return {
+        "prefixes": len(fib),
+        "routers": len(router_list),
+        "build_seconds": build_seconds,
+        "fib_bytes": fib_bytes,
+        "trie_mlookups_s": trie_rate / 1e6,
+        "linear_mlookups_s": linear_rate / 1e6,
+        "speedup": trie_rate / linear_rate,
+        "routed": sum(fib.lookup(address) is not None for address in addresses) / len(addresses),
+        "agree": matches == len(sample),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Longest-prefix match on a FIB built from the RIB")
+    parser.add_argument("--prefixes", type=int, nargs="+", default=[100000], help="FIB sizes to test")
+    parser.add_argument("--routers", type=int, default=100, help="Routers originating the prefixes")
+    parser.add_argument("--lookups", type=int, default=100000, help="Destination addresses for the trie")
+    parser.add_argument("--linear-lookups", type=int, default=50, help="Addresses for the linear scan")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds each rate is measured for")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Optional JSON file to write")
+    args = parser.parse_args()
+
+    # RIPSimulation logs every route change
+    logging.disable(logging.INFO)
+
+    results = []
+    for prefix_count in args.prefixes:
+        result = measure(prefix_count, args.routers, args.lookups, args.linear_lookups, args.min_time, args.seed)
+        results.append(result)
+        print(f"prefixes={result['prefixes']:8} build={result['build_seconds']:.2f}s "
+              f"fib={result['fib_bytes'] / 1e6:.1f}MB trie={result['trie_mlookups_s']:.3f}Mlookups/s "
+              f"linear={result['linear_mlookups_s'] * 1e6:.0f}lookups/s speedup={result['speedup']:.0f}x "
+              f"routed={result['routed']:.0%} agree={result['agree']}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Loopback file transfer throughput of RIPSocketHandler.
+
+Sends one file of each size to a RIPSocketHandler.start_server running in a
+background thread and times it from connecting until the server reports the
+file through on_file_received. Four modes are compared:
+
+- chunked: the original 1 KiB read()/sendall() and recv(1024)/write() loops,
+  reproduced here on a plain socket as the baseline
+- sendfile: send_file (socket.sendfile) into recv_into on one preallocated buffer
+- sendfile_mmap: send_file into a pre-sized memory-mapped output file
+- parallel: send_file_parallel, SHA-256 checked 1 MiB blocks over --connections
+  connections written in place with pwrite
+
+CPU time is the process time of sender and receiver together, since both
+run in this process.
+
+Run from the repository root:
+    python -m benchmarks.file_transfer --sizes 1 64 512
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+from network_utils.socket_handler import RIPSocketHandler
+
+MODES = ("chunked", "sendfile", "sendfile_mmap", "parallel")
+CHUNK = 1024
+
+
+class ChunkedReceiver:
+    """Receives files with the original 1 KiB recv()/write() loop, one connection per file"""
+
+    def __init__(self, save_directory: str):
+        self.save_directory = save_directory
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.bind(("127.0.0.1", 0))
+        self.server_socket.listen()
+        self.port = self.server_socket.getsockname()[1]
+        self.received = threading.Event()
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            conn, _ = self.server_socket.accept()
+            with conn:
+                file_size = int.from_bytes(conn.recv(8, socket.MSG_WAITALL), "big")
+                with open(os.path.join(self.save_directory, "chunked.bin"), "wb") as file:
+                    received_size = 0
+                    while received_size < file_size:
+                        data = conn.recv(CHUNK)
+                        if not data:
+                            break
+                        file.write(data)
+                        received_size += len(data)
+            self.received.set()
+
+    def send(self, file_path: str):
+        with socket.create_connection(("127.0.0.1", self.port)) as client_socket:
+            client_socket.sendall(os.path.getsize(file_path).to_bytes(8, "big"))
+            with open(file_path, "rb") as file:
+                while chunk := file.read(CHUNK):
+                    client_socket.sendall(chunk)
+
+
+def wait_for_server(port: int, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.01)
+
+
+def make_file(path: str, size: int):
+    block = os.urandom(1 << 20)
+    with open(path, "wb") as file:
+        remaining = size
+        while remaining:
+            count = min(remaining, len(block))
+            file.write(block[:count])
+            remaining -= count
+
+
+def same_contents(first: str, second: str) -> bool:
+    with open(first, "rb") as a, open(second, "rb") as b:
+        while True:
+            block_a, block_b = a.read(1 << 20), b.read(1 << 20)
+            if block_a != block_b:
+                return False
+            if not block_a:
+                return True
+
+
+def measure(size: int, repeats: int, port: int, work_directory: str, connections: int) -> List[Dict[str, Any]]:
+    source = os.path.join(work_directory, "source.bin")
+    make_file(source, size)
+    save_directory = os.path.join(work_directory, "received")
+
+    received = threading.Event()
+    handler = RIPSocketHandler("BENCH", port=port, save_directory=save_directory,
+                               on_file_received=lambda path: received.set())
+    threading.Thread(target=handler.start_server, daemon=True).start()
+    wait_for_server(port)
+    chunked = ChunkedReceiver(save_directory)
+
+    results = []
+    for mode in MODES:
+        handler.mmap_files = mode == "sendfile_mmap"
+        best_time = best_cpu = float("inf")
+        for _ in range(repeats):
+            received.clear()
+            chunked.received.clear()
+            start, start_cpu = time.perf_counter(), time.process_time()
+            if mode == "chunked":
+                chunked.send(source)
+                chunked.received.wait()
+            elif mode == "parallel":
+                handler.send_file_parallel(source, "127.0.0.1", port, connections=connections)
+                received.wait()
+            else:
+                handler.send_file(source, "127.0.0.1", port)
+                received.wait()
+            best_time = min(best_time, time.perf_counter() - start)
+            best_cpu = min(best_cpu, time.process_time() - start_cpu)
+
+        output = os.path.join(save_directory, "chunked.bin" if mode == "chunked" else "source.bin")
+        results.append({
+            "mode": mode,
+            "size_bytes": size,
+            "seconds": best_time,
+            "throughput_mb_s": size / best_time / 1e6,
+            "cpu_seconds": best_cpu,
+            "intact": same_contents(source, output),
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Loopback file transfer throughput of RIPSocketHandler")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 64, 512], help="File sizes in MiB")
+    parser.add_argument("--repeats", type=int, default=3, help="Transfers per mode; the fastest is reported")
+    parser.add_argument("--port", type=int, default=65434)
+    parser.add_argument("--connections", type=int, default=4, help="Connections of the parallel mode")
+    parser.add_argument("--output", help="Optional JSON file to write")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    for index, size_mib in enumerate(args.sizes):
+        with tempfile.TemporaryDirectory() as work_directory:
+            # The server prints every transfer; keep the report readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                size_results = measure(int(size_mib * (1 << 20)), args.repeats, args.port + index, work_directory,
+                                       args.connections)
+        results.extend(size_results)
+        for result in size_results:
+            print(f"size={size_mib:8.1f}MiB mode={result['mode']:13} "
+                  f"throughput={result['throughput_mb_s']:9.1f}MB/s cpu={result['cpu_seconds']:.3f}s "
+                  f"intact={result['intact']}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+RIP over real sockets: one OS process per router on localhost.
+
+Runs generated topologies through network_utils.emulation.run_emulation and
+reports convergence time, bytes exchanged and per-process CPU and memory,
+next to the rounds the in-memory RIPSimulation needs for the same topology.
+
+Run from the repository root:
+    python -m benchmarks.localhost_emulation --suite small --output emulation.json
+"""
+import argparse
+import json
+import logging
+import statistics
+from typing import Any, Callable, Dict, List
+
+from benchmarks import topologies
+from benchmarks.convergence import build_simulation
+from benchmarks.topologies import Topology
+from core.router import ADVERTISE_MODES, SPLIT_HORIZON
+from network_utils.emulation import run_emulation
+
+SUITES: Dict[str, List[Callable[[], Topology]]] = {
+    "tiny": [
+        lambda: topologies.ring(8),
+        lambda: topologies.grid(3, 3, costs="uniform"),
+    ],
+    "small": [
+        lambda: topologies.ring(16),
+        lambda: topologies.grid(5, 5, costs="uniform"),
+        lambda: topologies.barabasi_albert(32, 2, costs="exponential"),
+        lambda: topologies.fat_tree(4),
+    ],
+    "medium": [
+        lambda: topologies.ring(64),
+        lambda: topologies.grid(10, 10, costs="uniform"),
+        lambda: topologies.random_geometric(100, 0.18),
+    ],
+}
+
+
+def measure(topology: Topology, advertise_mode: str, base_port: int, update_interval: float,
+            timeout: float) -> Dict[str, Any]:
+    report = run_emulation(topology.routers, topology.links, base_port=base_port, advertise_mode=advertise_mode,
+                           update_interval=update_interval, timeout=timeout)
+    in_memory = build_simulation(topology, advertise_mode).run_until_converged()
+    nodes = report.nodes
+    node_times = [node.convergence_time for node in nodes]
+    return {
+        "topology": topology.name,
+        "params": topology.params,
+        "advertise_mode": advertise_mode,
+        "emulation": report.as_dict(),
+        "summary": {
+            "convergence_time": report.convergence_time,
+            "node_convergence_p50": statistics.median(node_times),
+            "node_convergence_max": max(node_times),
+            "bytes_sent": sum(node.bytes_sent for node in nodes),
+            "updates_suppressed": sum(node.updates_suppressed for node in nodes),
+            "cpu_seconds_total": sum(node.cpu_user + node.cpu_system for node in nodes),
+            "cpu_seconds_max": max(node.cpu_user + node.cpu_system for node in nodes),
+            "max_rss_kb": max(node.max_rss_kb for node in nodes),
+            "wrong_routes": report.wrong_routes,
+            "in_memory_rounds": in_memory.rounds,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RIP emulation with one process per router on localhost")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="small")
+    parser.add_argument("--advertise-mode", choices=ADVERTISE_MODES, default=SPLIT_HORIZON)
+    parser.add_argument("--base-port", type=int, default=47000)
+    parser.add_argument("--update-interval", type=float, default=1.0, help="Seconds between periodic updates")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Give up on a topology after this many seconds")
+    parser.add_argument("--output", help="Optional JSON file to write")
+    args = parser.parse_args()
+
+    # RIPSimulation logs every route change
+    logging.disable(logging.INFO)
+
+    results = []
+    for make_topology in SUITES[args.suite]:
+        topology = make_topology()
+        result = measure(topology, args.advertise_mode, args.base_port, args.update_interval, args.timeout)
+        results.append(result)
+        summary = result["summary"]
+        print(f"{topology.name:16} routers={len(topology.routers):4} "
+              f"converged={result['emulation']['converged']} in {summary['convergence_time']:.3f}s "
+              f"(node p50 {summary['node_convergence_p50']:.3f}s) wrong={summary['wrong_routes']} "
+              f"bytes={summary['bytes_sent']} suppressed={summary['updates_suppressed']} "
+              f"cpu={summary['cpu_seconds_total']:.2f}s rss<={summary['max_rss_kb']}KB "
+              f"rounds(in-memory)={summary['in_memory_rounds']}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Binary RIPv2-style datagrams vs the JSON RIP update format.
+
+For routing tables of several sizes, compares bytes on the wire and
+encode/decode throughput of network_utils.rip_packet against the
+json.dumps/json.loads path used by RIPSocketHandler.send_rip_update.
+Binary wire bytes include the per-datagram UDP/IPv4 headers; JSON bytes
+include the RIP_UPDATE tag but not TCP/IP overhead.
+
+Run from the repository root:
+    python -m benchmarks.rip_wire_format --routes 25 250 2500
+"""
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from network_utils.rip_packet import (AddressBook, decode_packet, encode_response, entries_to_table,
+                                      routes_from_table)
+from network_utils.socket_handler import RIP_UPDATE
+
+# IPv4 (20) + UDP (8) headers carried by every datagram
+UDP_OVERHEAD = 28
+
+
+def make_network(routes: int):
+    names = [f"R{i}" for i in range(routes)]
+    book = AddressBook({name: f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i, name in enumerate(names)})
+    book.assign("SENDER", "10.255.255.254")
+    table = {name: {"cost": i % 15 + 1, "next_hop": names[i % 4]} for i, name in enumerate(names)}
+    return book, table
+
+
+def per_second(operation: Callable[[], Any], min_time: float) -> float:
+    """Return how many times ``operation`` runs per second, timed over at least ``min_time``"""
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        operation()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return runs / elapsed
+
+
+def measure(routes: int, min_time: float) -> Dict[str, Any]:
+    book, table = make_network(routes)
+    sender = book.address("SENDER")
+
+    def json_encode():
+        return json.dumps({"router_id": "SENDER", "routing_table": table}).encode('utf-8')
+
+    encoded_json = json_encode()
+
+    def json_decode():
+        return json.loads(encoded_json.decode())
+
+    def binary_encode():
+        return encode_response(sender, routes_from_table(table, book))
+
+    datagrams = binary_encode()
+
+    def binary_decode():
+        return [decode_packet(datagram) for datagram in datagrams]
+
+    def binary_decode_to_dict():
+        return [entries_to_table(packet.entries, book) for packet in binary_decode()]
+
+    return {
+        "routes": routes,
+        "json_bytes": len(RIP_UPDATE) + len(encoded_json),
+        "binary_bytes": sum(len(datagram) for datagram in datagrams),
+        "binary_wire_bytes": sum(len(datagram) + UDP_OVERHEAD for datagram in datagrams),
+        "datagrams": len(datagrams),
+        "json_encode_routes_per_s": routes * per_second(json_encode, min_time),
+        "json_decode_routes_per_s": routes * per_second(json_decode, min_time),
+        "binary_encode_routes_per_s": routes * per_second(binary_encode, min_time),
+        "binary_decode_routes_per_s": routes * per_second(binary_decode, min_time),
+        # Decoding back into the legacy dict, for callers that still want one
+        "binary_decode_dict_routes_per_s": routes * per_second(binary_decode_to_dict, min_time),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binary RIP datagrams vs JSON updates")
+    parser.add_argument("--routes", type=int, nargs="+", default=[25, 250, 2500], help="Routing table sizes")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Seconds to time each operation")
+    parser.add_argument("--output", help="Optional JSON file to write")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    for routes in args.routes:
+        result = measure(routes, args.min_time)
+        results.append(result)
+        print(f"routes={routes:6} bytes json={result['json_bytes']:8} binary={result['binary_bytes']:8} "
+              f"(+udp {result['binary_wire_bytes']:8}) | encode/s json={result['json_encode_routes_per_s']:10.0f} "
+              f"binary={result['binary_encode_routes_per_s']:10.0f} | decode/s "
+              f"json={result['json_decode_routes_per_s']:10.0f} binary={result['binary_decode_routes_per_s']:10.0f}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Memory benchmark: legacy dict-of-dicts routing tables vs. RoutingTable.
+
+Two scenarios, both with uuid4 router ids:
+
+* full: fully converged tables for N routers (N * N entries), the best case
+  for arrays indexed by interned id
+* grid: a side x side grid at RIP metric infinity, where each router only
+  reaches the routers less than 16 hops away, so a table holds a few hundred
+  routes however large the network is
+
+Each reports the traced allocation size of both representations.
+
+Run from the repository root:
+    python -m benchmarks.routing_table_memory --routers 1000 --grid 80
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+import uuid
+from collections import deque
+
+from core.routing_table import RoutingTable, router_ids
+
+# RIP metric infinity: routes cost at most INFINITY - 1 hops
+INFINITY = 16
+
+
+def full_mesh_routes(count):
+    """Routes of a fully converged network: every router reaches every other at cost 1"""
+    def reach(owner):
+        return ((dest, 1, dest) for dest in range(count))
+    return reach
+
+
+def grid_routes(side):
+    """Routes of a side x side grid: every router within INFINITY - 1 hops, via its first hop"""
+    def neighbors(node):
+        row, col = divmod(node, side)
+        if row > 0:
+            yield node - side
+        if row < side - 1:
+            yield node + side
+        if col > 0:
+            yield node - 1
+        if col < side - 1:
+            yield node + 1
+
+    def reach(owner):
+        first_hop = {owner: owner}
+        cost = {owner: 0}
+        queue = deque([owner])
+        while queue:
+            node = queue.popleft()
+            yield node, cost[node], first_hop[node]
+            if cost[node] == INFINITY - 1:
+                continue
+            for neighbor in neighbors(node):
+                if neighbor not in cost:
+                    cost[neighbor] = cost[node] + 1
+                    first_hop[neighbor] = neighbor if node == owner else first_hop[node]
+                    queue.append(neighbor)
+    return reach
+
+
+def build_legacy_tables(names, reach):
+    """Build the original per-entry dict representation"""
+    now = time.time()
+    tables = {}
+    for owner, name in enumerate(names):
+        tables[name] = {
+            names[dest]: {"cost": cost, "next_hop": names[next_hop], "timestamp": now}
+            for dest, cost, next_hop in reach(owner)
+        }
+    return tables
+
+
+def build_compact_tables(names, reach):
+    """Build array-backed RoutingTable instances"""
+    now = time.time()
+    indexes = [router_ids.intern(name) for name in names]
+    tables = {}
+    for owner, name in enumerate(names):
+        table = RoutingTable()
+        for dest, cost, next_hop in reach(owner):
+            table.set_route(indexes[dest], cost, indexes[next_hop], now)
+        tables[name] = table
+    return tables
+
+
+def measure(builder, names, reach):
+    """Return (traced bytes, seconds) for building tables with ``builder``"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    tables = builder(names, reach)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del tables
+    gc.collect()
+    return current, elapsed
+
+
+def report(label, names, reach):
+    # Intern up front so the registry is not charged to the compact tables
+    for name in names:
+        router_ids.intern(name)
+    entries = sum(1 for owner in range(len(names)) for _ in reach(owner))
+
+    legacy_bytes, legacy_time = measure(build_legacy_tables, names, reach)
+    compact_bytes, compact_time = measure(build_compact_tables, names, reach)
+
+    print(f"{label}  Routers: {len(names)}  Entries: {entries} ({entries / len(names):.0f} per router)")
+    print(f"  dict-of-dicts : {legacy_bytes / 2**20:10.1f} MiB "
+          f"({legacy_bytes / entries:6.1f} B/entry) built in {legacy_time:.2f}s")
+    print(f"  RoutingTable  : {compact_bytes / 2**20:10.1f} MiB "
+          f"({compact_bytes / entries:6.1f} B/entry) built in {compact_time:.2f}s")
+    print(f"  Reduction     : {legacy_bytes / max(compact_bytes, 1):.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Routing table memory benchmark")
+    parser.add_argument("--routers", type=int, default=500,
+                        help="Routers in the full scenario (entries = routers^2); 0 to skip")
+    parser.add_argument("--grid", type=int, default=40,
+                        help="Side of the bounded-reach grid scenario; 0 to skip")
+    args = parser.parse_args()
+
+    # Every table is judged against the process-wide registry, so each scenario interns its
+    # routers only when it runs, as a simulation of that network alone would
+    if args.routers:
+        report("full", [str(uuid.uuid4()) for _ in range(args.routers)], full_mesh_routes(args.routers))
+    if args.grid:
+        report(f"grid {args.grid}x{args.grid}", [str(uuid.uuid4()) for _ in range(args.grid ** 2)],
+               grid_routes(args.grid))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Throughput and latency of the asyncio RIPSocketHandler server.
+
+Concurrent senders each push RIP updates over the existing
+connection-per-update protocol to one RIPSocketHandler.serve_async running
+on its own event loop thread. Latency is measured from the sender starting
+to connect until the server has decoded the packet. With --slow-transfer a
+peer trickles a file to the server for the whole run, which used to stall
+every other peer.
+
+Run from the repository root:
+    python -m benchmarks.socket_server --senders 10 100 1000
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import statistics
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List
+
+from network_utils.socket_handler import FILE_TRANSFER, RIP_UPDATE, RIPSocketHandler
+
+
+def make_routing_table(routes: int) -> Dict[str, Dict[str, Any]]:
+    return {f"R{i}": {"cost": i % 15 + 1, "next_hop": f"R{i % 4}"} for i in range(routes)}
+
+
+class ServerThread:
+    """Runs a handler's asyncio server on a private event loop in a background thread"""
+
+    def __init__(self, handler: RIPSocketHandler):
+        self.handler = handler
+        self.loop = asyncio.new_event_loop()
+        self._task = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self._task = self.loop.create_task(self.handler.serve_async())
+        with contextlib.suppress(asyncio.CancelledError):
+            self.loop.run_until_complete(self._task)
+        # Closing the server leaves peer handlers running; every sender has hung up
+        # by now, so let them drain rather than cancelling them mid-write
+        pending = asyncio.all_tasks(self.loop)
+        if pending:
+            self.loop.run_until_complete(asyncio.wait(pending, timeout=10))
+
+    def __enter__(self) -> "ServerThread":
+        self._thread.start()
+        while self.handler.async_server is None:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.loop.call_soon_threadsafe(self._task.cancel)
+        self._thread.join()
+        self.loop.close()
+
+
+async def send_update(host: str, port: int, packet: bytes):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(RIP_UPDATE)
+    writer.write(packet)
+    await writer.drain()
+    writer.close()
+    await writer.wait_closed()
+
+
+async def slow_transfer(host: str, port: int, stop: asyncio.Event, chunk: int = 4096, delay: float = 0.01):
+    """Trickle a file to the server until ``stop`` is set"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(FILE_TRANSFER)
+    await writer.drain()
+    await asyncio.sleep(0.05)
+    writer.write(b"slow_transfer.bin")
+    await writer.drain()
+    await asyncio.sleep(0.05)
+    writer.write(str(1 << 40).encode())
+    await writer.drain()
+    # The legacy protocol has no framing; give the server time to read the size alone
+    await asyncio.sleep(0.05)
+    while not stop.is_set():
+        writer.write(bytes(chunk))
+        await writer.drain()
+        await asyncio.sleep(delay)
+    writer.close()
+    with contextlib.suppress(ConnectionError):
+        await writer.wait_closed()
+
+
+async def run_senders(host: str, port: int, senders: int, updates: int, routes: int,
+                      started: Dict[str, float], slow: bool) -> float:
+    table = make_routing_table(routes)
+    stop = asyncio.Event()
+    background = asyncio.create_task(slow_transfer(host, port, stop)) if slow else None
+    if slow:
+        await asyncio.sleep(0.2)
+
+    async def sender(index: int):
+        for seq in range(updates):
+            router_id = f"S{index}-{seq}"
+            packet = json.dumps({"router_id": router_id, "routing_table": table}).encode('utf-8')
+            started[router_id] = time.perf_counter()
+            await send_update(host, port, packet)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(sender(i) for i in range(senders)))
+    elapsed = time.perf_counter() - start
+    if background is not None:
+        stop.set()
+        await background
+    return elapsed
+
+
+def measure(senders: int, updates: int, routes: int, port: int, slow: bool) -> Dict[str, Any]:
+    started: Dict[str, float] = {}
+    finished: Dict[str, float] = {}
+    expected = senders * updates
+
+    def record(packet):
+        finished[packet["router_id"]] = time.perf_counter()
+
+    with tempfile.TemporaryDirectory() as save_directory:
+        handler = RIPSocketHandler("BENCH", port=port, save_directory=save_directory, on_rip_update=record)
+        # The server prints every update; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()), ServerThread(handler):
+            send_time = asyncio.run(run_senders("127.0.0.1", port, senders, updates, routes, started, slow))
+            deadline = time.perf_counter() + 30
+            while len(finished) < expected and time.perf_counter() < deadline:
+                time.sleep(0.01)
+
+    latencies = sorted(finished[key] - started[key] for key in finished)
+    total_time = max(finished.values()) - min(started.values()) if finished else send_time
+    return {
+        "senders": senders,
+        "updates": expected,
+        "received": len(finished),
+        "slow_transfer": slow,
+        "throughput_per_s": len(finished) / total_time if total_time else 0.0,
+        "latency_p50_ms": statistics.median(latencies) * 1000 if latencies else None,
+        "latency_p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000 if latencies else None,
+        "latency_max_ms": latencies[-1] * 1000 if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="asyncio RIPSocketHandler throughput and latency")
+    parser.add_argument("--senders", type=int, nargs="+", default=[10, 100, 1000],
+                        help="Concurrent sender counts to measure")
+    parser.add_argument("--updates", type=int, default=5, help="Updates sent by each sender")
+    parser.add_argument("--routes", type=int, default=25, help="Routes per update")
+    parser.add_argument("--port", type=int, default=65433)
+    parser.add_argument("--slow-transfer", action="store_true",
+                        help="Keep a slow file transfer running during every measurement")
+    parser.add_argument("--output", help="Optional JSON file to write")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    for senders in args.senders:
+        result = measure(senders, args.updates, args.routes, args.port, args.slow_transfer)
+        results.append(result)
+        print(f"senders={senders:5} received={result['received']:6}/{result['updates']:<6} "
+              f"throughput={result['throughput_per_s']:9.1f}/s "
+              f"p50={result['latency_p50_ms']:.2f}ms p99={result['latency_p99_ms']:.2f}ms "
+              f"max={result['latency_max_ms']:.2f}ms")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Payload compression in the text_summarizer transfer protocol, per codec.
+
+The client side's ClientFileTransfer uploads one document to a server thread
+running ServerFileTransfer after negotiating a codec in the HELLO/READY
+exchange: none, zlib, and zstd/lz4 when installed. Both sides' compression
+stats give the ratio and the CPU time spent against the bytes saved; the
+break-even link speed is the bandwidth below which that CPU time is cheaper
+than sending the saved bytes.
+
+The document is synthetic prose (Zipf-distributed words) unless ``--file``
+names a real text file, e.g. text extracted from a PDF.
+
+Run from the repository root:
+    python -m benchmarks.summarizer_compression --size 4 --rtt 10
+"""
+import argparse
+import contextlib
+import io
+import json
+import random
+import socket
+import string
+import time
+from typing import Any, Dict, List
+
+from benchmarks.summarizer_transfer import DelayProxy, EchoServer, load_transfer_module
+
+
+def synthetic_text(size: int, seed: int = 1) -> str:
+    """Prose-like text of ``size`` characters: Zipf-distributed words in sentences"""
+    rng = random.Random(seed)
+    vocabulary = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10))) for _ in range(5000)]
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    parts: List[str] = []
+    length = 0
+    while length < size:
+        sentence = rng.choices(vocabulary, weights, k=rng.randint(6, 20))
+        parts.append(sentence[0].capitalize() + " " + " ".join(sentence[1:]) + ". ")
+        length += len(parts[-1])
+    return "".join(parts)[:size]
+
+
+def measure(server_module, client_module, codec: str, document: str, rtt_ms: float,
+            repeats: int) -> Dict[str, Any]:
+    codecs = [codec] if codec != "none" else []
+    server = EchoServer(server_module, 256 * 1024)
+    server.transfer.codecs = codecs
+    proxy = DelayProxy(server.port, rtt_ms / 2000)
+    transfer = client_module.ClientFileTransfer(codecs=codecs)
+    best = float("inf")
+    with socket.create_connection(("127.0.0.1", proxy.port)) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        transfer.send_to_server(sock, "HELLO Server")
+        if transfer.receive_from_server(sock) != "READY":
+            raise RuntimeError("Handshake failed")
+        if transfer._codecs.get(sock) != (codecs[0] if codecs else None):
+            raise RuntimeError(f"Codec {codec} was not negotiated")
+        for _ in range(repeats):
+            start = time.perf_counter()
+            transfer.send_to_server(sock, document)
+            if transfer.receive_from_server(sock) != len(document):
+                raise RuntimeError("Server received a different document")
+            best = min(best, time.perf_counter() - start)
+
+    sent = transfer.stats.snapshot()
+    received = server.transfer.stats.snapshot()
+    saved = sent["bytes_saved"] / repeats
+    compress_ms = sent["compress_seconds"] * 1e3 / repeats
+    decompress_ms = received["decompress_seconds"] * 1e3 / repeats
+    cpu_seconds = (compress_ms + decompress_ms) / 1e3
+    return {
+        "codec": codec,
+        "rtt_ms": rtt_ms,
+        "raw_bytes": len(document.encode("utf-8")),
+        "ratio": sent["ratio"],
+        "bytes_saved": saved,
+        "compress_ms": compress_ms,
+        "decompress_ms": decompress_ms,
+        "cpu_ms_per_mb_saved": cpu_seconds * 1e3 / (saved / 1e6) if saved > 0 else None,
+        "break_even_mb_s": saved / cpu_seconds / 1e6 if saved > 0 and cpu_seconds else None,
+        "seconds": best,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarizer payload compression per codec")
+    parser.add_argument("--size", type=float, default=4, help="Synthetic document size in MiB")
+    parser.add_argument("--file", help="Text file to send instead of the synthetic document")
+    parser.add_argument("--rtt", type=float, default=0, help="Round-trip time in ms")
+    parser.add_argument("--repeats", type=int, default=3, help="Uploads per codec; the fastest is reported")
+    parser.add_argument("--output", help="Optional JSON file to write")
+    args = parser.parse_args()
+
+    server_module = load_transfer_module("server")
+    client_module = load_transfer_module("client")
+    if args.file:
+        with open(args.file, encoding="utf-8", errors="replace") as handle:
+            document = handle.read()
+    else:
+        document = synthetic_text(int(args.size * (1 << 20)))
+
+    results: List[Dict[str, Any]] = []
+    for codec in ["none"] + client_module.available_codecs():
+        # The server logs every acknowledgement of the stop-and-wait handshake
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = measure(server_module, client_module, codec, document, args.rtt, args.repeats)
+        results.append(result)
+        cost = (f"cpu={result['cpu_ms_per_mb_saved']:6.1f}ms/MB saved "
+                f"break_even={result['break_even_mb_s']:7.1f}MB/s" if result["break_even_mb_s"] else "")
+        print(f"codec={codec:5} ratio={result['ratio']:5.2f}x saved={result['bytes_saved'] / 1e6:7.2f}MB "
+              f"compress={result['compress_ms']:7.1f}ms decompress={result['decompress_ms']:6.1f}ms "
+              f"time={result['seconds'] * 1e3:8.1f}ms {cost}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
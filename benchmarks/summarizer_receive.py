@@ -0,0 +1,196 @@
+"""
+Receive-path cost of the text_summarizer transfer protocol, from 1 KB to 100 MB.
+
+A sender thread streams one pre-serialized document over a local socket pair
+and ServerFileTransfer.receive_from_client takes it in. Three receive paths
+are compared:
+
+* concat: the original loop, ``received_data += chunk`` on immutable bytes
+  with one recv per 8 KiB chunk and stop-and-wait acknowledgements
+* recv_into: one bytearray sized from the length header, filled in place
+  with recv_into on a memoryview, still stop-and-wait
+* recv_into windowed: the same buffer with a negotiated sliding window, so
+  each recv_into takes whatever the socket holds
+
+Time is the best of ``--repeats`` runs, decoding included. Allocation is the
+tracemalloc peak of one more receive with JSON decoding left out, since the
+decoded string costs the same on every path. The concat path copies the
+whole prefix on every chunk and is only run up to ``--concat-max`` bytes.
+
+Run from the repository root:
+    python -m benchmarks.summarizer_receive --sizes 1e3 1e4 1e5 1e6 1e7 1e8
+"""
+import argparse
+import contextlib
+import io
+import json
+import socket
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from benchmarks.summarizer_transfer import load_transfer_module
+
+WINDOW_SIZE = 1 << 20
+ACK_INTERVAL = 256 * 1024
+
+
+def identity(data):
+    return data
+
+
+def concat_receive(transfer, client_socket: socket.socket, decode: Callable = json.loads) -> Any:
+    """The receive loop as it was before preallocated buffers, kept for comparison"""
+    length_header = transfer._recv_exact(client_socket, 10).decode('utf-8').strip()
+    length_info = json.loads(transfer._recv_exact(client_socket, int(length_header)).decode('utf-8'))
+    total_length = length_info["length"]
+    received_data = b""
+    while len(received_data) < total_length:
+        chunk = client_socket.recv(min(transfer.chunk_size, total_length - len(received_data)))
+        if not chunk:
+            raise Exception("Client connection closed prematurely")
+        received_data += chunk
+        client_socket.send(b'ok')
+    return decode(received_data)
+
+
+def send_payload(sock: socket.socket, payload: bytes, chunk_size: int, flow) -> None:
+    """Send a serialized document the way ClientFileTransfer does, without serializing it again"""
+    length_info = json.dumps({"length": len(payload)}).encode('utf-8')
+    sock.sendall(f"{len(length_info):<10}".encode('utf-8') + length_info)
+    view = memoryview(payload)
+    if not flow:
+        for i in range(0, len(payload), chunk_size):
+            sock.sendall(view[i:i + chunk_size])
+            if sock.recv(2) != b'ok':
+                raise RuntimeError("Acknowledgment error")
+        return
+    acked = 0
+    for i in range(0, len(payload), chunk_size):
+        chunk = view[i:i + chunk_size]
+        while acked < i and i + len(chunk) - acked > flow["window"]:
+            acked = int.from_bytes(sock.recv(8, socket.MSG_WAITALL), "big")
+        sock.sendall(chunk)
+    while acked < len(payload):
+        acked = int.from_bytes(sock.recv(8, socket.MSG_WAITALL), "big")
+
+
+def connect(server_module, client_module, windowed: bool):
+    """Socket pair that has completed the HELLO/READY exchange, with or without a window"""
+    server_side, client_side = socket.socketpair()
+    server = server_module.ServerFileTransfer(window_size=WINDOW_SIZE, ack_interval=ACK_INTERVAL)
+    client = client_module.ClientFileTransfer(window_size=WINDOW_SIZE if windowed else 0,
+                                              ack_interval=ACK_INTERVAL)
+    replies = []
+    # Every message waits on the peer's acknowledgements, so the client side runs in its own thread
+    handshake = threading.Thread(target=lambda: (client.send_to_server(client_side, "HELLO Server"),
+                                                 replies.append(client.receive_from_server(client_side))))
+    handshake.start()
+    if server.receive_from_client(server_side) != "HELLO Server":
+        raise RuntimeError("Handshake failed")
+    server.send_to_client(server_side, "READY")
+    handshake.join()
+    if replies != ["READY"]:
+        raise RuntimeError("Handshake failed")
+    return server, server_side, client_side, client._flows.get(client_side)
+
+
+@contextlib.contextmanager
+def swap_decoder(server_module):
+    """Have receive_from_client return the raw payload buffer instead of the decoded document"""
+    decode = server_module.deserialize_server_data
+    server_module.deserialize_server_data = identity
+    try:
+        yield
+    finally:
+        server_module.deserialize_server_data = decode
+
+
+def run_once(receive: Callable[[], Any], sender: threading.Thread, trace: bool):
+    sender.start()
+    if trace:
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    document = receive()
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    sender.join()
+    return document, elapsed, peak
+
+
+def measure(server_module, client_module, mode: str, size: int, repeats: int) -> Dict[str, Any]:
+    payload = json.dumps("x" * (size - 2)).encode('utf-8')
+    server, server_side, client_side, flow = connect(server_module, client_module, mode == "recv_into windowed")
+
+    def receive(decode: bool):
+        if mode == "concat":
+            return concat_receive(server, server_side, json.loads if decode else identity)
+        if decode:
+            return server.receive_from_client(server_side)
+        with swap_decoder(server_module):
+            return server.receive_from_client(server_side)
+
+    best = float("inf")
+    peak = 0
+    with server_side, client_side:
+        # One extra run under tracemalloc, which slows allocation down and is kept out of the timings
+        for attempt in range(repeats + 1):
+            sender = threading.Thread(target=send_payload, args=(client_side, payload, server.chunk_size, flow))
+            traced_run = attempt == repeats
+            document, elapsed, traced = run_once(lambda: receive(not traced_run), sender, trace=traced_run)
+            if len(document) != (size if traced_run else size - 2):
+                raise RuntimeError("Received a different document")
+            del document
+            if traced_run:
+                peak = traced
+            else:
+                best = min(best, elapsed)
+    return {
+        "mode": mode,
+        "size_bytes": size,
+        "seconds": best,
+        "throughput_mb_s": size / best / 1e6,
+        "peak_alloc_bytes": peak,
+        "peak_alloc_ratio": peak / size,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarizer receive path, bytes concatenation vs recv_into")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1e3, 1e4, 1e5, 1e6, 1e7, 1e8],
+                        help="Serialized document sizes in bytes")
+    parser.add_argument("--concat-max", type=float, default=1e7,
+                        help="Largest size the quadratic concat path is run at")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed receives per size; the fastest is reported")
+    parser.add_argument("--output", help="Optional JSON file to write")
+    args = parser.parse_args()
+
+    server_module = load_transfer_module("server")
+    client_module = load_transfer_module("client")
+
+    results: List[Dict[str, Any]] = []
+    for size in (int(size) for size in args.sizes):
+        for mode in ("concat", "recv_into", "recv_into windowed"):
+            if mode == "concat" and size > args.concat_max:
+                continue
+            # The server logs every stop-and-wait acknowledgement
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = measure(server_module, client_module, mode, size, args.repeats)
+            results.append(result)
+            print(f"size={size:>11,} mode={mode:18} time={result['seconds'] * 1e3:10.2f}ms "
+                  f"throughput={result['throughput_mb_s']:8.1f}MB/s "
+                  f"peak_alloc={result['peak_alloc_bytes'] / 1e6:9.2f}MB ({result['peak_alloc_ratio']:.1f}x)")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
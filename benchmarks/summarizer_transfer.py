@@ -0,0 +1,210 @@
+"""
+Upload throughput of the text_summarizer transfer protocol over a delayed link.
+
+The client side's ClientFileTransfer sends one document to a server thread
+running ServerFileTransfer, through a local TCP proxy that holds every
+segment back for half the round-trip time in each direction. Stop-and-wait
+(the client offers no window, so one 8 KiB chunk per round trip) is compared
+with sliding windows of several sizes negotiated in the HELLO/READY exchange.
+
+Run from the repository root:
+    python -m benchmarks.summarizer_transfer --rtts 0 10 50 --windows 64 256 1024
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import queue
+import socket
+import sys
+import threading
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_transfer_module(side: str):
+    """Import text_summarizer/<side>/file_transfer.py next to that side's own utils module"""
+    directory = os.path.join(ROOT, "text_summarizer", side)
+    sys.modules.pop("utils", None)
+    sys.path.insert(0, directory)
+    try:
+        path = os.path.join(directory, "file_transfer.py")
+        spec = importlib.util.spec_from_file_location(f"{side}_file_transfer", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(directory)
+        sys.modules.pop("utils", None)
+    return module
+
+
+class DelayProxy:
+    """Forwards TCP connections to a target, delaying the bytes of each direction by ``delay`` seconds"""
+
+    def __init__(self, target_port: int, delay: float):
+        self.target_port = target_port
+        self.delay = delay
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            client, _ = self.listener.accept()
+            upstream = socket.create_connection(("127.0.0.1", self.target_port))
+            for sock in (client, upstream):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            for source, destination in ((client, upstream), (upstream, client)):
+                pending = queue.Queue()
+                threading.Thread(target=self._read, args=(source, pending), daemon=True).start()
+                threading.Thread(target=self._write, args=(destination, pending), daemon=True).start()
+
+    def _read(self, source: socket.socket, pending: queue.Queue):
+        while True:
+            try:
+                data = source.recv(65536)
+            except OSError:
+                data = b""
+            pending.put((time.monotonic() + self.delay, data))
+            if not data:
+                return
+
+    @staticmethod
+    def _write(destination: socket.socket, pending: queue.Queue):
+        while True:
+            due, data = pending.get()
+            wait = due - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            if not data:
+                with contextlib.suppress(OSError):
+                    destination.shutdown(socket.SHUT_WR)
+                return
+            try:
+                destination.sendall(data)
+            except OSError:
+                return
+
+
+class EchoServer:
+    """Completes the HELLO/READY handshake, then answers every message with its length"""
+
+    def __init__(self, transfer_module, window_size: int):
+        self.transfer = transfer_module.ServerFileTransfer(window_size=window_size)
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            conn, _ = self.listener.accept()
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn: socket.socket):
+        with conn:
+            try:
+                if self.transfer.receive_from_client(conn) != "HELLO Server":
+                    return
+                self.transfer.send_to_client(conn, "READY")
+                while True:
+                    self.transfer.send_to_client(conn, len(self.transfer.receive_from_client(conn)))
+            except Exception:
+                return
+
+
+def check_unaligned_windows(server_module, client_module, timeout: float = 10.0) -> None:
+    """
+    Send both ways under windows that are not a multiple of the chunk size, with
+    ack_every equal to the window, which once stalled the sender for good.
+    """
+    for window in (10000, 100000, 3 * 8192 + 1):
+        flow = {"window": window, "ack_every": window}
+        server = server_module.ServerFileTransfer()
+        client = client_module.ClientFileTransfer()
+        server_side, client_side = socket.socketpair()
+        with server_side, client_side:
+            for sock in (server_side, client_side):
+                sock.settimeout(timeout)
+            server._flows[server_side] = dict(flow)
+            client._flows[client_side] = dict(flow)
+            document = "u" * (5 * window + 123)
+            replies = []
+            peer = threading.Thread(target=lambda: replies.append(client.receive_from_server(client_side)))
+            peer.start()
+            server.send_to_client(server_side, document)
+            peer.join()
+            peer = threading.Thread(target=lambda: client.send_to_server(client_side, document))
+            peer.start()
+            if server.receive_from_client(server_side) != document or replies != [document]:
+                raise RuntimeError(f"Window {window} corrupted the document")
+            peer.join()
+
+
+def measure(client_module, server_port: int, rtt_ms: float, window_kib: int, size: int,
+            repeats: int) -> Dict[str, Any]:
+    proxy = DelayProxy(server_port, rtt_ms / 2000)
+    # No codecs offered: the repeated-character document would otherwise shrink to almost nothing
+    transfer = client_module.ClientFileTransfer(window_size=window_kib * 1024,
+                                                ack_interval=max(8192, window_kib * 1024 // 4), codecs=[])
+    document = "x" * size
+    best = float("inf")
+    with socket.create_connection(("127.0.0.1", proxy.port)) as sock:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        transfer.send_to_server(sock, "HELLO Server")
+        if transfer.receive_from_server(sock) != "READY":
+            raise RuntimeError("Handshake failed")
+        windowed = bool(transfer._flows.get(sock))
+        for _ in range(repeats):
+            start = time.perf_counter()
+            transfer.send_to_server(sock, document)
+            if transfer.receive_from_server(sock) != size:
+                raise RuntimeError("Server received a different document")
+            best = min(best, time.perf_counter() - start)
+    return {
+        "rtt_ms": rtt_ms,
+        "mode": f"window {window_kib} KiB" if window_kib else "stop-and-wait",
+        "windowed": windowed,
+        "size_bytes": size,
+        "seconds": best,
+        "throughput_mb_s": size / best / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarizer upload throughput, stop-and-wait vs sliding window")
+    parser.add_argument("--rtts", type=float, nargs="+", default=[0, 10, 50], help="Round-trip times in ms")
+    parser.add_argument("--windows", type=int, nargs="+", default=[64, 256, 1024], help="Window sizes in KiB")
+    parser.add_argument("--size", type=float, default=1, help="Document size in MiB")
+    parser.add_argument("--repeats", type=int, default=2, help="Uploads per mode; the fastest is reported")
+    parser.add_argument("--output", help="Optional JSON file to write")
+    args = parser.parse_args()
+
+    server_module = load_transfer_module("server")
+    client_module = load_transfer_module("client")
+    with contextlib.redirect_stdout(io.StringIO()):
+        check_unaligned_windows(server_module, client_module)
+    server = EchoServer(server_module, max(args.windows) * 1024)
+    size = int(args.size * (1 << 20))
+
+    results: List[Dict[str, Any]] = []
+    for rtt_ms in args.rtts:
+        for window_kib in [0] + args.windows:
+            # The server logs every acknowledgement
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = measure(client_module, server.port, rtt_ms, window_kib, size, args.repeats)
+            results.append(result)
+            print(f"rtt={rtt_ms:5.1f}ms mode={result['mode']:17} "
+                  f"throughput={result['throughput_mb_s']:8.2f}MB/s time={result['seconds']:.3f}s")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+TLS handshakes per second through SSLConnectionHandler over loopback.
+
+A server thread accepts connections, completes the handshake and sends one
+byte; the client connects, reads it and closes. Three modes are compared:
+
+- uncached: a new SSLContext on both sides for every connection, as
+  create_secure_socket used to build, so every handshake is a full one
+- cached: contexts from get_ssl_context, still full handshakes
+- resumed: cached contexts plus session-ticket resumption in connect()
+
+TLS 1.3 resumption still runs an ECDHE exchange and only skips the
+certificate, while TLS 1.2 resumption skips the key exchange as well;
+--max-version picks the protocol.
+
+A self-signed certificate is generated with the openssl command line tool
+unless --certfile and --keyfile are given. Client and server share this
+process, so the rate includes both sides' CPU.
+
+Run from the repository root:
+    python -m benchmarks.tls_handshake --connections 500
+"""
+import argparse
+import json
+import os
+import socket
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Tuple
+
+from security.ssl_handler import SSLConnectionHandler
+
+MODES = ("uncached", "cached", "resumed")
+VERSIONS = {"1.2": ssl.TLSVersion.TLSv1_2, "1.3": ssl.TLSVersion.TLSv1_3}
+
+
+def make_certificate(directory: str):
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes",
+         "-days", "1", "-subj", "/CN=localhost", "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1",
+         "-keyout", keyfile, "-out", certfile],
+        check=True, capture_output=True
+    )
+    return certfile, keyfile
+
+
+class HandshakeServer:
+    def __init__(self, certfile: str, keyfile: str):
+        self.certfile = certfile
+        self.keyfile = keyfile
+        self.cached = True
+        self.max_version = ssl.TLSVersion.MAXIMUM_SUPPORTED
+        self.server_socket, _ = SSLConnectionHandler.create_secure_socket("127.0.0.1", 0, is_server=True,
+                                                                         certfile=certfile, keyfile=keyfile)
+        self.port = self.server_socket.getsockname()[1]
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def _serve(self):
+        while True:
+            conn, _ = self.server_socket.accept()
+            if self.cached:
+                context = SSLConnectionHandler.get_ssl_context(True, self.certfile, self.keyfile)
+            else:
+                context = SSLConnectionHandler.create_ssl_context(True, self.certfile, self.keyfile)
+                context.maximum_version = self.max_version
+            try:
+                with SSLConnectionHandler.wrap_socket(conn, context, server_side=True) as secure_conn:
+                    secure_conn.sendall(b"1")
+            except (ssl.SSLError, OSError):
+                conn.close()
+
+
+def handshake(mode: str, port: int, certfile: str, max_version: ssl.TLSVersion) -> Tuple[bool, str]:
+    if mode == "uncached":
+        context = SSLConnectionHandler.create_ssl_context(False, cafile=certfile)
+        context.maximum_version = max_version
+        secure_sock = SSLConnectionHandler.wrap_socket(socket.create_connection(("127.0.0.1", port)), context,
+                                                       server_hostname="localhost")
+    else:
+        secure_sock = SSLConnectionHandler.connect("127.0.0.1", port, cafile=certfile, server_hostname="localhost",
+                                                   resume=mode == "resumed")
+    with secure_sock:
+        secure_sock.recv(1)
+        if mode == "resumed":
+            # TLS 1.3 tickets arrive after the handshake
+            SSLConnectionHandler.remember_session(secure_sock, "127.0.0.1", port, "localhost")
+        return secure_sock.session_reused, secure_sock.version()
+
+
+def measure(mode: str, server: HandshakeServer, connections: int, max_version: ssl.TLSVersion) -> Dict[str, Any]:
+    SSLConnectionHandler.clear_cache()
+    server.cached = mode != "uncached"
+    server.max_version = max_version
+    SSLConnectionHandler.get_ssl_context(True, server.certfile, server.keyfile).maximum_version = max_version
+    SSLConnectionHandler.get_ssl_context(False, cafile=server.certfile).maximum_version = max_version
+    # Warm up: caches, and the first session to resume
+    _, version = handshake(mode, server.port, server.certfile, max_version)
+
+    reused = 0
+    start, start_cpu = time.perf_counter(), time.process_time()
+    for _ in range(connections):
+        reused += handshake(mode, server.port, server.certfile, max_version)[0]
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "connections": connections,
+        "handshakes_per_second": connections / elapsed,
+        "cpu_ms_per_handshake": (time.process_time() - start_cpu) / connections * 1e3,
+        "resumed_fraction": reused / connections,
+        "tls_version": version,
+        "openssl": ssl.OPENSSL_VERSION,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TLS handshakes per second with and without session resumption")
+    parser.add_argument("--connections", type=int, default=500, help="Handshakes per mode")
+    parser.add_argument("--certfile", help="Server certificate (PEM); generated when omitted")
+    parser.add_argument("--keyfile", help="Server private key (PEM)")
+    parser.add_argument("--max-version", choices=("1.2", "1.3"), default="1.3", help="Highest TLS version offered")
+    parser.add_argument("--output", help="Optional JSON file to write")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.certfile and args.keyfile:
+            certfile, keyfile = args.certfile, args.keyfile
+        else:
+            certfile, keyfile = make_certificate(directory)
+        server = HandshakeServer(certfile, keyfile)
+
+        results = []
+        for mode in MODES:
+            result = measure(mode, server, args.connections, VERSIONS[args.max_version])
+            results.append(result)
+            print(f"mode={mode:9} {result['tls_version']} handshakes={result['handshakes_per_second']:8.1f}/s "
+                  f"cpu={result['cpu_ms_per_handshake']:.2f}ms resumed={result['resumed_fraction']:.0%}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
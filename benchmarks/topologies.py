@@ -0,0 +1,164 @@
+"""
+Parameterized topology generators for RIP benchmarks.
+
+Every generator is deterministic for a given seed and returns a Topology
+whose router names are "R0".."R{n-1}", so successive scenarios in one
+process reuse the same interned router ids.
+"""
+import math
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+Link = Tuple[str, str, int]
+
+
+@dataclass
+class Topology:
+    name: str
+    routers: List[str]
+    links: List[Link]
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+def _names(count: int) -> List[str]:
+    return [f"R{i}" for i in range(count)]
+
+
+def cost_sampler(distribution: str, rng: random.Random, max_cost: int = 10) -> Callable[[], int]:
+    """
+    Return a function drawing link costs from a named distribution
+
+    Args:
+        distribution (str): "unit" (always 1), "uniform" (1..max_cost) or
+            "exponential" (1 + exponential with mean max_cost / 4, capped at max_cost)
+        rng (random.Random): Seeded random source
+        max_cost (int): Largest cost produced
+
+    Returns:
+        Callable[[], int]: Cost sampler
+    """
+    if distribution == "unit":
+        return lambda: 1
+    if distribution == "uniform":
+        return lambda: rng.randint(1, max_cost)
+    if distribution == "exponential":
+        return lambda: min(max_cost, 1 + int(rng.expovariate(4 / max_cost)))
+    raise ValueError(f"Unknown cost distribution: {distribution}")
+
+
+def ring(size: int, seed: int = 0, costs: str = "unit", max_cost: int = 10) -> Topology:
+    """Routers connected in a single cycle"""
+    rng = random.Random(seed)
+    cost = cost_sampler(costs, rng, max_cost)
+    names = _names(size)
+    links = [(names[i], names[(i + 1) % size], cost()) for i in range(size if size > 2 else size - 1)]
+    return Topology("ring", names, links, {"size": size, "seed": seed, "costs": costs})
+
+
+def grid(rows: int, cols: int, seed: int = 0, costs: str = "unit", max_cost: int = 10) -> Topology:
+    """Routers on a rows x cols mesh, each linked to its right and lower neighbor"""
+    rng = random.Random(seed)
+    cost = cost_sampler(costs, rng, max_cost)
+    names = _names(rows * cols)
+    links = []
+    for r in range(rows):
+        for c in range(cols):
+            here = names[r * cols + c]
+            if c + 1 < cols:
+                links.append((here, names[r * cols + c + 1], cost()))
+            if r + 1 < rows:
+                links.append((here, names[(r + 1) * cols + c], cost()))
+    return Topology("grid", names, links, {"rows": rows, "cols": cols, "seed": seed, "costs": costs})
+
+
+def random_geometric(size: int, radius: float, seed: int = 0, costs: str = "distance",
+                     max_cost: int = 10) -> Topology:
+    """
+    Routers placed uniformly in the unit square, linked when closer than ``radius``
+
+    With costs="distance" each link costs its length scaled to 1..max_cost.
+    """
+    rng = random.Random(seed)
+    names = _names(size)
+    points = [(rng.random(), rng.random()) for _ in range(size)]
+    cost = None if costs == "distance" else cost_sampler(costs, rng, max_cost)
+
+    # Bucket points into radius-sized cells so only adjacent cells are compared
+    cells: Dict[Tuple[int, int], List[int]] = {}
+    for i, (x, y) in enumerate(points):
+        cells.setdefault((int(x / radius), int(y / radius)), []).append(i)
+
+    links = []
+    for (cx, cy), members in cells.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in cells.get((cx + dx, cy + dy), ()):
+                    for i in members:
+                        if i >= j:
+                            continue
+                        distance = math.dist(points[i], points[j])
+                        if distance < radius:
+                            link_cost = (max(1, math.ceil(max_cost * distance / radius))
+                                         if cost is None else cost())
+                            links.append((names[i], names[j], link_cost))
+    links.sort(key=lambda link: (int(link[0][1:]), int(link[1][1:])))
+    return Topology("random_geometric", names, links,
+                    {"size": size, "radius": radius, "seed": seed, "costs": costs})
+
+
+def barabasi_albert(size: int, attach: int = 2, seed: int = 0, costs: str = "unit",
+                    max_cost: int = 10) -> Topology:
+    """Preferential-attachment graph: each new router links to ``attach`` existing ones"""
+    if attach < 1 or attach >= size:
+        raise ValueError("attach must be between 1 and size - 1")
+    rng = random.Random(seed)
+    cost = cost_sampler(costs, rng, max_cost)
+    names = _names(size)
+
+    links = []
+    # Start from a small clique so early routers have non-zero degree
+    for i in range(attach + 1):
+        for j in range(i):
+            links.append((names[i], names[j], cost()))
+    # Each router appears once per incident link, making sampling degree-proportional
+    endpoints = [i for i in range(attach + 1) for _ in range(attach)]
+
+    for new in range(attach + 1, size):
+        targets = set()
+        while len(targets) < attach:
+            targets.add(rng.choice(endpoints))
+        for target in sorted(targets):
+            links.append((names[new], names[target], cost()))
+            endpoints.extend((new, target))
+    return Topology("barabasi_albert", names, links,
+                    {"size": size, "attach": attach, "seed": seed, "costs": costs})
+
+
+def fat_tree(k: int, seed: int = 0, costs: str = "unit", max_cost: int = 10) -> Topology:
+    """
+    k-ary fat-tree of switches: (k/2)^2 core, k pods of k/2 aggregation and k/2 edge
+
+    Args:
+        k (int): Even port count per switch
+    """
+    if k < 2 or k % 2:
+        raise ValueError("k must be an even number >= 2")
+    rng = random.Random(seed)
+    cost = cost_sampler(costs, rng, max_cost)
+    half = k // 2
+    core_count = half * half
+    names = _names(core_count + k * k)
+
+    links = []
+    for pod in range(k):
+        base = core_count + pod * k
+        aggregation = range(base, base + half)
+        edge = range(base + half, base + k)
+        for a in aggregation:
+            for e in edge:
+                links.append((names[a], names[e], cost()))
+        for position, a in enumerate(aggregation):
+            for c in range(position * half, (position + 1) * half):
+                links.append((names[c], names[a], cost()))
+    return Topology("fat_tree", names, links, {"k": k, "seed": seed, "costs": costs})
@@ -0,0 +1,115 @@
+import heapq
+import itertools
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class Event:
+    __slots__ = ("time", "callback", "args", "cancelled")
+
+    def __init__(self, time: float, callback: Callable, args: Tuple[Any, ...]):
+        self.time = time
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """Cancel the event; it stays in the heap but is skipped when popped"""
+        self.cancelled = True
+
+
+class EventScheduler:
+    """
+    Discrete-event scheduler driven by a virtual clock.
+
+    Events are kept in a heap ordered by (time, insertion order), so runs are
+    fully deterministic: events at the same instant fire in the order they
+    were scheduled. The clock jumps straight to the next event instead of
+    sleeping.
+    """
+
+    def __init__(self, start_time: float = 0.0):
+        self.now = start_time
+        self.events_processed = 0
+        self._queue: List[Tuple[float, int, Event]] = []
+        self._sequence = itertools.count()
+        self._stopped = False
+
+    def clock(self) -> float:
+        """Return the current virtual time"""
+        return self.now
+
+    def schedule(self, delay: float, callback: Callable, *args) -> Event:
+        """
+        Schedule a callback relative to the current virtual time
+
+        Args:
+            delay (float): Seconds from now (must not be negative)
+            callback (Callable): Function to invoke
+            *args: Positional arguments for the callback
+
+        Returns:
+            Event: Handle that can be cancelled
+        """
+        if delay < 0:
+            raise ValueError("Cannot schedule an event in the past")
+        return self.schedule_at(self.now + delay, callback, *args)
+
+    def schedule_at(self, when: float, callback: Callable, *args) -> Event:
+        """
+        Schedule a callback at an absolute virtual time
+
+        Args:
+            when (float): Virtual time at which to fire
+            callback (Callable): Function to invoke
+            *args: Positional arguments for the callback
+
+        Returns:
+            Event: Handle that can be cancelled
+        """
+        if when < self.now:
+            raise ValueError("Cannot schedule an event in the past")
+        event = Event(when, callback, args)
+        heapq.heappush(self._queue, (when, next(self._sequence), event))
+        return event
+
+    def stop(self):
+        """Make the current run() return after the event being processed"""
+        self._stopped = True
+
+    def pending(self) -> int:
+        """Return the number of queued events, including cancelled ones"""
+        return len(self._queue)
+
+    def run(self, until: Optional[float] = None, max_events: Optional[int] = None) -> int:
+        """
+        Process events in time order
+
+        Args:
+            until (float, optional): Stop before any event later than this time;
+                the clock is advanced to ``until`` when the run ends there
+            max_events (int, optional): Stop after this many events
+
+        Returns:
+            int: Number of events processed by this call
+        """
+        self._stopped = False
+        processed = 0
+        queue = self._queue
+
+        while queue and not self._stopped:
+            if max_events is not None and processed >= max_events:
+                break
+            when, _, event = queue[0]
+            if until is not None and when > until:
+                break
+            heapq.heappop(queue)
+            if event.cancelled:
+                continue
+            self.now = when
+            event.callback(*event.args)
+            processed += 1
+
+        if until is not None and not self._stopped and (not queue or queue[0][0] > until):
+            self.now = max(self.now, until)
+        self.events_processed += processed
+        return processed
@@ -0,0 +1,246 @@
+import ipaddress
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+from core.routing_table import ABSENT, RoutingTable
+
+# An IPv4 prefix as (network address, prefix length), with the host bits zero
+Prefix = Tuple[int, int]
+
+ADDRESS_BITS = 32
+
+# The first JUMP_BITS address bits index a table that lets lookups skip the top of the trie
+JUMP_BITS = 16
+
+# Trie node slots; nodes are plain lists, which unpack and index faster than attributes
+_KEY, _SHIFT, _VALUE, _ZERO, _ONE = range(5)
+
+
+def parse_prefix(prefix: Union[str, ipaddress.IPv4Network, Prefix]) -> Prefix:
+    """
+    Normalize a CIDR prefix to ``(network, length)``
+
+    Args:
+        prefix (Union[str, IPv4Network, Prefix]): ``"10.1.0.0/16"``, an IPv4Network
+            or an already parsed tuple
+
+    Returns:
+        Prefix: Network address as an integer and the prefix length
+
+    Raises:
+        ValueError: If the prefix is not valid IPv4 CIDR or has host bits set
+    """
+    if isinstance(prefix, tuple):
+        network, length = prefix
+        if not 0 <= length <= ADDRESS_BITS or network & ~_mask(length) & 0xFFFFFFFF:
+            raise ValueError(f"Invalid prefix {prefix}")
+        return network, length
+    network = ipaddress.IPv4Network(prefix)
+    return int(network.network_address), network.prefixlen
+
+
+def format_prefix(prefix: Prefix) -> str:
+    """Return a ``(network, length)`` prefix in CIDR notation"""
+    return f"{ipaddress.IPv4Address(prefix[0])}/{prefix[1]}"
+
+
+def _mask(length: int) -> int:
+    return (0xFFFFFFFF << (ADDRESS_BITS - length)) & 0xFFFFFFFF
+
+
+class PrefixTrie:
+    """
+    Longest-prefix-match table over IPv4 prefixes: a binary Patricia trie.
+
+    Chains of single-child nodes are collapsed, so every node either holds a
+    value or branches, and a lookup visits one node per distinct prefix
+    length on its path rather than one per address bit. Each node is
+    ``[key, shift, value, zero, one]``: ``key`` holds the bits every prefix
+    below it shares, ``32 - shift`` of them, and ``zero``/``one`` are the
+    children for the next bit.
+
+    The nodes above JUMP_BITS depend only on the first JUMP_BITS address
+    bits, so lookups start from a table indexed by them that records the
+    node to resume at and the best value found above it. The table is
+    rebuilt on the first lookup after an insert.
+    """
+
+    def __init__(self):
+        # The root covers 0.0.0.0/0; it holds a value only for a default route
+        self._root: List[Any] = [0, ADDRESS_BITS, None, None, None]
+        self._size = 0
+        self._jump_nodes: Optional[List[Optional[list]]] = None
+        self._jump_best: List[Any] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def insert(self, prefix: Prefix, value: Any):
+        """
+        Add a prefix or replace its value
+
+        Args:
+            prefix (Prefix): ``(network, length)`` with the host bits zero
+            value (Any): Returned by lookup for addresses this prefix matches best; not None
+        """
+        if value is None:
+            raise ValueError("None marks prefixes without a value")
+        key, length = prefix
+        shift = ADDRESS_BITS - length
+        self._jump_nodes = None
+        node = self._root
+        while True:
+            if shift == node[_SHIFT]:
+                if node[_VALUE] is None:
+                    self._size += 1
+                node[_VALUE] = value
+                return
+            side = _ZERO + ((key >> (node[_SHIFT] - 1)) & 1)
+            child = node[side]
+            if child is None:
+                node[side] = [key, shift, value, None, None]
+                self._size += 1
+                return
+
+            # Host bits the new prefix and the child's key do not have in common
+            common_shift = max(shift, child[_SHIFT], (key ^ child[_KEY]).bit_length())
+            if common_shift == child[_SHIFT]:
+                node = child
+                continue
+
+            # Split the edge: a node for the shared bits takes the child and the new prefix
+            middle = [key >> common_shift << common_shift, common_shift, None, None, None]
+            middle[_ZERO + ((child[_KEY] >> (common_shift - 1)) & 1)] = child
+            if common_shift == shift:
+                middle[_VALUE] = value
+            else:
+                middle[_ZERO + ((key >> (common_shift - 1)) & 1)] = [key, shift, value, None, None]
+            node[side] = middle
+            self._size += 1
+            return
+
+    def lookup(self, address: int) -> Optional[Any]:
+        """
+        Find the value of the longest prefix containing an address
+
+        Args:
+            address (int): IPv4 address as an integer
+
+        Returns:
+            Optional[Any]: Value of the best matching prefix, or None if none matches
+        """
+        jump_nodes = self._jump_nodes
+        if jump_nodes is None:
+            jump_nodes = self._build_jump_table()
+        slot = address >> (ADDRESS_BITS - JUMP_BITS)
+        best = self._jump_best[slot]
+        node = jump_nodes[slot]
+        while node is not None:
+            key, shift, value, zero, one = node
+            # Stop at the first node whose key the address leaves; nothing below it matches either
+            if (address ^ key) >> shift:
+                break
+            if value is not None:
+                best = value
+            if not shift:
+                break
+            node = one if (address >> (shift - 1)) & 1 else zero
+        return best
+
+    def _build_jump_table(self) -> List[Optional[list]]:
+        """Record, per value of the first JUMP_BITS bits, where lookups resume and what matched above"""
+        slots = 1 << JUMP_BITS
+        nodes: List[Optional[list]] = [None] * slots
+        best: List[Any] = [None] * slots
+        # Nodes still above the jump depth, with the best value found on the way to them
+        stack = [(self._root, None)]
+        while stack:
+            node, above = stack.pop()
+            first = node[_KEY] >> (ADDRESS_BITS - JUMP_BITS)
+            if node[_SHIFT] <= ADDRESS_BITS - JUMP_BITS:
+                # Lookups in this slot continue from here
+                nodes[first] = node
+                best[first] = above
+                continue
+            if node[_VALUE] is not None:
+                above = node[_VALUE]
+            half = 1 << (node[_SHIFT] - 1 - (ADDRESS_BITS - JUMP_BITS))
+            for side, start in ((_ZERO, first), (_ONE, first + half)):
+                # Slots the child does not cover stop at this node's best value
+                best[start:start + half] = [above] * half
+                if node[side] is not None:
+                    stack.append((node[side], above))
+        self._jump_nodes, self._jump_best = nodes, best
+        return nodes
+
+    def get(self, prefix: Prefix) -> Optional[Any]:
+        """Return the value stored for exactly this prefix, or None"""
+        key, length = prefix
+        shift = ADDRESS_BITS - length
+        node = self._root
+        while node is not None and node[_SHIFT] > shift:
+            if (key ^ node[_KEY]) >> node[_SHIFT]:
+                return None
+            node = node[_ZERO + ((key >> (node[_SHIFT] - 1)) & 1)]
+        if node is None or node[_SHIFT] != shift or node[_KEY] != key:
+            return None
+        return node[_VALUE]
+
+    def items(self) -> Iterator[Tuple[Prefix, Any]]:
+        """Yield every ``(prefix, value)`` pair in address order"""
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node[_VALUE] is not None:
+                yield (node[_KEY], ADDRESS_BITS - node[_SHIFT]), node[_VALUE]
+            stack.extend(child for child in (node[_ONE], node[_ZERO]) if child is not None)
+
+
+def linear_lookup(prefixes: Iterable[Tuple[Prefix, Any]], address: int) -> Optional[Any]:
+    """
+    Longest-prefix match by scanning every prefix; the baseline PrefixTrie replaces
+
+    Args:
+        prefixes (Iterable[Tuple[Prefix, Any]]): ``(prefix, value)`` pairs
+        address (int): IPv4 address as an integer
+
+    Returns:
+        Optional[Any]: Value of the best matching prefix, or None if none matches
+    """
+    best = None
+    best_length = -1
+    for (key, length), value in prefixes:
+        if length > best_length and (address ^ key) >> (ADDRESS_BITS - length) == 0:
+            best, best_length = value, length
+    return best
+
+
+def build_fib(routing_table: RoutingTable, origins: Mapping[int, Iterable[Prefix]]) -> PrefixTrie:
+    """
+    Build a forwarding table from a router's RIB
+
+    Every prefix is reached through the route to the router that originates
+    it. A prefix originated by several routers (anycast) goes to the nearest
+    one, with ties to the lower next-hop index as in the routing table.
+
+    Args:
+        routing_table (RoutingTable): The router's routes, keyed by interned router id
+        origins (Mapping[int, Iterable[Prefix]]): Prefixes advertised by each interned router id
+
+    Returns:
+        PrefixTrie: Maps each reachable prefix to ``(next_hop, cost)``
+    """
+    best: Dict[Prefix, Tuple[int, int]] = {}
+    for origin, prefixes in origins.items():
+        cost = routing_table.cost_of(origin)
+        if cost == ABSENT:
+            continue
+        route = (routing_table.next_hop_of(origin), cost)
+        for prefix in prefixes:
+            current = best.get(prefix)
+            if current is None or (cost, route[0]) < (current[1], current[0]):
+                best[prefix] = route
+
+    fib = PrefixTrie()
+    for prefix, route in best.items():
+        fib.insert(prefix, route)
+    return fib
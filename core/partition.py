@@ -0,0 +1,258 @@
+import logging
+import multiprocessing
+import time
+from array import array
+from collections import deque
+from typing import Dict, List, Mapping, Optional, Set
+
+from core.router import Router
+from core.routing_table import ABSENT, router_ids
+from core.stats import ConvergenceStats
+
+logger = logging.getLogger(__name__)
+
+
+def partition_topology(routers: Mapping[str, Router], topology: Mapping[str, Mapping[str, int]],
+                       parts: int) -> List[List[str]]:
+    """
+    Split routers into balanced parts that keep neighbors together
+
+    Routers are ordered breadth-first (component by component, lowest router
+    index first) and the order is cut into ``parts`` contiguous runs of equal
+    size, so most links stay inside a part.
+
+    Args:
+        routers (Mapping[str, Router]): Routers keyed by id
+        topology (Mapping[str, Mapping[str, int]]): Link costs keyed by router id
+        parts (int): Number of parts
+
+    Returns:
+        List[List[str]]: Router ids of each part, in router index order
+    """
+    if parts < 1:
+        raise ValueError("parts must be at least 1")
+
+    ordered = sorted(routers.values(), key=lambda router: router.index)
+    index_of = {router.id: router.index for router in ordered}
+    seen: Set[str] = set()
+    bfs_order: List[str] = []
+
+    for root in ordered:
+        if root.id in seen:
+            continue
+        seen.add(root.id)
+        queue = deque([root.id])
+        while queue:
+            router_id = queue.popleft()
+            bfs_order.append(router_id)
+            neighbors = sorted((n for n in topology.get(router_id, {}) if n in index_of and n not in seen),
+                               key=index_of.get)
+            seen.update(neighbors)
+            queue.extend(neighbors)
+
+    size, extra = divmod(len(bfs_order), parts)
+    result = []
+    start = 0
+    for part in range(parts):
+        stop = start + size + (1 if part < extra else 0)
+        result.append(sorted(bfs_order[start:stop], key=index_of.get))
+        start = stop
+    return result
+
+
+def _table_arrays(router: Router):
+    """Return a router's table as raw (cost, next_hop) bytes"""
+    costs = array('i', [ABSENT]) * len(router_ids)
+    next_hops = array('i', [ABSENT]) * len(router_ids)
+    for dest, cost, next_hop in router.routing_table.entries():
+        costs[dest] = cost
+        next_hops[dest] = next_hop
+    return costs.tobytes(), next_hops.tobytes()
+
+
+def _encode_changes(router: Router, since: int) -> bytes:
+    """Pack the entries changed since ``since`` as flat (dest, cost, next_hop) int triples"""
+    packed = array('i')
+    for entry in router.routing_table.changes_since(since):
+        packed.extend(entry)
+    return packed.tobytes()
+
+
+def _apply_changes(router: Router, payload: bytes, now: float):
+    """Apply triples produced by _encode_changes to a ghost router's table"""
+    values = array('i', payload)
+    table = router.routing_table
+    for i in range(0, len(values), 3):
+        dest, cost, next_hop = values[i], values[i + 1], values[i + 2]
+        if cost == ABSENT:
+            table.remove_route(dest)
+        else:
+            table.set_route(dest, cost, next_hop, now)
+
+
+def _partition_worker(conn, names: List[str], owned: List[str], adjacency: Dict[str, Dict[str, int]],
+                      tables: Dict[str, tuple], exported: List[str]):
+    """
+    Run update rounds for one part of the network
+
+    Protocol (all messages are tuples over ``conn``):
+        parent -> worker: ("round", {ghost_id: changes}) | ("collect",) | ("stop",)
+        worker -> parent: (changed, messages, route_changes, entries_processed, {exported_id: changes})
+                          | {router_id: (costs, next_hops)}
+    """
+    # Intern every id in the parent's order so integer indexes agree across processes
+    for name in names:
+        router_ids.intern(name)
+
+    routers: Dict[str, Router] = {}
+    for router_id, (costs, next_hops, advertise_mode, infinity) in tables.items():
+        router = Router(router_id, advertise_mode=advertise_mode, infinity=infinity)
+        router.routing_table.replace_routes(array('i', costs), array('i', next_hops), time.time())
+        routers[router_id] = router
+    sent_versions = {router_id: routers[router_id].routing_table.version for router_id in exported}
+
+    while True:
+        message = conn.recv()
+        if message[0] == "stop":
+            break
+        if message[0] == "collect":
+            conn.send({router_id: _table_arrays(routers[router_id]) for router_id in owned})
+            continue
+
+        now = time.time()
+        for ghost_id, payload in message[1].items():
+            _apply_changes(routers[ghost_id], payload, now)
+
+        changed = False
+        messages = 0
+        version_before = sum(routers[router_id].routing_table.version for router_id in owned)
+        processed_before = sum(routers[router_id].entries_processed for router_id in owned)
+        for router_id in owned:
+            router = routers[router_id]
+            for neighbor, link_cost in adjacency.get(router_id, {}).items():
+                messages += 1
+                sender = routers[neighbor]
+                if router.update_routing_table(sender.routing_table, neighbor, link_cost, now=now,
+                                               advertise_mode=sender.advertise_mode):
+                    changed = True
+
+        changes = {}
+        for router_id in exported:
+            table = routers[router_id].routing_table
+            if table.version != sent_versions[router_id]:
+                changes[router_id] = _encode_changes(routers[router_id], sent_versions[router_id])
+                sent_versions[router_id] = table.version
+        route_changes = sum(routers[router_id].routing_table.version for router_id in owned) - version_before
+        processed = sum(routers[router_id].entries_processed for router_id in owned) - processed_before
+        conn.send((changed, messages, route_changes, processed, changes))
+
+    conn.close()
+
+
+def run_partitioned(routers: Mapping[str, Router], topology: Mapping[str, Mapping[str, int]],
+                    parts: int, max_rounds: Optional[int] = None) -> ConvergenceStats:
+    """
+    Converge the network across ``parts`` worker processes and load the result into ``routers``
+
+    Each worker owns one part from partition_topology and keeps read-only
+    "ghost" copies of the routers across its cut links. After every round a
+    worker ships only the changed entries of its routers that some other part
+    borders on; the parent relays them to the workers holding those ghosts.
+    Rounds repeat until no worker changes a route. The converged tables are
+    the unique fixed point of Router.update_routing_table, so they are
+    identical to a single-process run.
+
+    Args:
+        routers (Mapping[str, Router]): Routers keyed by id
+        topology (Mapping[str, Mapping[str, int]]): Link costs keyed by router id
+        parts (int): Number of worker processes
+        max_rounds (int, optional): Give up after this many rounds
+
+    Returns:
+        ConvergenceStats: Convergence metrics for the run
+    """
+    stats = ConvergenceStats()
+    start = time.perf_counter()
+    partition = partition_topology(routers, topology, parts)
+    owner = {router_id: part for part, members in enumerate(partition) for router_id in members}
+    names = [router_ids.name(index) for index in range(len(router_ids))]
+
+    # ghost_holders[r] = parts that need router r's table because they border it
+    ghost_holders: Dict[str, Set[int]] = {}
+    for router_id, links in topology.items():
+        if router_id not in owner:
+            continue
+        for neighbor in links:
+            if neighbor in owner and owner[neighbor] != owner[router_id]:
+                ghost_holders.setdefault(neighbor, set()).add(owner[router_id])
+
+    context = multiprocessing.get_context()
+    connections = []
+    processes = []
+    for part, members in enumerate(partition):
+        ghosts = {n for m in members for n in topology.get(m, {}) if n in owner and owner[n] != part}
+        adjacency = {m: {n: c for n, c in topology.get(m, {}).items() if n in owner} for m in members}
+        tables = {
+            router_id: _table_arrays(routers[router_id]) + (routers[router_id].advertise_mode,
+                                                            routers[router_id].infinity)
+            for router_id in list(members) + sorted(ghosts)
+        }
+        exported = [m for m in members if m in ghost_holders]
+
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(
+            target=_partition_worker,
+            args=(child_conn, names, members, adjacency, tables, exported),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        connections.append(parent_conn)
+        processes.append(process)
+
+    try:
+        inbox: List[Dict[str, bytes]] = [{} for _ in partition]
+        cut_bytes = 0
+        executed = 0
+        while max_rounds is None or executed < max_rounds:
+            for part, conn in enumerate(connections):
+                conn.send(("round", inbox[part]))
+            inbox = [{} for _ in partition]
+
+            any_changed = False
+            for conn in connections:
+                changed, messages, route_changes, processed, changes = conn.recv()
+                any_changed = any_changed or changed
+                stats.messages += messages
+                stats.route_changes += route_changes
+                stats.entries_processed += processed
+                for router_id, payload in changes.items():
+                    cut_bytes += len(payload)
+                    for part in ghost_holders[router_id]:
+                        inbox[part][router_id] = payload
+            executed += 1
+            if not any_changed:
+                stats.converged = True
+                break
+            stats.rounds += 1
+
+        now = time.time()
+        for conn in connections:
+            conn.send(("collect",))
+            for router_id, (costs, next_hops) in conn.recv().items():
+                routers[router_id].routing_table.replace_routes(array('i', costs), array('i', next_hops), now)
+    finally:
+        for conn in connections:
+            try:
+                conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            conn.close()
+        for process in processes:
+            process.join()
+
+    stats.peak_table_size = max((len(router.routing_table) for router in routers.values()), default=0)
+    stats.wall_time = time.perf_counter() - start
+    logger.info(f"Partitioned run over {parts} workers: {stats.rounds} rounds, "
+                f"{cut_bytes} bytes exchanged across cut links")
+    return stats
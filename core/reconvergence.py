@@ -0,0 +1,141 @@
+import heapq
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from core.router import Router
+from core.routing_table import ABSENT
+
+
+class RouteAudit:
+    """
+    Tracks which installed routes are wrong while a network reconverges.
+
+    True distances are computed once for the new topology (Dijkstra from
+    every destination, capped at the routers' infinity). A route is wrong
+    when its cost is not the true distance or its next hop is not on a
+    shortest path, when it leads to an unreachable destination, or when it
+    is missing although the destination is reachable.
+    After the initial scan only changed entries are re-checked, and loop
+    detection only walks next-hop chains that start at a wrong route, since
+    a chain of correct routes strictly decreases in distance and cannot loop.
+    """
+
+    def __init__(self, routers: Mapping[str, Router], topology: Mapping[str, Mapping[str, int]],
+                 infinity: Optional[int]):
+        self._routers = {router.index: router for router in routers.values()}
+        self._adjacency: Dict[int, Dict[int, int]] = {
+            routers[router_id].index: {routers[n].index: cost for n, cost in links.items() if n in routers}
+            for router_id, links in topology.items() if router_id in routers
+        }
+        self._infinity = infinity
+        self._distances: Dict[int, Dict[int, int]] = {
+            dest: self._shortest_distances(dest) for dest in self._routers
+        }
+        # dest -> routers whose route to dest is currently wrong
+        self.wrong: Dict[int, Set[int]] = {}
+        self._versions: Dict[int, int] = {}
+
+        for index, router in self._routers.items():
+            table = router.routing_table
+            for dest in self._routers:
+                self._check(index, dest, table.cost_of(dest), table.next_hop_of(dest))
+            self._versions[index] = table.version
+
+    def _shortest_distances(self, dest: int) -> Dict[int, int]:
+        """Distance from every router to ``dest``; links are symmetric"""
+        distances = {dest: 0}
+        queue = [(0, dest)]
+        while queue:
+            distance, node = heapq.heappop(queue)
+            if distance > distances[node]:
+                continue
+            for neighbor, cost in self._adjacency.get(node, {}).items():
+                candidate = distance + cost
+                if self._infinity is not None and candidate >= self._infinity:
+                    continue
+                if candidate < distances.get(neighbor, candidate + 1):
+                    distances[neighbor] = candidate
+                    heapq.heappush(queue, (candidate, neighbor))
+        return distances
+
+    def _is_correct(self, router: int, dest: int, cost: int, next_hop: int) -> bool:
+        distances = self._distances.get(dest)
+        if distances is None or router not in distances:
+            return False
+        if router == dest:
+            return cost == 0
+        link_cost = self._adjacency.get(router, {}).get(next_hop)
+        return (cost == distances[router] and link_cost is not None and
+                next_hop in distances and distances[next_hop] + link_cost == cost)
+
+    def _check(self, router: int, dest: int, cost: int, next_hop: int):
+        if cost == ABSENT:
+            # A missing route is only wrong if the destination is reachable
+            wrong = router in self._distances.get(dest, ())
+        else:
+            wrong = not self._is_correct(router, dest, cost, next_hop)
+        if wrong:
+            self.wrong.setdefault(dest, set()).add(router)
+        else:
+            holders = self.wrong.get(dest)
+            if holders:
+                holders.discard(router)
+                if not holders:
+                    del self.wrong[dest]
+
+    def refresh(self, changed: Iterable[int]):
+        """
+        Re-check the entries that changed on the given routers since the last refresh
+
+        Args:
+            changed (Iterable[int]): Interned ids of routers whose tables changed
+        """
+        for index in changed:
+            router = self._routers.get(index)
+            if router is None:
+                continue
+            table = router.routing_table
+            for dest, cost, next_hop in table.changes_since(self._versions.get(index, 0)):
+                self._check(index, dest, cost, next_hop)
+            self._versions[index] = table.version
+
+    def wrong_routes(self) -> int:
+        """Return the number of installed routes that are currently wrong"""
+        return sum(len(holders) for holders in self.wrong.values())
+
+    def looping_routes(self) -> int:
+        """Return the number of wrong routes whose next-hop chain runs into a forwarding loop"""
+        looping = 0
+        for dest, holders in self.wrong.items():
+            # Routers known to reach dest (or a dead end) without looping, and known loopers
+            clean: Set[int] = set()
+            loops: Set[int] = set()
+            for start in holders:
+                path: List[int] = []
+                on_path: Set[int] = set()
+                node = start
+                while True:
+                    if node in clean:
+                        loop = False
+                        break
+                    if node in loops or node in on_path:
+                        loop = True
+                        break
+                    path.append(node)
+                    router = self._routers.get(node)
+                    next_hop = router.routing_table.next_hop_of(dest) if router else ABSENT
+                    if node == dest or next_hop == ABSENT:
+                        loop = False
+                        break
+                    on_path.add(node)
+                    node = next_hop
+                (loops if loop else clean).update(path)
+            looping += len(holders & loops)
+        return looping
+
+
+def affected_routers(topology: Mapping[str, Mapping[str, int]], seeds: Iterable[str]) -> Tuple[str, ...]:
+    """Return the seeds plus their current neighbors, without duplicates"""
+    result = dict.fromkeys(seeds)
+    for seed in list(result):
+        result.update(dict.fromkeys(topology.get(seed, {})))
+    return tuple(result)
@@ -1,50 +1,206 @@
+import itertools
+import sys
 import time
 import uuid
-from typing import Dict, Any
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from core.fib import Prefix, PrefixTrie, build_fib, parse_prefix
+from core.routing_table import ABSENT, RoutingTable, router_ids
+
+# RIP metric infinity: a destination at this cost or more is unreachable
+INFINITY = 16
+
+# Advertisement filtering modes, applied by the advertising router per neighbor
+ADVERTISE_ALL = "none"
+SPLIT_HORIZON = "split_horizon"
+POISON_REVERSE = "poison_reverse"
+ADVERTISE_MODES = (ADVERTISE_ALL, SPLIT_HORIZON, POISON_REVERSE)
 
 
 class Router:
-    def __init__(self, name: str = None):
+    __slots__ = ("id", "index", "routing_table", "interfaces", "advertise_mode", "infinity",
+                 "entries_processed", "entries_suppressed", "entries_poisoned", "garbage",
+                 "prefixes", "_peer_versions")
+
+    def __init__(self, name: str = None, advertise_mode: str = SPLIT_HORIZON, infinity: Optional[int] = INFINITY):
+        if advertise_mode not in ADVERTISE_MODES:
+            raise ValueError(f"Unknown advertise mode: {advertise_mode}")
         self.id = name if name else str(uuid.uuid4())
-        self.routing_table: Dict[str, Dict[str, Any]] = {
-            self.id: {
-                "cost": 0,
-                "next_hop": self.id,
-                "timestamp": time.time()
-            }
-        }
+        self.index = router_ids.intern(self.id)
+        self.routing_table = RoutingTable()
+        self.routing_table.set_route(self.index, 0, self.index, time.time())
         self.interfaces: Dict[str, Dict] = {}
+        # How this router filters the routes it advertises back to their next hop
+        self.advertise_mode = advertise_mode
+        self.infinity = infinity
+        # Neighbor entries received by update_routing_table (poisoned ones included)
+        self.entries_processed = 0
+        # Neighbor entries withheld by split horizon / sent poisoned by poison reverse
+        self.entries_suppressed = 0
+        self.entries_poisoned = 0
+        # Timed-out destinations awaiting garbage collection, with their timeout time
+        self.garbage: Dict[int, float] = {}
+        # CIDR prefixes this router originates; others reach them through the route to this router
+        self.prefixes: List[Prefix] = []
+        # Neighbor table version last consumed, keyed by interned neighbor id
+        self._peer_versions: Dict[int, int] = {}
 
-    def update_routing_table(self, neighbor_table: Dict, neighbor_id: str, link_cost: int) -> bool:
+    def forget_neighbor(self, neighbor_id: str):
+        """
+        Drop the exchange state for a neighbor so its next update is read in full
+
+        Args:
+            neighbor_id (str): ID of the neighboring router
+        """
+        self._peer_versions.pop(router_ids.intern(neighbor_id), None)
+
+    def expire_neighbor(self, neighbor_id: str, now: float = None) -> List[int]:
+        """
+        Time out every route learned through a neighbor that has gone silent
+
+        The routes are withdrawn from the routing table (so neighbors drop them
+        on their next exchange) and held in ``garbage`` until collect_garbage.
+
+        Args:
+            neighbor_id (str): ID of the silent neighbor
+            now (float, optional): Timeout time; defaults to wall-clock time
+
+        Returns:
+            List[int]: Interned destinations that timed out
+        """
+        current_time = time.time() if now is None else now
+        neighbor = router_ids.intern(neighbor_id)
+        table = self.routing_table
+
+        expired = [dest for dest in table.routes_via(neighbor) if dest != self.index]
+        for dest in expired:
+            table.remove_route(dest)
+            self.garbage[dest] = current_time
+
+        if expired:
+            # Other neighbors may still reach these destinations; re-read them in full
+            self._peer_versions.clear()
+        else:
+            self._peer_versions.pop(neighbor, None)
+        return expired
+
+    def collect_garbage(self, dest: int) -> bool:
+        """
+        Forget a timed-out destination once its garbage-collection timer fires
+
+        Args:
+            dest (int): Interned destination id
+
+        Returns:
+            bool: Whether the destination was still awaiting collection
+        """
+        return self.garbage.pop(dest, None) is not None
+
+    def update_routing_table(self, neighbor_table: Mapping, neighbor_id: str, link_cost: int,
+                             now: float = None, advertise_mode: str = ADVERTISE_ALL) -> bool:
         """
         Update routing table based on neighbor's routing information
 
+        When the neighbor's table is a RoutingTable only the entries that changed
+        since this router last exchanged with that neighbor are examined. A route
+        getting worse or disappearing makes every other neighbor's next update a
+        full read, since one of them may now offer the best path.
+
+        ``advertise_mode`` is the neighbor's filtering policy towards this router:
+        with split horizon the neighbor's routes through this router are not
+        advertised at all, with poison reverse they arrive at metric infinity.
+        Either way a route of ours that points back through such a neighbor is a
+        loop and is withdrawn. Offers at or above ``infinity`` are unreachable.
+
         Args:
-            neighbor_table (Dict): Routing table of neighboring router
+            neighbor_table (Mapping): Routing table of neighboring router, either a
+                RoutingTable or a legacy dict keyed by router id
             neighbor_id (str): ID of the neighboring router
             link_cost (int): Cost of link to the neighboring router
+            now (float, optional): Timestamp for changed entries; defaults to
+                wall-clock time, pass the virtual clock when event-driven
+            advertise_mode (str): The neighbor's advertise mode (see ADVERTISE_MODES)
 
         Returns:
             bool: Whether routing table was updated
         """
         updated = False
-        current_time = time.time()
-
-        for dest, info in neighbor_table.items():
-            # Implement split horizon and poison reverse
-            new_cost = info["cost"] + link_cost
-
-            # Update conditions
-            if (dest not in self.routing_table or
-                    new_cost < self.routing_table[dest]["cost"] or
-                    self.routing_table[dest]["next_hop"] == neighbor_id):
-                self.routing_table[dest] = {
-                    "cost": new_cost,
-                    "next_hop": neighbor_id,
-                    "timestamp": current_time
-                }
-                updated = True
+        current_time = time.time() if now is None else now
+        table = self.routing_table
+        neighbor = router_ids.intern(neighbor_id)
+
+        infinity = self.infinity if self.infinity is not None else sys.maxsize
+        me = self.index
+        split_horizon = advertise_mode == SPLIT_HORIZON
+        poison_reverse = advertise_mode == POISON_REVERSE
+        worsened = False
+        processed = suppressed = poisoned = 0
 
+        if isinstance(neighbor_table, RoutingTable):
+            last_read = self._peer_versions.get(neighbor, 0)
+            entries = neighbor_table.changes_since(last_read)
+            if last_read <= 0:
+                # A full read only lists live routes, so withdraw ours through the
+                # neighbor for destinations it no longer has
+                stale = [(dest, ABSENT, ABSENT) for dest in table.routes_via(neighbor)
+                         if neighbor_table.cost_of(dest) == ABSENT]
+                if stale:
+                    entries = itertools.chain(entries, stale)
+            self._peer_versions[neighbor] = neighbor_table.version
+        else:
+            entries = (
+                (router_ids.intern(dest), info["cost"], router_ids.intern(info.get("next_hop", dest)))
+                for dest, info in neighbor_table.items()
+            )
+
+        for dest, cost, advertised_hop in entries:
+            current_cost = table.cost_of(dest)
+            next_hop = table.next_hop_of(dest)
+            via_neighbor = next_hop == neighbor
+
+            # Apply the neighbor's split horizon / poison reverse towards us
+            if advertised_hop == me and cost != ABSENT and (split_horizon or poison_reverse):
+                if split_horizon:
+                    # Never advertised to us; only matters if we route back through it
+                    suppressed += 1
+                    cost = ABSENT
+                else:
+                    poisoned += 1
+                    processed += 1
+                    cost = infinity
+            else:
+                processed += 1
+
+            new_cost = ABSENT if cost == ABSENT else cost + link_cost
+            if new_cost == ABSENT or new_cost >= infinity:
+                # Neighbor withdrew, poisoned or cannot reach the route we were using
+                if via_neighbor and dest != me:
+                    table.remove_route(dest)
+                    updated = worsened = True
+                continue
+
+            # Update conditions; equal-cost ties go to the lower router index so
+            # the converged tables do not depend on update order
+            if (current_cost == ABSENT or
+                    new_cost < current_cost or
+                    via_neighbor or
+                    (new_cost == current_cost and neighbor < next_hop)):
+                if table.set_route(dest, new_cost, neighbor, current_time):
+                    updated = True
+                    if current_cost == ABSENT and self.garbage:
+                        self.garbage.pop(dest, None)
+                    if current_cost != ABSENT and new_cost > current_cost:
+                        worsened = True
+
+        if worsened:
+            # Re-read every other neighbor in full on its next exchange
+            last_read = self._peer_versions.get(neighbor)
+            self._peer_versions.clear()
+            if last_read is not None:
+                self._peer_versions[neighbor] = last_read
+        self.entries_processed += processed
+        self.entries_suppressed += suppressed
+        self.entries_poisoned += poisoned
         return updated
 
     def add_interface(self, interface_id: str, ip: str, port: int):
@@ -59,4 +215,28 @@ class Router:
         self.interfaces[interface_id] = {
             "ip": ip,
             "port": port
-        }
\ No newline at end of file
+        }
+
+    def add_prefix(self, prefix: str):
+        """
+        Originate a CIDR prefix from this router
+
+        Args:
+            prefix (str): Prefix in CIDR notation, e.g. "10.1.0.0/16"
+        """
+        parsed = parse_prefix(prefix)
+        if parsed not in self.prefixes:
+            self.prefixes.append(parsed)
+
+    def build_fib(self, origins: Mapping[int, Iterable[Prefix]]) -> PrefixTrie:
+        """
+        Build the forwarding table for the prefixes advertised in the network
+
+        Args:
+            origins (Mapping[int, Iterable[Prefix]]): Prefixes originated by each
+                interned router id, this router's own included
+
+        Returns:
+            PrefixTrie: Longest-prefix-match table of ``(next_hop, cost)``
+        """
+        return build_fib(self.routing_table, origins)
@@ -0,0 +1,427 @@
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+from itertools import compress
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Sentinel stored in the cost/next-hop arrays for slots with no route
+ABSENT = -1
+
+# A table indexes its arrays directly by interned id once it holds routes to this share of all
+# known routers (and at least DENSE_MIN_ROUTES of them); below that, a slot map keeps it sized
+# to its own routes, which matters once metric infinity bounds how far a router can reach
+DENSE_FRACTION = 0.25
+DENSE_MIN_ROUTES = 64
+
+
+class RouterIdRegistry:
+    """
+    Interns router id strings to small dense integers.
+
+    Every routing table indexes its arrays by these integers, so a router id
+    string is stored exactly once no matter how many tables reference it.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._lock = threading.Lock()
+
+    def intern(self, name: str) -> int:
+        """
+        Return the integer index for a router id, assigning one if needed
+
+        Args:
+            name (str): Router id string
+
+        Returns:
+            int: Dense integer index for the router id
+        """
+        index = self._ids.get(name)
+        if index is None:
+            with self._lock:
+                index = self._ids.get(name)
+                if index is None:
+                    index = len(self._names)
+                    self._names.append(name)
+                    self._ids[name] = index
+        return index
+
+    def lookup(self, name: str) -> int:
+        """Return the index for a router id without interning it (ABSENT if unknown)"""
+        return self._ids.get(name, ABSENT)
+
+    def name(self, index: int) -> str:
+        """Return the router id string for an interned index"""
+        return self._names[index]
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+# Process-wide registry shared by every Router and RoutingTable
+router_ids = RouterIdRegistry()
+
+
+class RoutingTable(Mapping):
+    """
+    Routing table stored as parallel typed arrays of route slots.
+
+    A table with routes to only a few of the known routers maps each
+    destination to a slot of its own, so its size follows the routes it
+    holds rather than the registry. Once it holds routes to at least
+    ``DENSE_FRACTION`` of all routers it switches to arrays indexed directly
+    by interned router id, which need no per-route map at all.
+
+    Reads through the Mapping interface return the legacy
+    ``{"cost", "next_hop", "timestamp"}`` dict for a destination, built on
+    access, so existing callers keep working. Routing code should use the
+    integer-level methods instead.
+
+    Every change to a route's cost or next hop bumps ``version`` and is
+    appended to a change log, so a neighbor that remembers the version it
+    last read can fetch only what changed since with ``changes_since``.
+
+    Slots are also threaded onto one linked list per next hop, so
+    ``routes_via`` visits only the routes through that next hop.
+    """
+
+    __slots__ = ("_registry", "_slots", "_dests", "_cost", "_next_hop", "_timestamp", "_size",
+                 "_version", "_changed_at", "_log_slot", "_log_version", "_hop_head", "_hop_next", "_hop_prev")
+
+    def __init__(self, registry: RouterIdRegistry = router_ids):
+        self._registry = registry
+        # Destination -> slot while sparse; None once slots are the interned ids themselves
+        self._slots: Optional[Dict[int, int]] = {}
+        # Destination held in each slot (sparse layout only)
+        self._dests = array('i')
+        self._cost = array('i')
+        self._next_hop = array('i')
+        self._timestamp = array('d')
+        self._size = 0
+        self._version = 0
+        # Version at which each slot last changed (0 = never)
+        self._changed_at = array('Q')
+        # Append-only change log of slots, compacted once it outgrows the table
+        self._log_slot = array('i')
+        self._log_version = array('Q')
+        # Per next hop, the first slot routed through it; each slot links to the next and
+        # previous slot with the same next hop (ABSENT at either end)
+        self._hop_head: Dict[int, int] = {}
+        self._hop_next = array('i')
+        self._hop_prev = array('i')
+
+    def _slot(self, dest: int) -> int:
+        """Return the slot holding ``dest``, or ABSENT if it has none"""
+        slots = self._slots
+        if slots is None:
+            return dest if 0 <= dest < len(self._cost) else ABSENT
+        return slots.get(dest, ABSENT)
+
+    def _dest(self, slot: int) -> int:
+        """Return the interned destination held in ``slot``"""
+        return slot if self._slots is None else self._dests[slot]
+
+    def _wants_dense(self, routes: int) -> bool:
+        """Whether ``routes`` slots are cheaper as arrays indexed by interned id"""
+        return routes >= max(DENSE_MIN_ROUTES, DENSE_FRACTION * len(self._registry))
+
+    def _add_slot(self, dest: int) -> int:
+        """Give ``dest`` an empty slot and return it"""
+        slots = self._slots
+        if slots is not None and self._wants_dense(len(slots) + 1):
+            self._make_dense()
+            slots = None
+        if slots is None:
+            self._grow(dest)
+            return dest
+        slot = len(self._dests)
+        slots[dest] = slot
+        self._dests.append(dest)
+        self._cost.append(ABSENT)
+        self._next_hop.append(ABSENT)
+        self._timestamp.append(0.0)
+        self._changed_at.append(0)
+        self._hop_next.append(ABSENT)
+        self._hop_prev.append(ABSENT)
+        return slot
+
+    def _grow(self, index: int):
+        """Extend the dense arrays so that ``index`` is a valid slot"""
+        length = len(self._cost)
+        # Double up to the registry size so extends stay amortized, but never past it
+        new_length = max(index + 1, min(2 * length, len(self._registry)))
+        extra = new_length - length
+        if extra <= 0:
+            return
+        self._cost.extend(array('i', [ABSENT]) * extra)
+        self._next_hop.extend(array('i', [ABSENT]) * extra)
+        self._timestamp.extend(array('d', [0.0]) * extra)
+        self._changed_at.extend(array('Q', [0]) * extra)
+        self._hop_next.extend(array('i', [ABSENT]) * extra)
+        self._hop_prev.extend(array('i', [ABSENT]) * extra)
+
+    def _make_dense(self):
+        """Move every slot to the index of its destination and drop the slot map"""
+        dests = self._dests
+        length = max(dests) + 1 if dests else 0
+        cost = array('i', [ABSENT]) * length
+        next_hop = array('i', [ABSENT]) * length
+        timestamp = array('d', [0.0]) * length
+        changed_at = array('Q', [0]) * length
+        for slot, dest in enumerate(dests):
+            cost[dest] = self._cost[slot]
+            next_hop[dest] = self._next_hop[slot]
+            timestamp[dest] = self._timestamp[slot]
+            changed_at[dest] = self._changed_at[slot]
+        self._cost, self._next_hop, self._timestamp, self._changed_at = cost, next_hop, timestamp, changed_at
+        self._log_slot = array('i', (dests[slot] for slot in self._log_slot))
+        self._slots = None
+        self._dests = array('i')
+        self._index_next_hops()
+
+    def _index_next_hops(self):
+        """Rebuild the per-next-hop slot lists from the next-hop array"""
+        length = len(self._cost)
+        self._hop_head = {}
+        self._hop_next = array('i', [ABSENT]) * length
+        self._hop_prev = array('i', [ABSENT]) * length
+        for slot, hop in enumerate(self._next_hop):
+            if hop != ABSENT:
+                self._link(slot, hop)
+
+    def _link(self, slot: int, hop: int):
+        """Put ``slot`` at the front of the list of slots routed through ``hop``"""
+        first = self._hop_head.get(hop, ABSENT)
+        self._hop_next[slot] = first
+        self._hop_prev[slot] = ABSENT
+        if first != ABSENT:
+            self._hop_prev[first] = slot
+        self._hop_head[hop] = slot
+
+    def _unlink(self, slot: int, hop: int):
+        """Take ``slot`` off the list of slots routed through ``hop``"""
+        prev = self._hop_prev[slot]
+        following = self._hop_next[slot]
+        if prev != ABSENT:
+            self._hop_next[prev] = following
+        elif following != ABSENT:
+            self._hop_head[hop] = following
+        else:
+            del self._hop_head[hop]
+        if following != ABSENT:
+            self._hop_prev[following] = prev
+
+    def _record_change(self, slot: int):
+        """Bump the table version and log ``slot`` as changed"""
+        self._version += 1
+        self._changed_at[slot] = self._version
+        self._log_slot.append(slot)
+        self._log_version.append(self._version)
+        if len(self._log_slot) > 2 * len(self._cost) + 64:
+            self._compact_log()
+
+    def _compact_log(self):
+        """Rebuild the change log keeping only the latest change per slot"""
+        changed_at = self._changed_at
+        live = sorted((v, slot) for slot, v in enumerate(changed_at) if v)
+        self._log_slot = array('i', (slot for _, slot in live))
+        self._log_version = array('Q', (v for v, _ in live))
+
+    @property
+    def version(self) -> int:
+        """Monotonic counter bumped on every route change"""
+        return self._version
+
+    def changes_since(self, version: int) -> Iterator[Tuple[int, int, int]]:
+        """
+        Yield ``(dest, cost, next_hop)`` for routes changed after ``version``
+
+        Removed routes are yielded with ``cost`` and ``next_hop`` set to ABSENT.
+        Each destination is yielded at most once, with its current values.
+
+        Args:
+            version (int): Table version the caller last read
+
+        Returns:
+            Iterator[Tuple[int, int, int]]: Changed entries in change order
+        """
+        if version >= self._version:
+            return
+        if version <= 0:
+            # Full read: every live route, whether or not it was ever logged
+            yield from self.entries()
+            return
+        log_slot = self._log_slot
+        log_version = self._log_version
+        changed_at = self._changed_at
+        for i in range(bisect_right(log_version, version), len(log_slot)):
+            slot = log_slot[i]
+            # Skip log records superseded by a later change to the same slot
+            if changed_at[slot] == log_version[i]:
+                yield self._dest(slot), self._cost[slot], self._next_hop[slot]
+
+    # Integer-level API
+
+    def cost_of(self, dest: int) -> int:
+        """Return the cost to an interned destination, or ABSENT"""
+        slot = self._slot(dest)
+        return ABSENT if slot == ABSENT else self._cost[slot]
+
+    def next_hop_of(self, dest: int) -> int:
+        """Return the interned next hop for a destination, or ABSENT"""
+        slot = self._slot(dest)
+        return ABSENT if slot == ABSENT else self._next_hop[slot]
+
+    def timestamp_of(self, dest: int) -> float:
+        """Return the timestamp of a destination's route (0.0 if absent)"""
+        slot = self._slot(dest)
+        return 0.0 if slot == ABSENT else self._timestamp[slot]
+
+    def set_route(self, dest: int, cost: int, next_hop: int, timestamp: float) -> bool:
+        """
+        Install or replace the route to an interned destination
+
+        Args:
+            dest (int): Interned destination id
+            cost (int): Route cost
+            next_hop (int): Interned next-hop id
+            timestamp (float): Time the route was installed
+
+        Returns:
+            bool: Whether the cost or next hop changed (a timestamp refresh does not count)
+        """
+        slot = self._slot(dest)
+        if slot == ABSENT:
+            slot = self._add_slot(dest)
+        old_cost = self._cost[slot]
+        self._timestamp[slot] = timestamp
+        if old_cost == cost and self._next_hop[slot] == next_hop:
+            return False
+        if old_cost == ABSENT:
+            self._size += 1
+        old_hop = self._next_hop[slot]
+        if old_hop != next_hop:
+            if old_hop != ABSENT:
+                self._unlink(slot, old_hop)
+            self._link(slot, next_hop)
+        self._cost[slot] = cost
+        self._next_hop[slot] = next_hop
+        self._record_change(slot)
+        return True
+
+    def replace_routes(self, costs: array, next_hops: array, timestamp: float):
+        """
+        Replace the whole table from pre-built arrays indexed by interned id
+
+        Every slot is logged as changed, so incremental readers re-read the
+        table in full on their next exchange.
+
+        Args:
+            costs (array): array('i') of costs, ABSENT for no route
+            next_hops (array): array('i') of interned next hops, ABSENT for no route
+            timestamp (float): Timestamp applied to every present route
+        """
+        if len(costs) != len(next_hops):
+            raise ValueError("costs and next_hops must have the same length")
+        size = len(costs) - costs.count(ABSENT)
+        self._version += 1
+        if self._slots is None or self._wants_dense(size):
+            length = max(len(costs), len(self._cost) if self._slots is None else 0,
+                         max(self._dests) + 1 if self._slots else 0)
+            padding = length - len(costs)
+            self._cost = array('i', costs)
+            self._next_hop = array('i', next_hops)
+            if padding:
+                self._cost.extend(array('i', [ABSENT]) * padding)
+                self._next_hop.extend(array('i', [ABSENT]) * padding)
+            self._slots = None
+            self._dests = array('i')
+        else:
+            # Keep a slot for every destination held before, so its removal is logged too
+            present = compress(range(len(costs)), map(ABSENT.__ne__, costs))
+            dests = sorted(set(present).union(self._slots))
+            in_range = len(costs)
+            self._cost = array('i', (costs[dest] if dest < in_range else ABSENT for dest in dests))
+            self._next_hop = array('i', (next_hops[dest] if dest < in_range else ABSENT for dest in dests))
+            self._dests = array('i', dests)
+            self._slots = {dest: slot for slot, dest in enumerate(dests)}
+            length = len(dests)
+        self._timestamp = array('d', [timestamp]) * length
+        self._size = size
+        self._changed_at = array('Q', [self._version]) * length
+        self._log_slot = array('i', range(length))
+        self._log_version = array('Q', [self._version]) * length
+        self._index_next_hops()
+
+    def remove_route(self, dest: int) -> bool:
+        """Remove the route to an interned destination; return whether one existed"""
+        slot = self._slot(dest)
+        if slot == ABSENT or self._cost[slot] == ABSENT:
+            return False
+        self._unlink(slot, self._next_hop[slot])
+        self._cost[slot] = ABSENT
+        self._next_hop[slot] = ABSENT
+        self._timestamp[slot] = 0.0
+        self._size -= 1
+        self._record_change(slot)
+        return True
+
+    def routes_via(self, next_hop: int) -> List[int]:
+        """Return the interned destinations whose next hop is ``next_hop``, walking only their slots"""
+        dests = []
+        slot = self._hop_head.get(next_hop, ABSENT)
+        hop_next = self._hop_next
+        while slot != ABSENT:
+            dests.append(self._dest(slot))
+            slot = hop_next[slot]
+        return dests
+
+    def entries(self) -> Iterator[Tuple[int, int, int]]:
+        """Yield ``(dest, cost, next_hop)`` integer triples for present routes"""
+        next_hops = self._next_hop
+        dests = self._dests
+        dense = self._slots is None
+        for slot, cost in enumerate(self._cost):
+            if cost != ABSENT:
+                yield slot if dense else dests[slot], cost, next_hops[slot]
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """Materialize the legacy dict-of-dicts representation"""
+        return {dest: self[dest] for dest in self}
+
+    # Mapping interface keyed by router id strings
+
+    def __getitem__(self, dest: str) -> Dict[str, Any]:
+        index = self._registry.lookup(dest)
+        slot = ABSENT if index == ABSENT else self._slot(index)
+        if slot == ABSENT or self._cost[slot] == ABSENT:
+            raise KeyError(dest)
+        return {
+            "cost": self._cost[slot],
+            "next_hop": self._registry.name(self._next_hop[slot]),
+            "timestamp": self._timestamp[slot]
+        }
+
+    def __contains__(self, dest: object) -> bool:
+        if not isinstance(dest, str):
+            return False
+        index = self._registry.lookup(dest)
+        return index != ABSENT and self.cost_of(index) != ABSENT
+
+    def __iter__(self) -> Iterator[str]:
+        name = self._registry.name
+        for dest, _, _ in self.entries():
+            yield name(dest)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def nbytes(self) -> int:
+        """Return the number of bytes held by the backing arrays, the slot map and the next-hop heads"""
+        arrays = (self._dests, self._cost, self._next_hop, self._timestamp, self._changed_at,
+                  self._log_slot, self._log_version, self._hop_next, self._hop_prev)
+        slot_map = sys.getsizeof(self._slots) if self._slots is not None else 0
+        return sum(a.itemsize * len(a) for a in arrays) + slot_map + sys.getsizeof(self._hop_head)
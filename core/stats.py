@@ -0,0 +1,105 @@
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List
+
+
+@dataclass
+class ConvergenceStats:
+    """Cost of running a simulation until its routing tables stop changing"""
+
+    # Rounds that changed at least one route
+    rounds: int = 0
+    # Neighbor table exchanges (one per directed link per round)
+    messages: int = 0
+    # Individual route entries added, re-costed or re-pointed
+    route_changes: int = 0
+    # Neighbor entries examined while processing the exchanges
+    entries_processed: int = 0
+    # Wall-clock seconds spent
+    wall_time: float = 0.0
+    # Largest routing table seen on any router
+    peak_table_size: int = 0
+    # False if max_rounds was reached before the tables stabilized
+    converged: bool = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the stats as a plain dict (e.g. for JSON)"""
+        return asdict(self)
+
+
+@dataclass
+class ReconvergenceReport:
+    """How the network recovered from one topology change"""
+
+    # Description of the change, e.g. "remove_link R1-R2"
+    change: str = ""
+    # Rounds that changed at least one route
+    rounds: int = 0
+    # Neighbor table exchanges performed while reconverging
+    messages: int = 0
+    # Individual route entries added, re-costed, re-pointed or withdrawn
+    route_changes: int = 0
+    # Routers that exchanged at least once (the affected part of the topology)
+    routers_involved: int = 0
+    # Rounds / wall-clock seconds until no forwarding loop was seen again (-1 if loops remained)
+    loop_free_round: int = 0
+    loop_free_time: float = 0.0
+    # Most routes that disagreed with the new shortest paths at once, and most of those looping
+    peak_wrong_routes: int = 0
+    peak_looping_routes: int = 0
+    # Wall-clock seconds spent
+    wall_time: float = 0.0
+    # False if max_rounds was reached before the tables stabilized
+    converged: bool = False
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the report as a plain dict (e.g. for JSON)"""
+        return asdict(self)
+
+
+@dataclass
+class NodeStats:
+    """Measurements of one router process in a localhost emulation"""
+
+    router: str = ""
+    port: int = 0
+    # Seconds from the start signal until this router last changed a route
+    convergence_time: float = 0.0
+    # Individual route entries added, re-costed, re-pointed or withdrawn
+    route_changes: int = 0
+    # Advertisements sent (one per neighbor per update) and datagrams received
+    updates_sent: int = 0
+    datagrams_received: int = 0
+    # Triggered updates sent, and updates saved by coalescing route changes into them
+    triggered_updates: int = 0
+    updates_suppressed: int = 0
+    # RIP payload bytes sent and received, without UDP/IP headers
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    # CPU seconds used by the process in user and kernel mode
+    cpu_user: float = 0.0
+    cpu_system: float = 0.0
+    # Peak resident set size of the process
+    max_rss_kb: int = 0
+    # Routes in the final routing table
+    routes: int = 0
+
+
+@dataclass
+class EmulationReport:
+    """Outcome of running a topology as one process per router over loopback sockets"""
+
+    routers: int = 0
+    links: int = 0
+    # Seconds from the start signal until the last route change anywhere
+    convergence_time: float = 0.0
+    # Final routes that disagree with the shortest paths
+    wrong_routes: int = 0
+    # Wall-clock seconds from launching the first process until the last one exited
+    wall_time: float = 0.0
+    # False if the timeout was reached before the network went quiet
+    converged: bool = False
+    nodes: List[NodeStats] = field(default_factory=list)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the report as a plain dict (e.g. for JSON)"""
+        return asdict(self)
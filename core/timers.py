@@ -0,0 +1,113 @@
+import heapq
+import itertools
+import math
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class TimerWheel:
+    """
+    Timer wheel with an overflow heap for deadlines beyond its span.
+
+    Deadlines within ``slots * tick`` seconds live in a ring of per-tick
+    buckets, so scheduling, re-scheduling and cancelling are O(1) and
+    advancing the clock only touches buckets that are due. Longer deadlines
+    wait in a heap and move into the ring once they come within its span.
+    Expiry resolution is one tick: a timer fires on the first advance at or
+    after its deadline rounded up to a tick boundary.
+
+    The wheel holds no clock of its own; callers pass ``now`` from either
+    time.time() or a virtual clock.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 256, start: float = 0.0):
+        if tick <= 0 or slots < 2:
+            raise ValueError("tick must be positive and slots at least 2")
+        self.tick = tick
+        self._slots: List[Dict[Hashable, float]] = [{} for _ in range(slots)]
+        self._current = math.floor(start / tick)
+        # key -> (deadline, slot index or None when parked in the overflow heap)
+        self._timers: Dict[Hashable, Tuple[float, Optional[int]]] = {}
+        self._overflow: List[Tuple[int, int, float, Hashable]] = []
+        self._sequence = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        """Return the deadline of a pending timer, or None"""
+        timer = self._timers.get(key)
+        return timer[0] if timer else None
+
+    def schedule(self, key: Hashable, when: float):
+        """
+        Start or restart the timer for ``key`` so it expires at ``when``
+
+        Args:
+            key (Hashable): Timer identity; re-scheduling a key replaces its deadline
+            when (float): Absolute expiry time
+        """
+        self.cancel(key)
+        # Never file into a bucket that has already been swept
+        tick_index = max(math.ceil(when / self.tick), self._current + 1)
+        if tick_index - self._current < len(self._slots):
+            slot = tick_index % len(self._slots)
+            self._slots[slot][key] = when
+            self._timers[key] = (when, slot)
+        else:
+            heapq.heappush(self._overflow, (tick_index, next(self._sequence), when, key))
+            self._timers[key] = (when, None)
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel a pending timer; return whether one existed"""
+        timer = self._timers.pop(key, None)
+        if timer is None:
+            return False
+        if timer[1] is not None:
+            del self._slots[timer[1]][key]
+        # Overflow entries are dropped lazily when they surface
+        return True
+
+    def advance(self, now: float) -> List[Hashable]:
+        """
+        Move the wheel to ``now`` and remove every timer that is due
+
+        Args:
+            now (float): Current time
+
+        Returns:
+            List[Hashable]: Expired keys ordered by deadline
+        """
+        target = math.floor(now / self.tick)
+        if target <= self._current:
+            return []
+
+        slot_count = len(self._slots)
+        expired: List[Tuple[float, Hashable]] = []
+        for tick_index in range(self._current + 1, self._current + 1 + min(target - self._current, slot_count)):
+            bucket = self._slots[tick_index % slot_count]
+            if bucket:
+                for key, when in bucket.items():
+                    del self._timers[key]
+                    expired.append((when, key))
+                bucket.clear()
+        self._current = target
+
+        overflow = self._overflow
+        while overflow and overflow[0][0] - self._current < slot_count:
+            tick_index, _, when, key = heapq.heappop(overflow)
+            timer = self._timers.get(key)
+            if timer is None or timer != (when, None):
+                continue
+            if tick_index <= self._current:
+                del self._timers[key]
+                expired.append((when, key))
+            else:
+                slot = tick_index % slot_count
+                self._slots[slot][key] = when
+                self._timers[key] = (when, slot)
+
+        expired.sort(key=lambda item: item[0])
+        return [key for _, key in expired]
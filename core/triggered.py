@@ -0,0 +1,96 @@
+import random
+from typing import Optional
+
+
+class TriggeredUpdates:
+    """
+    Triggered-update hold-down for one router (RFC 2453 section 3.10.1).
+
+    The first route change after a quiet spell opens a window of random
+    length between ``min_delay`` and ``max_delay``. Every further change
+    inside the window joins the single update sent when it closes instead of
+    producing an update of its own. A periodic update sent while a triggered
+    one is pending carries the same changes, so the triggered one is dropped.
+    Periodic intervals get random jitter so routers that start together do
+    not stay synchronized.
+
+    The class only does the bookkeeping; the caller owns the clock and sends
+    the updates, so it works with the event scheduler, a real-time thread or
+    an asyncio loop alike.
+    """
+
+    __slots__ = ("min_delay", "max_delay", "periodic_jitter", "rng", "due", "requested", "sent", "suppressed")
+
+    def __init__(self, min_delay: float = 1.0, max_delay: float = 5.0, periodic_jitter: float = 0.15,
+                 rng: Optional[random.Random] = None):
+        """
+        Args:
+            min_delay (float): Shortest coalescing window, in seconds
+            max_delay (float): Longest coalescing window, in seconds
+            periodic_jitter (float): Periodic intervals vary by up to this fraction either way
+            rng (random.Random, optional): Random source for windows and jitter
+        """
+        if not 0 <= min_delay <= max_delay:
+            raise ValueError("Need 0 <= min_delay <= max_delay")
+        if not 0 <= periodic_jitter < 1:
+            raise ValueError("periodic_jitter must be in [0, 1)")
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.periodic_jitter = periodic_jitter
+        self.rng = rng if rng is not None else random.Random()
+        # Time the pending triggered update goes out, or None
+        self.due: Optional[float] = None
+        # Route changes reported, triggered updates sent, and updates saved by coalescing
+        self.requested = 0
+        self.sent = 0
+        self.suppressed = 0
+
+    @property
+    def pending(self) -> bool:
+        """Whether a triggered update is waiting for its window to close"""
+        return self.due is not None
+
+    def request(self, now: float) -> Optional[float]:
+        """
+        Note a route change that neighbors should hear about
+
+        Args:
+            now (float): Current time
+
+        Returns:
+            Optional[float]: When to send the triggered update if this change opened
+                a new window; None if it joins the pending one
+        """
+        self.requested += 1
+        if self.due is not None:
+            self.suppressed += 1
+            return None
+        self.due = now + self.rng.uniform(self.min_delay, self.max_delay)
+        return self.due
+
+    def fire(self, due: float) -> bool:
+        """
+        Close the window that was due at ``due``
+
+        Args:
+            due (float): The time returned by request()
+
+        Returns:
+            bool: Whether the triggered update should be sent; False if a
+                periodic update already covered it
+        """
+        if self.due != due:
+            return False
+        self.due = None
+        self.sent += 1
+        return True
+
+    def periodic_sent(self):
+        """Record a periodic update, which makes a pending triggered update redundant"""
+        if self.due is not None:
+            self.due = None
+            self.suppressed += 1
+
+    def next_periodic(self, interval: float) -> float:
+        """Return the delay until the next periodic update: ``interval`` with random jitter"""
+        return interval * self.rng.uniform(1 - self.periodic_jitter, 1 + self.periodic_jitter)
@@ -0,0 +1,165 @@
+import time
+from array import array
+from typing import Dict, Mapping, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for the vectorized engine
+    np = None
+
+from core.router import INFINITY, Router
+from core.routing_table import ABSENT, router_ids
+
+# Cost used for "no route" inside the matrices; large enough that adding a
+# link cost never wraps, small enough to stay exact in int64
+UNREACHABLE = 2 ** 40
+
+
+class VectorizedRIPEngine:
+    """
+    Synchronous distance-vector engine over whole-network NumPy matrices.
+
+    The network is held as dense ``cost`` and ``next_hop`` matrices (row =
+    router, column = destination) plus a sparse edge list. Each round is a
+    min-plus relaxation over all edges at once: every router takes the
+    cheapest neighbor offer for every destination, ties going to the lowest
+    router index. This is the same fixed point Router.update_routing_table
+    converges to, so the final tables match the per-router engine exactly;
+    only the intermediate rounds differ, because every router reads the
+    previous round's tables instead of updating in place.
+    """
+
+    def __init__(self, routers: Mapping[str, Router], topology: Mapping[str, Mapping[str, int]],
+                 infinity: Optional[int] = INFINITY, block_size: int = 1 << 22):
+        """
+        Build the matrices from a set of routers and their links
+
+        Args:
+            routers (Mapping[str, Router]): Routers keyed by id
+            topology (Mapping[str, Mapping[str, int]]): Link costs, as RIPSimulation.network_topology
+            infinity (int, optional): Costs at or above this value are unreachable;
+                None disables the cap (Router(infinity=None))
+            block_size (int): Upper bound on edges x destination columns relaxed per block
+        """
+        if np is None:
+            raise ImportError("VectorizedRIPEngine requires numpy")
+
+        self.routers = sorted(routers.values(), key=lambda router: router.index)
+        self.infinity = infinity
+        self.rounds = 0
+        position = {router.id: i for i, router in enumerate(self.routers)}
+        size = len(self.routers)
+
+        edges = sorted(
+            (position[src], position[dst], cost)
+            for src, links in topology.items() if src in position
+            for dst, cost in links.items() if dst in position
+        )
+        self._edge_src = np.array([e[0] for e in edges], dtype=np.int64)
+        self._edge_dst = np.array([e[1] for e in edges], dtype=np.int64)
+        self._edge_cost = np.array([e[2] for e in edges], dtype=np.int64)
+
+        # Edges are sorted by source, so each router's offers form one segment
+        self._sources, self._starts, counts = np.unique(self._edge_src, return_index=True, return_counts=True)
+        self._segment = np.repeat(np.arange(len(self._sources)), counts)
+        self._block = max(1, block_size // max(1, len(edges)))
+
+        diagonal = np.arange(size)
+        self.cost = np.full((size, size), UNREACHABLE, dtype=np.int64)
+        self.next_hop = np.full((size, size), -1, dtype=np.int64)
+        self.cost[diagonal, diagonal] = 0
+        self.next_hop[diagonal, diagonal] = diagonal
+
+    @classmethod
+    def from_simulation(cls, simulation, **kwargs) -> "VectorizedRIPEngine":
+        """Build an engine from a RIPSimulation's routers and topology, using the routers' infinity"""
+        if "infinity" not in kwargs and simulation.routers:
+            kwargs["infinity"] = next(iter(simulation.routers.values())).infinity
+        return cls(simulation.routers, simulation.network_topology, **kwargs)
+
+    def step(self) -> bool:
+        """
+        Run one synchronous round
+
+        Returns:
+            bool: Whether any cost or next hop changed
+        """
+        size = len(self.routers)
+        new_cost = np.full((size, size), UNREACHABLE, dtype=np.int64)
+        new_next_hop = np.full((size, size), -1, dtype=np.int64)
+        limit = UNREACHABLE if self.infinity is None else self.infinity
+
+        if len(self._edge_src):
+            for start in range(0, size, self._block):
+                stop = min(size, start + self._block)
+                offers = self.cost[self._edge_dst, start:stop] + self._edge_cost[:, None]
+                offers[offers >= limit] = UNREACHABLE
+
+                best = np.minimum.reduceat(offers, self._starts, axis=0)
+                # Lowest neighbor position among the offers that tie for best
+                hops = np.where(offers == best[self._segment], self._edge_dst[:, None], size)
+                best_hop = np.minimum.reduceat(hops, self._starts, axis=0)
+                best_hop[best >= UNREACHABLE] = -1
+
+                new_cost[self._sources, start:stop] = best
+                new_next_hop[self._sources, start:stop] = best_hop
+
+        diagonal = np.arange(size)
+        new_cost[diagonal, diagonal] = 0
+        new_next_hop[diagonal, diagonal] = diagonal
+
+        changed = not (np.array_equal(new_cost, self.cost) and np.array_equal(new_next_hop, self.next_hop))
+        self.cost = new_cost
+        self.next_hop = new_next_hop
+        self.rounds += 1
+        return changed
+
+    def run(self, max_rounds: Optional[int] = None) -> int:
+        """
+        Run synchronous rounds until nothing changes
+
+        Args:
+            max_rounds (int, optional): Stop after this many rounds
+
+        Returns:
+            int: Number of rounds that changed at least one route
+        """
+        changed_rounds = 0
+        while max_rounds is None or self.rounds < max_rounds:
+            if not self.step():
+                break
+            changed_rounds += 1
+        return changed_rounds
+
+    def table_for(self, router_id: str) -> Dict[str, Dict[str, int]]:
+        """Return one router's current table as ``{dest: {"cost", "next_hop"}}``"""
+        row = next(i for i, router in enumerate(self.routers) if router.id == router_id)
+        return {
+            self.routers[dest].id: {
+                "cost": int(self.cost[row, dest]),
+                "next_hop": self.routers[int(self.next_hop[row, dest])].id
+            }
+            for dest in np.flatnonzero(self.cost[row] < UNREACHABLE)
+        }
+
+    def load_into_routers(self, now: float = None):
+        """
+        Write the engine's tables back into the Router objects
+
+        Args:
+            now (float, optional): Timestamp for the loaded routes; defaults to wall-clock time
+        """
+        timestamp = time.time() if now is None else now
+        length = len(router_ids)
+        indexes = np.array([router.index for router in self.routers], dtype=np.int64)
+
+        for row, router in enumerate(self.routers):
+            reachable = self.cost[row] < UNREACHABLE
+            costs = np.full(length, ABSENT, dtype=np.int32)
+            next_hops = np.full(length, ABSENT, dtype=np.int32)
+            costs[indexes[reachable]] = self.cost[row, reachable]
+            next_hops[indexes[reachable]] = indexes[self.next_hop[row, reachable]]
+
+            router.routing_table.replace_routes(
+                array('i', costs.tobytes()), array('i', next_hops.tobytes()), timestamp
+            )
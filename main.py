@@ -1,10 +1,20 @@
+import argparse
+import random
 import threading
 import time
 import logging
-from typing import Dict
+from typing import Dict, List, Optional, Set, Tuple
 
 # Ensure these are imported correctly
-from core.router import Router
+from core.router import ADVERTISE_MODES, INFINITY, Router
+from core.event_engine import EventScheduler
+from core.fib import Prefix, PrefixTrie
+from core.partition import run_partitioned
+from core.reconvergence import RouteAudit, affected_routers
+from core.stats import ConvergenceStats, ReconvergenceReport
+from core.timers import TimerWheel
+from core.triggered import TriggeredUpdates
+from core.vector_engine import VectorizedRIPEngine
 
 # Configure logging
 logging.basicConfig(
@@ -15,9 +25,44 @@ logger = logging.getLogger(__name__)
 
 
 class RIPSimulation:
-    def __init__(self):
+    def __init__(self, update_interval: float = 5.0, route_timeout: float = 180.0,
+                 garbage_collection: float = 120.0, timer_tick: float = 1.0,
+                 triggered_window: Tuple[float, float] = (1.0, 5.0), periodic_jitter: float = 0.15):
         self.routers: Dict[str, Router] = {}
+        # Routers taken down by fail_router
+        self.failed_routers: Dict[str, Router] = {}
         self.network_topology: Dict[str, Dict[str, int]] = {}
+        self.update_interval = update_interval
+        # RIP timers: routes time out when their next hop is silent for route_timeout
+        # seconds and are forgotten garbage_collection seconds after that
+        self.route_timeout = route_timeout
+        self.garbage_collection = garbage_collection
+        self.timer_tick = timer_tick
+        self.timers = TimerWheel(tick=timer_tick, start=time.time())
+        # Route changes are coalesced into one triggered update per router sent after a
+        # random delay in triggered_window; periodic updates vary by periodic_jitter
+        self.triggered_window = triggered_window
+        self.periodic_jitter = periodic_jitter
+        self.triggered: Dict[str, TriggeredUpdates] = {}
+        # Number of neighbor entries examined in each completed update round
+        self.entries_processed_per_round: List[int] = []
+        # Total neighbor table exchanges performed
+        self.messages_sent = 0
+        # Entries advertised / withheld by split horizon / sent poisoned, per advertise mode
+        self.advertisement_counters: Dict[str, Dict[str, int]] = {
+            mode: {"advertised": 0, "suppressed": 0, "poisoned": 0} for mode in ADVERTISE_MODES
+        }
+
+        # Event-driven mode state
+        self.scheduler: Optional[EventScheduler] = None
+        self._rng = random.Random()
+        self._changed_since_check = False
+        self._timers_started = False
+        # Real-time update thread started by simulate_rip("threaded")
+        self._update_thread: Optional[threading.Thread] = None
+        # Held by that thread for each round and batch of triggered updates, and by every change
+        # to routers or links, so changes from other threads never race a round over the tables
+        self._lock = threading.RLock()
 
     def add_router(self, router: Router):
         """
@@ -27,11 +72,12 @@ class RIPSimulation:
             router (Router): Router object to add
         """
         try:
-            if router.id in self.routers:
-                logger.warning(f"Router {router.id} already exists. Skipping.")
-                return
+            with self._lock:
+                if router.id in self.routers:
+                    logger.warning(f"Router {router.id} already exists. Skipping.")
+                    return
 
-            self.routers[router.id] = router
+                self.routers[router.id] = router
             logger.info(f"Router {router.id} added successfully.")
         except Exception as e:
             logger.error(f"Error adding router: {e}")
@@ -46,72 +92,612 @@ class RIPSimulation:
             cost (int): Link cost between routers
         """
         try:
-            # Validate routers exist
-            if router1_id not in self.routers or router2_id not in self.routers:
-                raise ValueError("Both routers must exist before connecting")
+            with self._lock:
+                # Validate routers exist
+                if router1_id not in self.routers or router2_id not in self.routers:
+                    raise ValueError("Both routers must exist before connecting")
+
+                # Bidirectional connection
+                self.network_topology.setdefault(router1_id, {})[router2_id] = cost
+                self.network_topology.setdefault(router2_id, {})[router1_id] = cost
 
-            # Bidirectional connection
-            self.network_topology.setdefault(router1_id, {})[router2_id] = cost
-            self.network_topology.setdefault(router2_id, {})[router1_id] = cost
+                # A new or re-costed link invalidates what each side has already read
+                self.routers[router1_id].forget_neighbor(router2_id)
+                self.routers[router2_id].forget_neighbor(router1_id)
 
             logger.info(f"Connected {router1_id} and {router2_id} with cost {cost}")
         except Exception as e:
             logger.error(f"Error connecting routers: {e}")
 
-    def simulate_rip(self):
+    def run_update_round(self) -> int:
+        """
+        Run one pass of routing table exchanges over every link
+
+        Returns:
+            int: Number of neighbor entries actually processed in this round
+        """
+        with self._lock:
+            processed_before = sum(router.entries_processed for router in self.routers.values())
+            now = self.clock()
+            self.expire_timers(now)
+
+            for router_id, router in list(self.routers.items()):
+                # Create a copy of neighbors to avoid runtime modification issues
+                neighbors = list(self.network_topology.get(router_id, {}).items())
+
+                for neighbor, link_cost in neighbors:
+                    try:
+                        neighbor_router = self.routers[neighbor]
+                        updated = self._exchange(router, neighbor_router, link_cost, now)
+
+                        if updated:
+                            logger.info(f"Routing table updated for router {router_id}")
+                    except Exception as neighbor_error:
+                        logger.error(f"Error updating route from {router_id} to {neighbor}: {neighbor_error}")
+
+            processed = sum(router.entries_processed for router in self.routers.values()) - processed_before
+            self.entries_processed_per_round.append(processed)
+            logger.info(f"Update round {len(self.entries_processed_per_round)} processed {processed} entries")
+        return processed
+
+    def set_advertise_mode(self, mode: str):
+        """
+        Set the advertisement filtering mode of every router in the simulation
+
+        Args:
+            mode (str): "none", "split_horizon" or "poison_reverse"
+        """
+        if mode not in ADVERTISE_MODES:
+            raise ValueError(f"Unknown advertise mode: {mode}")
+        for router in self.routers.values():
+            router.advertise_mode = mode
+
+    def _exchange(self, receiver: Router, sender: Router, link_cost: int, now: float) -> bool:
+        """
+        Deliver one advertisement from a router to a neighbor and account for it
+
+        Args:
+            receiver (Router): Router processing the advertisement
+            sender (Router): Advertising router, whose advertise mode applies
+            link_cost (int): Cost of the link between them
+            now (float): Current simulation time
+
+        Returns:
+            bool: Whether the receiver's routing table changed
+        """
+        before = (receiver.entries_processed, receiver.entries_suppressed, receiver.entries_poisoned)
+        self.messages_sent += 1
+        updated = receiver.update_routing_table(
+            sender.routing_table,
+            sender.id,
+            link_cost,
+            now=now,
+            advertise_mode=sender.advertise_mode
+        )
+        counters = self.advertisement_counters[sender.advertise_mode]
+        counters["advertised"] += receiver.entries_processed - before[0]
+        counters["suppressed"] += receiver.entries_suppressed - before[1]
+        counters["poisoned"] += receiver.entries_poisoned - before[2]
+        self._refresh_timeout(receiver.id, sender.id, now)
+        return updated
+
+    def clock(self) -> float:
+        """Return the simulation time: the virtual clock when event-driven, else wall-clock time"""
+        return self.scheduler.now if self.scheduler is not None else time.time()
+
+    def _refresh_timeout(self, router_id: str, neighbor_id: str, now: float):
+        """Restart the timeout for routes a router learned through a neighbor it just heard from"""
+        self.timers.schedule(("timeout", router_id, neighbor_id), now + self.route_timeout)
+
+    def expire_timers(self, now: Optional[float] = None) -> int:
+        """
+        Fire every route timeout and garbage-collection timer that is due
+
+        Only the timers that expire are touched, not the routing tables as a whole.
+
+        Args:
+            now (float, optional): Current time; defaults to the simulation clock
+
+        Returns:
+            int: Number of timers that fired
+        """
+        now = self.clock() if now is None else now
+        expired = self.timers.advance(now)
+
+        for kind, router_id, target in expired:
+            router = self.routers.get(router_id)
+            if router is None:
+                continue
+            if kind == "timeout":
+                timed_out = router.expire_neighbor(target, now=now)
+                for dest in timed_out:
+                    self.timers.schedule(("gc", router_id, dest), now + self.garbage_collection)
+                if timed_out:
+                    logger.info(f"Router {router_id}: {len(timed_out)} routes via {target} timed out")
+                    self._changed_since_check = True
+                    if (self.scheduler is not None and self._timers_started) or self._update_thread is not None:
+                        self._schedule_triggered_update(router_id)
+            elif kind == "gc":
+                router.collect_garbage(target)
+
+        return len(expired)
+
+    def run_until_converged(self, max_rounds: Optional[int] = None) -> ConvergenceStats:
+        """
+        Run update rounds back to back, without sleeping, until a round changes nothing
+
+        Args:
+            max_rounds (int, optional): Give up after this many rounds
+
+        Returns:
+            ConvergenceStats: Rounds, messages, route changes, wall time and peak table size
+        """
+        stats = ConvergenceStats()
+        routers = self.routers.values()
+        messages_before = self.messages_sent
+        processed_before = sum(router.entries_processed for router in routers)
+        version = sum(router.routing_table.version for router in routers)
+        stats.peak_table_size = max((len(router.routing_table) for router in routers), default=0)
+        start = time.perf_counter()
+
+        executed = 0
+        while max_rounds is None or executed < max_rounds:
+            self.run_update_round()
+            executed += 1
+
+            # Table versions advance once per route change
+            new_version = sum(router.routing_table.version for router in routers)
+            stats.peak_table_size = max(stats.peak_table_size,
+                                        max((len(router.routing_table) for router in routers), default=0))
+            if new_version == version:
+                stats.converged = True
+                break
+            stats.route_changes += new_version - version
+            stats.rounds += 1
+            version = new_version
+
+        stats.wall_time = time.perf_counter() - start
+        stats.messages = self.messages_sent - messages_before
+        stats.entries_processed = sum(router.entries_processed for router in routers) - processed_before
+        logger.info(f"Converged: {stats.converged} after {stats.rounds} rounds, "
+                    f"{stats.messages} messages, {stats.route_changes} route changes "
+                    f"in {stats.wall_time:.3f}s")
+        return stats
+
+    def remove_link(self, router1_id: str, router2_id: str,
+                    max_rounds: Optional[int] = None) -> Optional[ReconvergenceReport]:
+        """
+        Take a link down and reconverge around it
+
+        Both endpoints withdraw the routes they learned over the link at once,
+        as if its route timeout had fired. When the event-driven clock is
+        running, the endpoints send triggered updates and None is returned;
+        otherwise the network is reconverged in rounds right away.
+
+        Args:
+            router1_id (str): ID of first router
+            router2_id (str): ID of second router
+            max_rounds (int, optional): Give up reconverging after this many rounds
+
+        Returns:
+            Optional[ReconvergenceReport]: Reconvergence report, or None in event-driven mode
+        """
+        with self._lock:
+            if router2_id not in self.network_topology.get(router1_id, {}):
+                raise ValueError(f"No link between {router1_id} and {router2_id}")
+            self._drop_link(router1_id, router2_id, self.clock())
+            logger.info(f"Removed link between {router1_id} and {router2_id}")
+            return self._after_change(f"remove_link {router1_id}-{router2_id}", (router1_id, router2_id),
+                                      max_rounds)
+
+    def set_link_cost(self, router1_id: str, router2_id: str, cost: int,
+                      max_rounds: Optional[int] = None) -> Optional[ReconvergenceReport]:
+        """
+        Change the cost of an existing link and reconverge
+
+        Args:
+            router1_id (str): ID of first router
+            router2_id (str): ID of second router
+            cost (int): New link cost
+            max_rounds (int, optional): Give up reconverging after this many rounds
+
+        Returns:
+            Optional[ReconvergenceReport]: Reconvergence report, or None in event-driven mode
+        """
+        with self._lock:
+            if router2_id not in self.network_topology.get(router1_id, {}):
+                raise ValueError(f"No link between {router1_id} and {router2_id}")
+            self.connect_routers(router1_id, router2_id, cost)
+            return self._after_change(f"set_link_cost {router1_id}-{router2_id}={cost}",
+                                      (router1_id, router2_id), max_rounds)
+
+    def fail_router(self, router_id: str, max_rounds: Optional[int] = None) -> Optional[ReconvergenceReport]:
+        """
+        Take a router down with all of its links and reconverge
+
+        The router leaves ``routers`` and is kept in ``failed_routers``; its
+        neighbors withdraw every route through it immediately.
+
+        Args:
+            router_id (str): ID of the failing router
+            max_rounds (int, optional): Give up reconverging after this many rounds
+
+        Returns:
+            Optional[ReconvergenceReport]: Reconvergence report, or None in event-driven mode
+        """
+        with self._lock:
+            if router_id not in self.routers:
+                raise ValueError(f"Unknown router: {router_id}")
+            now = self.clock()
+            neighbors = tuple(self.network_topology.get(router_id, {}))
+            for neighbor in neighbors:
+                self._drop_link(router_id, neighbor, now)
+            self.network_topology.pop(router_id, None)
+            self.failed_routers[router_id] = self.routers.pop(router_id)
+            self.triggered.pop(router_id, None)
+            logger.info(f"Router {router_id} failed; {len(neighbors)} links down")
+            return self._after_change(f"fail_router {router_id}", neighbors, max_rounds)
+
+    def _drop_link(self, router1_id: str, router2_id: str, now: float):
+        """Delete a link in both directions and withdraw the routes each endpoint learned over it"""
+        del self.network_topology[router1_id][router2_id]
+        del self.network_topology[router2_id][router1_id]
+
+        for router_id, neighbor in ((router1_id, router2_id), (router2_id, router1_id)):
+            self.timers.cancel(("timeout", router_id, neighbor))
+            router = self.routers[router_id]
+            for dest in router.expire_neighbor(neighbor, now=now):
+                self.timers.schedule(("gc", router_id, dest), now + self.garbage_collection)
+            router.forget_neighbor(neighbor)
+
+    def _after_change(self, description: str, seeds: Tuple[str, ...],
+                      max_rounds: Optional[int]) -> Optional[ReconvergenceReport]:
+        """Send triggered updates from the routers next to a change, or reconverge in rounds"""
+        self._changed_since_check = True
+        if self.scheduler is not None and self._timers_started:
+            for router_id in seeds:
+                if router_id in self.routers:
+                    self._schedule_triggered_update(router_id)
+            return None
+        return self._reconverge(description, seeds, max_rounds)
+
+    def _reconverge(self, description: str, seeds: Tuple[str, ...],
+                    max_rounds: Optional[int] = None) -> ReconvergenceReport:
+        """
+        Reconverge after a change, exchanging only around routers whose tables changed
+
+        Each round, every changed router and each of its neighbors pulls from
+        all of its neighbors: the neighbors pick up the change, and a changed
+        router looks for alternatives to routes that got worse. The first
+        round starts from the routers next to the change. Routers outside
+        that moving frontier exchange nothing.
+
+        Args:
+            description (str): What changed, copied into the report
+            seeds (Tuple[str, ...]): Routers next to the change
+            max_rounds (int, optional): Give up after this many rounds
+
+        Returns:
+            ReconvergenceReport: Rounds, messages, loop-free point and peak wrong routes
+        """
+        report = ReconvergenceReport(change=description)
+        infinity = next(iter(self.routers.values())).infinity if self.routers else INFINITY
+        audit = RouteAudit(self.routers, self.network_topology, infinity)
+        report.peak_wrong_routes = audit.wrong_routes()
+        report.peak_looping_routes = audit.looping_routes()
+        in_loop = report.peak_looping_routes > 0
+        messages_before = self.messages_sent
+        involved: Set[str] = set()
+        start = time.perf_counter()
+
+        active = tuple(router_id for router_id in seeds if router_id in self.routers)
+        executed = 0
+        while active and (max_rounds is None or executed < max_rounds):
+            now = self.clock()
+            changed = []
+            for router_id in affected_routers(self.network_topology, active):
+                router = self.routers[router_id]
+                version = router.routing_table.version
+                for neighbor, link_cost in list(self.network_topology.get(router_id, {}).items()):
+                    self._exchange(router, self.routers[neighbor], link_cost, now)
+                involved.add(router_id)
+                if router.routing_table.version != version:
+                    report.route_changes += router.routing_table.version - version
+                    changed.append(router_id)
+            executed += 1
+            active = tuple(changed)
+            if not changed:
+                break
+
+            report.rounds += 1
+            audit.refresh(self.routers[router_id].index for router_id in changed)
+            report.peak_wrong_routes = max(report.peak_wrong_routes, audit.wrong_routes())
+            looping = audit.looping_routes()
+            report.peak_looping_routes = max(report.peak_looping_routes, looping)
+            if looping:
+                in_loop = True
+            elif in_loop:
+                in_loop = False
+                report.loop_free_round = report.rounds
+                report.loop_free_time = time.perf_counter() - start
+
+        report.converged = not active
+        if in_loop:
+            report.loop_free_round = -1
+        report.wall_time = time.perf_counter() - start
+        report.messages = self.messages_sent - messages_before
+        report.routers_involved = len(involved)
+        logger.info(f"Reconverged after {description}: {report.converged} after {report.rounds} rounds, "
+                    f"{report.messages} messages, peak {report.peak_wrong_routes} wrong routes, "
+                    f"loop-free after round {report.loop_free_round}")
+        return report
+
+    def schedule_link_change(self, at: float, router1_id: str, router2_id: str, cost: int):
+        """
+        Schedule a link to be added or re-costed at a virtual time (event-driven mode)
+
+        Args:
+            at (float): Virtual time of the change
+            router1_id (str): ID of first router
+            router2_id (str): ID of second router
+            cost (int): New link cost
+        """
+        self._ensure_scheduler().schedule_at(at, self._link_change, router1_id, router2_id, cost)
+
+    def _ensure_scheduler(self) -> EventScheduler:
+        """Switch the simulation onto a virtual clock, creating the scheduler on first use"""
+        if self.scheduler is None:
+            self.scheduler = EventScheduler()
+            # Timers armed so far ran on wall-clock time; restart them on the virtual clock
+            self.timers = TimerWheel(tick=self.timer_tick, start=self.scheduler.now)
+        return self.scheduler
+
+    def _advertise(self, router_id: str):
+        """
+        Push a router's routing table to all of its neighbors at the current simulation time
+
+        Args:
+            router_id (str): ID of the advertising router
+        """
+        router = self.routers.get(router_id)
+        if router is None:
+            # Failed while the update was pending
+            return
+        now = self.clock()
+
+        for neighbor, link_cost in list(self.network_topology.get(router_id, {}).items()):
+            try:
+                if self._exchange(self.routers[neighbor], router, link_cost, now):
+                    self._changed_since_check = True
+                    self._schedule_triggered_update(neighbor)
+            except Exception as neighbor_error:
+                logger.error(f"Error advertising routes from {router_id} to {neighbor}: {neighbor_error}")
+
+    def _triggers_for(self, router_id: str) -> TriggeredUpdates:
+        """Return a router's triggered-update state, creating it on first use"""
+        trigger = self.triggered.get(router_id)
+        if trigger is None:
+            min_delay, max_delay = self.triggered_window
+            trigger = TriggeredUpdates(min_delay, max_delay, self.periodic_jitter, self._rng)
+            self.triggered[router_id] = trigger
+        return trigger
+
+    def _schedule_triggered_update(self, router_id: str):
+        """Schedule a triggered update for a router, or fold the change into the pending one"""
+        due = self._triggers_for(router_id).request(self.clock())
+        # The real-time thread polls for due updates itself
+        if due is not None and self.scheduler is not None:
+            self.scheduler.schedule_at(due, self._triggered_update, router_id, due)
+
+    def _triggered_update(self, router_id: str, due: float):
+        trigger = self.triggered.get(router_id)
+        if trigger is not None and trigger.fire(due):
+            self._advertise(router_id)
+
+    def _periodic_update(self, router_id: str):
+        if router_id not in self.routers:
+            return
+        trigger = self._triggers_for(router_id)
+        trigger.periodic_sent()
+        self._advertise(router_id)
+        self.scheduler.schedule(trigger.next_periodic(self.update_interval), self._periodic_update, router_id)
+
+    @property
+    def suppressed_updates(self) -> int:
+        """Updates saved by coalescing route changes into pending triggered updates"""
+        return sum(trigger.suppressed for trigger in self.triggered.values())
+
+    def _link_change(self, router1_id: str, router2_id: str, cost: int):
+        self.connect_routers(router1_id, router2_id, cost)
+        self._changed_since_check = True
+        self._schedule_triggered_update(router1_id)
+        self._schedule_triggered_update(router2_id)
+
+    def _timer_tick(self):
+        self.expire_timers(self.scheduler.now)
+        self.scheduler.schedule(self.timer_tick, self._timer_tick)
+
+    def _check_convergence(self):
+        """Stop the run once a full update interval passes with no route changes"""
+        if not self._changed_since_check and not any(trigger.pending for trigger in self.triggered.values()):
+            self.scheduler.stop()
+            return
+        self._changed_since_check = False
+        self.scheduler.schedule(self.update_interval, self._check_convergence)
+
+    def run_event_driven(self, duration: Optional[float] = None, seed: Optional[int] = None,
+                         stop_when_converged: bool = True) -> float:
+        """
+        Run the simulation on a virtual clock instead of real sleeps
+
+        Every router sends a periodic update about every ``update_interval``
+        virtual seconds (with jitter), starting at a random offset. Changes to
+        its table are coalesced into one triggered update sent after a random
+        delay within ``triggered_window``. Route timeout and garbage-collection
+        timers run on the same clock. The run is deterministic for a given
+        seed. Calling it again continues the same virtual timeline.
+
+        Args:
+            duration (float, optional): Virtual seconds to simulate; unbounded if None
+            seed (int, optional): Seed for timer offsets, jitter and triggered-update delays
+            stop_when_converged (bool): Stop once an update interval passes with no changes
+
+        Returns:
+            float: Virtual time at which the run stopped
+        """
+        if duration is None and not stop_when_converged:
+            raise ValueError("An unbounded run needs stop_when_converged")
+
+        scheduler = self._ensure_scheduler()
+        self._rng = random.Random(seed)
+        for trigger in self.triggered.values():
+            trigger.rng = self._rng
+        self._changed_since_check = True
+
+        # Periodic updates and the timer tick keep running across successive runs
+        if not self._timers_started:
+            self._timers_started = True
+            for router_id in self.routers:
+                scheduler.schedule(self._rng.uniform(0, self.update_interval), self._periodic_update, router_id)
+            scheduler.schedule(self.timer_tick, self._timer_tick)
+        if stop_when_converged:
+            scheduler.schedule(self.update_interval, self._check_convergence)
+
+        start = scheduler.now
+        scheduler.run(until=None if duration is None else start + duration)
+        logger.info(f"Event-driven simulation stopped at t={scheduler.now:.2f}s "
+                    f"after {scheduler.events_processed} events")
+        return scheduler.now
+
+    def run_vectorized(self, max_rounds: Optional[int] = None) -> int:
+        """
+        Converge the network with the NumPy batch engine and load the result into the routers
+
+        Args:
+            max_rounds (int, optional): Stop after this many synchronous rounds
+
+        Returns:
+            int: Number of rounds that changed at least one route
+        """
+        engine = VectorizedRIPEngine.from_simulation(self)
+        rounds = engine.run(max_rounds=max_rounds)
+        engine.load_into_routers()
+        logger.info(f"Vectorized simulation converged after {rounds} rounds")
+        return rounds
+
+    def run_partitioned(self, workers: int, max_rounds: Optional[int] = None) -> ConvergenceStats:
+        """
+        Converge the network across several worker processes and load the result into the routers
+
+        Args:
+            workers (int): Number of worker processes (topology parts)
+            max_rounds (int, optional): Give up after this many rounds
+
+        Returns:
+            ConvergenceStats: Convergence metrics for the run
+        """
+        stats = run_partitioned(self.routers, self.network_topology, workers, max_rounds=max_rounds)
+        self.messages_sent += stats.messages
+        return stats
+
+    def simulate_rip(self, mode: str = "threaded", seed: Optional[int] = None):
         """
         Simulate RIP routing updates
+
+        Args:
+            mode (str): "threaded" runs jittered periodic rounds and coalesced
+                triggered updates in a real-time daemon thread;
+                "event" runs on a virtual clock until the network converges;
+                "vectorized" runs synchronous NumPy rounds until converged
+            seed (int, optional): Seed for the event-driven mode
         """
+        if mode == "event":
+            self.run_event_driven(seed=seed)
+            return
+        if mode == "vectorized":
+            self.run_vectorized()
+            return
+        if mode != "threaded":
+            raise ValueError(f"Unknown simulation mode: {mode}")
 
         def update_routing_tables():
             """
             Periodic routing table update thread
             """
             try:
+                next_round = time.time()
                 while True:
-                    for router_id, router in list(self.routers.items()):
-                        # Create a copy of neighbors to avoid runtime modification issues
-                        neighbors = list(self.network_topology.get(router_id, {}).items())
-
-                        for neighbor, link_cost in neighbors:
-                            try:
-                                neighbor_router = self.routers[neighbor]
-                                updated = router.update_routing_table(
-                                    neighbor_router.routing_table,
-                                    neighbor,
-                                    link_cost
-                                )
-
-                                if updated:
-                                    logger.info(f"Routing table updated for router {router_id}")
-                            except Exception as neighbor_error:
-                                logger.error(f"Error updating route from {router_id} to {neighbor}: {neighbor_error}")
-
-                    # Wait before next update
-                    time.sleep(5)
+                    with self._lock:
+                        now = time.time()
+                        if now >= next_round:
+                            # Every router pulls from every neighbor, which covers pending triggered updates
+                            for router_id in self.routers:
+                                self._triggers_for(router_id).periodic_sent()
+                            versions = {router_id: router.routing_table.version
+                                        for router_id, router in self.routers.items()}
+                            # run_update_round also fires any route timers that are due
+                            self.run_update_round()
+                            for router_id, router in list(self.routers.items()):
+                                if router.routing_table.version != versions.get(router_id):
+                                    self._schedule_triggered_update(router_id)
+                            jitter = self._rng.uniform(1 - self.periodic_jitter, 1 + self.periodic_jitter)
+                            next_round = now + jitter * self.update_interval
+
+                        for router_id, trigger in list(self.triggered.items()):
+                            if trigger.due is not None and trigger.due <= now and trigger.fire(trigger.due):
+                                self._advertise(router_id)
+
+                        # Sleep until the next round or the next triggered update, whichever is first
+                        wake = min([next_round] + [t.due for t in self.triggered.values() if t.due is not None])
+                    time.sleep(max(0.0, wake - time.time()))
 
             except Exception as e:
                 logger.critical(f"Routing simulation failed: {e}")
 
         # Start as a daemon thread
         thread = threading.Thread(target=update_routing_tables, daemon=True)
+        self._update_thread = thread
         thread.start()
         logger.info("RIP Routing simulation started")
 
+    def prefix_origins(self) -> Dict[int, List[Prefix]]:
+        """Return the CIDR prefixes advertised by every live router, keyed by interned router id"""
+        return {router.index: router.prefixes for router in self.routers.values() if router.prefixes}
+
+    def build_fib(self, router_id: str) -> PrefixTrie:
+        """
+        Build a router's forwarding table from its routing table
+
+        Args:
+            router_id (str): ID of the router
+
+        Returns:
+            PrefixTrie: Longest-prefix-match table of ``(next_hop, cost)`` per advertised prefix
+        """
+        return self.routers[router_id].build_fib(self.prefix_origins())
+
     def print_routing_tables(self):
         """
         Print routing tables for all routers
         """
-        for router_id, router in self.routers.items():
-            print(f"\nRouting Table for Router {router_id}:")
-            for dest, route_info in router.routing_table.items():
-                print(f"  Destination: {dest}")
-                print(f"    Cost: {route_info['cost']}")
-                print(f"    Next Hop: {route_info['next_hop']}")
-                print(f"    Timestamp: {route_info['timestamp']}")
+        with self._lock:
+            for router_id, router in self.routers.items():
+                print(f"\nRouting Table for Router {router_id}:")
+                for dest, route_info in router.routing_table.items():
+                    print(f"  Destination: {dest}")
+                    print(f"    Cost: {route_info['cost']}")
+                    print(f"    Next Hop: {route_info['next_hop']}")
+                    print(f"    Timestamp: {route_info['timestamp']}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="RIP routing simulation")
+    parser.add_argument("--mode", choices=["threaded", "event", "vectorized"], default="threaded",
+                        help="threaded: real-time updates; event: virtual clock until converged; "
+                             "vectorized: NumPy batch rounds until converged")
+    parser.add_argument("--seed", type=int, help="Random seed for event-driven mode")
+    args = parser.parse_args()
+
     try:
         # Create simulation
         simulation = RIPSimulation()
@@ -131,7 +717,11 @@ def main():
         simulation.connect_routers(router2.id, router3.id, 2)
 
         # Start RIP simulation
-        simulation.simulate_rip()
+        simulation.simulate_rip(mode=args.mode, seed=args.seed)
+
+        if args.mode != "threaded":
+            simulation.print_routing_tables()
+            return
 
         # Run for a while to see routing updates
         try:
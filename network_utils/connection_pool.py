@@ -0,0 +1,212 @@
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+Peer = Tuple[str, int]
+T = TypeVar("T")
+
+
+class _PooledConnection:
+    __slots__ = ("sock", "last_used")
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    """
+    Per-peer pool of long-lived TCP connections.
+
+    ``run`` borrows an idle connection to the peer (a hit) or opens a new one
+    (a miss), runs an operation on it and returns it to the pool. Connections
+    get TCP keepalive so dead peers are noticed, idle ones are closed after
+    ``idle_timeout`` seconds, and failed connects are retried with
+    exponential backoff. An operation that fails on a reused connection,
+    which the peer may have closed in the meantime, is retried once on a
+    fresh one.
+    """
+
+    def __init__(self, max_per_peer: int = 4, idle_timeout: float = 60.0, connect_timeout: float = 5.0,
+                 max_retries: int = 5, backoff: float = 0.1, max_backoff: float = 5.0,
+                 keepalive_idle: int = 30, greeting: bytes = b""):
+        """
+        Args:
+            max_per_peer (int): Idle connections kept per peer; extra ones are closed on release
+            idle_timeout (float): Seconds an idle connection is kept before eviction
+            connect_timeout (float): Timeout of each connect attempt
+            max_retries (int): Connect attempts after the first one before giving up
+            backoff (float): Delay before the first retry, doubled on every further one
+            max_backoff (float): Upper bound on the retry delay
+            keepalive_idle (int): Seconds of silence before TCP keepalive probes start
+            greeting (bytes): Sent once on every new connection, e.g. a protocol tag
+        """
+        self.max_per_peer = max_per_peer
+        self.idle_timeout = idle_timeout
+        self.connect_timeout = connect_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.keepalive_idle = keepalive_idle
+        self.greeting = greeting
+
+        self._idle: Dict[Peer, List[_PooledConnection]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.reconnects = 0
+        self.evictions = 0
+        self.connect_failures = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the pool counters"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "reconnects": self.reconnects,
+                "evictions": self.evictions,
+                "connect_failures": self.connect_failures,
+                "idle": sum(len(connections) for connections in self._idle.values()),
+            }
+
+    def run(self, host: str, port: int, operation: Callable[[socket.socket], T]) -> T:
+        """
+        Run ``operation`` on a pooled connection to a peer
+
+        Args:
+            host (str): Peer host
+            port (int): Peer port
+            operation (Callable[[socket.socket], T]): Sends (and optionally receives) on the socket
+
+        Returns:
+            T: Whatever the operation returned
+        """
+        peer = (host, port)
+        connection, reused = self._acquire(peer)
+        try:
+            result = operation(connection.sock)
+        except OSError:
+            self._close(connection)
+            if not reused:
+                raise
+            # The peer probably closed the idle connection; try once more on a new one
+            with self._lock:
+                self.reconnects += 1
+            connection = self._connect(peer)
+            try:
+                result = operation(connection.sock)
+            except OSError:
+                self._close(connection)
+                raise
+        self._release(peer, connection)
+        return result
+
+    def evict_idle(self, now: Optional[float] = None) -> int:
+        """
+        Close every idle connection unused for longer than ``idle_timeout``
+
+        Args:
+            now (float, optional): time.monotonic() value to compare against
+
+        Returns:
+            int: Number of connections closed
+        """
+        now = time.monotonic() if now is None else now
+        expired = []
+        with self._lock:
+            for peer, connections in list(self._idle.items()):
+                keep = [c for c in connections if now - c.last_used <= self.idle_timeout]
+                expired.extend(c for c in connections if now - c.last_used > self.idle_timeout)
+                if keep:
+                    self._idle[peer] = keep
+                else:
+                    del self._idle[peer]
+            self.evictions += len(expired)
+        for connection in expired:
+            self._close(connection)
+        return len(expired)
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            connections = [c for peer_connections in self._idle.values() for c in peer_connections]
+            self._idle.clear()
+        for connection in connections:
+            self._close(connection)
+
+    def _acquire(self, peer: Peer) -> Tuple[_PooledConnection, bool]:
+        self.evict_idle()
+        while True:
+            with self._lock:
+                connections = self._idle.get(peer)
+                connection = connections.pop() if connections else None
+            if connection is None:
+                break
+            if self._is_alive(connection.sock):
+                with self._lock:
+                    self.hits += 1
+                return connection, True
+            self._close(connection)
+
+        with self._lock:
+            self.misses += 1
+        return self._connect(peer), False
+
+    def _release(self, peer: Peer, connection: _PooledConnection):
+        connection.last_used = time.monotonic()
+        with self._lock:
+            connections = self._idle.setdefault(peer, [])
+            if len(connections) < self.max_per_peer:
+                connections.append(connection)
+                return
+        self._close(connection)
+
+    def _connect(self, peer: Peer) -> _PooledConnection:
+        delay = self.backoff
+        for attempt in range(self.max_retries + 1):
+            try:
+                sock = socket.create_connection(peer, timeout=self.connect_timeout)
+            except OSError:
+                with self._lock:
+                    self.connect_failures += 1
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, self.max_backoff)
+                continue
+
+            sock.settimeout(None)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.keepalive_idle)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(1, self.keepalive_idle // 3))
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.greeting:
+                sock.sendall(self.greeting)
+            return _PooledConnection(sock)
+
+    @staticmethod
+    def _is_alive(sock: socket.socket) -> bool:
+        """An idle connection is dead if the peer closed it or sent something unexpected"""
+        try:
+            sock.setblocking(False)
+            try:
+                sock.recv(1, socket.MSG_PEEK)
+            except BlockingIOError:
+                # Nothing to read: still open
+                return True
+            finally:
+                sock.setblocking(True)
+        except OSError:
+            pass
+        return False
+
+    @staticmethod
+    def _close(connection: _PooledConnection):
+        try:
+            connection.sock.close()
+        except OSError:
+            pass
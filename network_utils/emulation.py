@@ -0,0 +1,297 @@
+import asyncio
+import contextlib
+import ipaddress
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from core.reconvergence import RouteAudit
+from core.router import INFINITY, SPLIT_HORIZON, Router
+from core.routing_table import router_ids
+from core.stats import EmulationReport, NodeStats
+from core.triggered import TriggeredUpdates
+from network_utils.rip_packet import ENTRY, HEADER, AddressBook, entries_to_table
+from network_utils.socket_handler import RIPSocketHandler
+
+logger = logging.getLogger(__name__)
+
+Link = Tuple[str, str, int]
+LOOPBACK = "127.0.0.1"
+# First address handed to the emulated routers for the binary RIP format
+FIRST_ADDRESS = int(ipaddress.IPv4Address("10.0.0.1"))
+
+
+def load_topology(path: str) -> Tuple[List[str], List[Link]]:
+    """
+    Read a topology from JSON
+
+    Args:
+        path (str): File holding ``{"routers": [...], "links": [[router1, router2, cost], ...]}``
+
+    Returns:
+        Tuple[List[str], List[Link]]: Router ids and links
+    """
+    with open(path) as topology_file:
+        topology = json.load(topology_file)
+    links = [(router1, router2, int(cost)) for router1, router2, cost in topology["links"]]
+    return list(topology["routers"]), links
+
+
+async def _run_node(conn, name: str, port: int, neighbors: Dict[str, Tuple[int, int]],
+                    addresses: Dict[str, str], advertise_mode: str, update_interval: float,
+                    triggered_window: Tuple[float, float], periodic_jitter: float, last_change, slot: int):
+    """Run one router on the event loop until the launcher sends "stop"; see _node_process"""
+    loop = asyncio.get_running_loop()
+    book = AddressBook(addresses)
+    router = Router(name, advertise_mode=advertise_mode)
+    link_costs = {}
+    for neighbor, (neighbor_port, cost) in neighbors.items():
+        router.add_interface(neighbor, LOOPBACK, neighbor_port)
+        link_costs[neighbor] = cost
+    stats = NodeStats(router=name, port=port)
+    trigger = TriggeredUpdates(*triggered_window, periodic_jitter)
+
+    def advertise():
+        # Split horizon and poison reverse apply per interface, so what goes on the wire shrinks too
+        for neighbor, interface in router.interfaces.items():
+            stats.bytes_sent += handler.send_rip_update_udp(interface["ip"], interface["port"],
+                                                            router.routing_table, neighbor=neighbor,
+                                                            advertise_mode=advertise_mode)
+            stats.updates_sent += 1
+
+    def triggered_update(due):
+        if trigger.fire(due):
+            advertise()
+
+    def on_datagram(packet):
+        sender = book.name(packet.sender)
+        link_cost = link_costs.get(sender)
+        if link_cost is None:
+            return
+        stats.datagrams_received += 1
+        stats.bytes_received += HEADER.size + len(packet.entries) * ENTRY.size
+        version = router.routing_table.version
+        if router.update_routing_table(entries_to_table(packet.entries, book), sender, link_cost,
+                                       advertise_mode=advertise_mode):
+            stats.route_changes += router.routing_table.version - version
+            last_change[slot] = time.time()
+            # Changes arriving before the window closes are folded into the same triggered update
+            due = trigger.request(loop.time())
+            if due is not None:
+                loop.call_at(due, triggered_update, due)
+
+    handler = RIPSocketHandler(name, host=LOOPBACK, port=port, save_directory=tempfile.gettempdir(),
+                               addresses=addresses, on_rip_datagram=on_datagram)
+    server = asyncio.create_task(handler.serve_async())
+    while handler.async_server is None:
+        if server.done():
+            # Binding failed; surface the error
+            server.result()
+        await asyncio.sleep(0.01)
+    conn.send(("ready", name))
+
+    started = await loop.run_in_executor(None, conn.recv)
+
+    async def periodic_updates():
+        while True:
+            trigger.periodic_sent()
+            advertise()
+            await asyncio.sleep(trigger.next_periodic(update_interval))
+
+    periodic = asyncio.create_task(periodic_updates())
+    await loop.run_in_executor(None, conn.recv)
+
+    for task in (periodic, server):
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    handler.close()
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    stats.convergence_time = max(0.0, last_change[slot] - started[1]) if last_change[slot] else 0.0
+    stats.cpu_user = usage.ru_utime
+    stats.cpu_system = usage.ru_stime
+    stats.max_rss_kb = usage.ru_maxrss
+    stats.routes = len(router.routing_table)
+    stats.triggered_updates = trigger.sent
+    stats.updates_suppressed = trigger.suppressed
+    routes = [(router_ids.name(dest), cost, router_ids.name(next_hop))
+              for dest, cost, next_hop in router.routing_table.entries()]
+    conn.send((stats, routes))
+
+
+def _node_process(conn, names: List[str], name: str, port: int, neighbors: Dict[str, Tuple[int, int]],
+                  addresses: Dict[str, str], advertise_mode: str, update_interval: float,
+                  triggered_window: Tuple[float, float], periodic_jitter: float, last_change, slot: int):
+    """
+    Run one emulated router: a Router fed by a RIPSocketHandler on its own loopback port
+
+    The router advertises its table to every neighbor as binary RIP datagrams
+    over UDP about every ``update_interval`` seconds (with ``periodic_jitter``),
+    and once per ``triggered_window`` after received updates change its
+    routes. It records the time of its last route change in ``last_change[slot]``.
+
+    Protocol (all messages are tuples over ``conn``):
+        worker -> parent: ("ready", name) once bound, then (NodeStats, routes) after "stop"
+        parent -> worker: ("start", start_time) | ("stop",)
+    """
+    # The handler reports every datagram it receives
+    sys.stdout = open(os.devnull, "w")
+    # Intern every id in the parent's order so equal-cost ties resolve the same way everywhere
+    for router_id in names:
+        router_ids.intern(router_id)
+    try:
+        asyncio.run(_run_node(conn, name, port, neighbors, addresses, advertise_mode, update_interval,
+                              triggered_window, periodic_jitter, last_change, slot))
+    finally:
+        conn.close()
+
+
+def run_emulation(routers: Sequence[str], links: Sequence[Link], base_port: int = 47000,
+                  advertise_mode: str = SPLIT_HORIZON, update_interval: float = 1.0,
+                  triggered_window: Tuple[float, float] = (0.03, 0.15), periodic_jitter: float = 0.15,
+                  quiet_period: Optional[float] = None, timeout: float = 120.0) -> EmulationReport:
+    """
+    Run every router as its own OS process exchanging RIP updates over loopback sockets
+
+    Router i listens on ``base_port + i`` for UDP datagrams (and on TCP for the
+    other RIPSocketHandler messages). Once every process is bound they are
+    started together, and the network counts as converged when no router has
+    changed a route for ``quiet_period`` seconds. The final tables are then
+    collected and checked against the shortest paths.
+
+    Args:
+        routers (Sequence[str]): Router ids
+        links (Sequence[Link]): ``(router1, router2, cost)`` links
+        base_port (int): Port of the first router
+        advertise_mode (str): Advertise mode of every router (see ADVERTISE_MODES)
+        update_interval (float): Seconds between periodic updates
+        triggered_window (Tuple[float, float]): Range of the random delay over which a router
+            coalesces route changes into one triggered update; the default is RFC 2453's 1-5 s
+            scaled to a 1 s update interval
+        periodic_jitter (float): Periodic intervals vary by up to this fraction either way
+        quiet_period (float, optional): Seconds without route changes that end the run;
+            defaults to three update intervals
+        timeout (float): Give up after this many seconds
+
+    Returns:
+        EmulationReport: Network-wide results and the measurements of every router process
+    """
+    report = EmulationReport(routers=len(routers), links=len(links))
+    quiet_period = 3 * update_interval if quiet_period is None else quiet_period
+    start = time.perf_counter()
+
+    topology: Dict[str, Dict[str, int]] = {router_id: {} for router_id in routers}
+    for router1, router2, cost in links:
+        topology[router1][router2] = cost
+        topology[router2][router1] = cost
+    ports = {router_id: base_port + i for i, router_id in enumerate(routers)}
+    addresses = {router_id: str(ipaddress.IPv4Address(FIRST_ADDRESS + i)) for i, router_id in enumerate(routers)}
+    names = list(routers)
+
+    context = multiprocessing.get_context()
+    last_change = context.Array('d', len(routers), lock=False)
+    connections = []
+    processes = []
+    try:
+        for slot, router_id in enumerate(routers):
+            neighbors = {neighbor: (ports[neighbor], cost) for neighbor, cost in topology[router_id].items()}
+            parent_conn, child_conn = context.Pipe()
+            process = context.Process(
+                target=_node_process,
+                args=(child_conn, names, router_id, ports[router_id], neighbors, addresses, advertise_mode,
+                      update_interval, triggered_window, periodic_jitter, last_change, slot),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            connections.append(parent_conn)
+            processes.append(process)
+
+        for conn in connections:
+            if not conn.poll(timeout):
+                raise TimeoutError("A router process did not come up")
+            conn.recv()
+
+        started = time.time()
+        for conn in connections:
+            conn.send(("start", started))
+
+        while True:
+            time.sleep(min(0.05, quiet_period))
+            now = time.time()
+            latest = max(max(last_change), started)
+            if now - latest >= quiet_period:
+                report.converged = True
+                break
+            if now - started >= timeout:
+                break
+        report.convergence_time = max(max(last_change), started) - started
+
+        tables = {}
+        for conn in connections:
+            conn.send(("stop",))
+        for conn in connections:
+            stats, routes = conn.recv()
+            report.nodes.append(stats)
+            tables[stats.router] = routes
+    finally:
+        for conn in connections:
+            conn.close()
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+    report.wrong_routes = _audit(names, topology, tables)
+    report.wall_time = time.perf_counter() - start
+    logger.info(f"Emulated {report.routers} routers: converged={report.converged} in "
+                f"{report.convergence_time:.3f}s, {report.wrong_routes} wrong routes")
+    return report
+
+
+def _audit(names: List[str], topology: Mapping[str, Mapping[str, int]],
+           tables: Mapping[str, List[Tuple[str, int, str]]]) -> int:
+    """Load the collected tables into Routers and count the routes that are not shortest paths"""
+    routers = {name: Router(name) for name in names}
+    now = time.time()
+    for name, routes in tables.items():
+        table = routers[name].routing_table
+        for dest, cost, next_hop in routes:
+            table.set_route(router_ids.intern(dest), cost, router_ids.intern(next_hop), now)
+    return RouteAudit(routers, topology, INFINITY).wrong_routes()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from core.router import ADVERTISE_MODES
+
+    parser = argparse.ArgumentParser(description="Run a topology as one RIP router process per node on localhost")
+    parser.add_argument("topology", help='JSON file: {"routers": [...], "links": [[router1, router2, cost], ...]}')
+    parser.add_argument("--base-port", type=int, default=47000, help="Port of the first router")
+    parser.add_argument("--advertise-mode", choices=ADVERTISE_MODES, default=SPLIT_HORIZON)
+    parser.add_argument("--update-interval", type=float, default=1.0, help="Seconds between periodic updates")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Give up after this many seconds")
+    parser.add_argument("--output", help="Optional JSON file to write the report to")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    emulation_report = run_emulation(*load_topology(args.topology), base_port=args.base_port,
+                                     advertise_mode=args.advertise_mode, update_interval=args.update_interval,
+                                     timeout=args.timeout)
+    for node in emulation_report.nodes:
+        print(f"{node.router:>8} port={node.port} converged={node.convergence_time:7.3f}s "
+              f"routes={node.routes:5} sent={node.bytes_sent:9}B received={node.bytes_received:9}B "
+              f"cpu={node.cpu_user + node.cpu_system:6.3f}s rss={node.max_rss_kb}KB")
+    print(f"Converged: {emulation_report.converged} in {emulation_report.convergence_time:.3f}s, "
+          f"{emulation_report.wrong_routes} wrong routes")
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(emulation_report.as_dict(), output, indent=2)
@@ -0,0 +1,234 @@
+import struct
+from typing import Iterator, Optional, Tuple, Union
+
+# Sent once at the start of a framed connection, which then carries any number of frames
+SESSION = b"RIP_SESSION"
+
+# Frame header: type, payload length, request id
+FRAME_HEADER = struct.Struct("!BQI")
+FRAME_RIP_UPDATE = 1
+# File payload: name length, name, then the file contents
+FRAME_FILE = 2
+FILE_NAME = struct.Struct("!H")
+# Delta RIP update: JSON with the sender's per-neighbor sequence number and only the changed routes
+FRAME_RIP_DELTA = 3
+# Receiver -> sender reply to a delta update: sequence number and status
+FRAME_ACK = 4
+ACK = struct.Struct("!QB")
+ACK_OK = 0
+# The receiver saw a sequence gap and needs the whole table again
+ACK_RESYNC = 1
+# A file block did not match its checksum and must be sent again
+ACK_BAD_BLOCK = 2
+# Block transfers: a JSON query naming the file, answered with the bitmap of blocks
+# the receiver already holds, then blocks of transfer id, block index and SHA-256
+# digest followed by the data, each answered with an ack
+FRAME_BLOCK_QUERY = 5
+FRAME_BLOCK_STATUS = 6
+FRAME_BLOCK = 7
+BLOCK = struct.Struct("!16sQ32s")
+
+# Events produced by FrameParser.events
+RIP_UPDATE_EVENT = "rip_update"
+RIP_DELTA_EVENT = "rip_delta"
+BLOCK_QUERY_EVENT = "block_query"
+BLOCK_EVENT = "block"
+FILE_START_EVENT = "file_start"
+FILE_DATA_EVENT = "file_data"
+FILE_END_EVENT = "file_end"
+
+Event = Tuple[str, int, Union[memoryview, Tuple[str, int], None]]
+
+# Frames whose whole payload is buffered and handed out as one event
+_WHOLE_FRAME_EVENTS = {
+    FRAME_RIP_UPDATE: RIP_UPDATE_EVENT,
+    FRAME_RIP_DELTA: RIP_DELTA_EVENT,
+    FRAME_BLOCK_QUERY: BLOCK_QUERY_EVENT,
+    FRAME_BLOCK: BLOCK_EVENT,
+}
+
+
+def encode_frame(frame_type: int, request_id: int, payload: bytes) -> bytes:
+    """Return a complete frame carrying ``payload``"""
+    return FRAME_HEADER.pack(frame_type, len(payload), request_id) + payload
+
+
+def read_frame(sock, max_payload: int = 1 << 26) -> Tuple[int, int, bytearray]:
+    """
+    Read one whole frame from a blocking socket, e.g. a reply to a request
+
+    Args:
+        sock (socket.socket): Connected socket
+        max_payload (int): Largest payload accepted
+
+    Returns:
+        Tuple[int, int, bytearray]: Frame type, request id and payload
+    """
+    header = _read_exactly(sock, FRAME_HEADER.size)
+    frame_type, length, request_id = FRAME_HEADER.unpack(header)
+    if length > max_payload:
+        raise ValueError(f"Frame of {length} bytes exceeds the {max_payload} byte limit")
+    return frame_type, request_id, _read_exactly(sock, length)
+
+
+def _read_exactly(sock, count: int) -> bytearray:
+    data = bytearray(count)
+    view = memoryview(data)
+    received = 0
+    while received < count:
+        chunk = sock.recv_into(view[received:])
+        if not chunk:
+            raise ConnectionError("Connection closed before the reply arrived")
+        received += chunk
+    return data
+
+
+def file_frame_header(request_id: int, file_name: str, file_size: int) -> bytes:
+    """Return the header of a file frame; the ``file_size`` content bytes follow it"""
+    encoded_name = file_name.encode()
+    return (FRAME_HEADER.pack(FRAME_FILE, FILE_NAME.size + len(encoded_name) + file_size, request_id) +
+            FILE_NAME.pack(len(encoded_name)) + encoded_name)
+
+
+class FrameParser:
+    """
+    Incremental frame parser over one reusable receive buffer.
+
+    Bytes go in through get_buffer()/advance(), which suits socket.recv_into,
+    or through feed(). Parsed messages come out of events() as tuples of
+    ``(event, request_id, data)``:
+
+    - RIP_UPDATE_EVENT, RIP_DELTA_EVENT, BLOCK_QUERY_EVENT and BLOCK_EVENT with
+      the whole payload as a memoryview
+    - FILE_START_EVENT with ``(file_name, file_size)``
+    - FILE_DATA_EVENT with the next chunk of file contents as a memoryview
+    - FILE_END_EVENT with None
+
+    Memoryviews point into the buffer and are only valid until the next
+    get_buffer() or feed() call. File contents are handed out as they
+    arrive, so a file never has to fit in the buffer; other payloads do, and
+    the buffer grows up to ``max_payload`` to hold one. Once the buffered
+    part of a file has been handed out, the caller may instead receive the
+    rest of it straight off the socket and report it with skip_file_data().
+    """
+
+    def __init__(self, buffer_size: int = 1 << 16, max_payload: int = 1 << 26):
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        # Bytes needed from _start before the next event can be produced
+        self._need = FRAME_HEADER.size
+        self.max_payload = max_payload
+        self._file_remaining = 0
+        self._file_request: Optional[int] = None
+
+    @property
+    def idle(self) -> bool:
+        """Whether the parser sits on a frame boundary with nothing buffered"""
+        return self._start == self._end and self._file_request is None
+
+    @property
+    def file_remaining(self) -> int:
+        """Content bytes of the current file that have not been handed out yet"""
+        return self._file_remaining
+
+    def skip_file_data(self, count: int):
+        """
+        Record that ``count`` bytes of the current file were received outside the parser
+
+        Only valid once events() has handed out every buffered byte, i.e. the
+        file contents are the next bytes on the wire.
+
+        Args:
+            count (int): Number of content bytes the caller received itself
+        """
+        if self._start != self._end or count > self._file_remaining:
+            raise ValueError("File data can only be skipped from the wire, up to the end of the file")
+        self._file_remaining -= count
+
+    def get_buffer(self) -> memoryview:
+        """Return the free tail of the buffer, compacting or growing it first if needed"""
+        if self._start == self._end:
+            self._start = self._end = 0
+        # Room for the next event, and always at least one free byte
+        needed = max(self._need, self._end - self._start + 1)
+        if self._start and (self._start + needed > len(self._buffer) or self._end == len(self._buffer)):
+            # Move the unparsed bytes to the front; same-size slice assignment keeps the buffer in place
+            length = self._end - self._start
+            self._buffer[:length] = self._buffer[self._start:self._end]
+            self._start, self._end = 0, length
+        if needed > len(self._buffer):
+            grown = bytearray(max(needed, 2 * len(self._buffer)))
+            grown[:self._end] = self._view[:self._end]
+            self._buffer = grown
+            self._view = memoryview(grown)
+        return self._view[self._end:]
+
+    def advance(self, count: int):
+        """Record that ``count`` bytes were written into the view from get_buffer()"""
+        self._end += count
+
+    def feed(self, data: bytes):
+        """Copy received bytes into the buffer"""
+        offset = 0
+        while offset < len(data):
+            free = self.get_buffer()
+            count = min(len(free), len(data) - offset)
+            free[:count] = data[offset:offset + count]
+            self.advance(count)
+            offset += count
+
+    def events(self) -> Iterator[Event]:
+        """Yield every event that the buffered bytes complete"""
+        while True:
+            available = self._end - self._start
+            if self._file_request is not None:
+                if self._file_remaining:
+                    if not available:
+                        self._need = 1
+                        return
+                    count = min(available, self._file_remaining)
+                    chunk = self._view[self._start:self._start + count]
+                    self._start += count
+                    self._file_remaining -= count
+                    yield FILE_DATA_EVENT, self._file_request, chunk
+                if not self._file_remaining:
+                    request_id, self._file_request = self._file_request, None
+                    yield FILE_END_EVENT, request_id, None
+                continue
+
+            if available < FRAME_HEADER.size:
+                self._need = FRAME_HEADER.size
+                return
+            frame_type, length, request_id = FRAME_HEADER.unpack_from(self._buffer, self._start)
+            body = self._start + FRAME_HEADER.size
+
+            event = _WHOLE_FRAME_EVENTS.get(frame_type)
+            if event is not None:
+                if length > self.max_payload:
+                    raise ValueError(f"Frame of {length} bytes exceeds the {self.max_payload} byte limit")
+                if available < FRAME_HEADER.size + length:
+                    self._need = FRAME_HEADER.size + length
+                    return
+                self._start = body + length
+                yield event, request_id, self._view[body:self._start]
+            elif frame_type == FRAME_FILE:
+                if available < FRAME_HEADER.size + FILE_NAME.size:
+                    self._need = FRAME_HEADER.size + FILE_NAME.size
+                    return
+                (name_length,) = FILE_NAME.unpack_from(self._buffer, body)
+                header_length = FRAME_HEADER.size + FILE_NAME.size + name_length
+                if length < FILE_NAME.size + name_length:
+                    raise ValueError(f"File frame {request_id} is shorter than its name")
+                if available < header_length:
+                    self._need = header_length
+                    return
+                file_name = bytes(self._view[body + FILE_NAME.size:self._start + header_length]).decode()
+                file_size = length - FILE_NAME.size - name_length
+                self._start += header_length
+                self._file_request = request_id
+                self._file_remaining = file_size
+                yield FILE_START_EVENT, request_id, (file_name, file_size)
+            else:
+                raise ValueError(f"Unknown frame type {frame_type}")
@@ -0,0 +1,211 @@
+import ipaddress
+import struct
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+from core.fib import Prefix
+from core.router import ADVERTISE_ALL, INFINITY, POISON_REVERSE, SPLIT_HORIZON
+from core.routing_table import RoutingTable, router_ids
+
+# RIPv2 commands and version
+COMMAND_REQUEST = 1
+COMMAND_RESPONSE = 2
+RIP_VERSION = 2
+
+# Address family of a route entry (AF_INET)
+AFI_INET = 2
+# RIPv2 allows at most 25 route entries per datagram
+MAX_ENTRIES = 25
+HOST_MASK = 0xFFFFFFFF
+# Route tag of host routes to routers; originated prefixes, /32 ones included, go untagged
+ROUTER_TAG = 1
+PREFIX_TAG = 0
+
+# command, version, must-be-zero, originating router address. RIPv2 takes the
+# sender from the datagram's source address; routers emulated on one loopback
+# address need it in the header instead.
+HEADER = struct.Struct("!BBHI")
+# address family, route tag, address, subnet mask, next hop, metric
+ENTRY = struct.Struct("!HHIIII")
+MAX_DATAGRAM = HEADER.size + MAX_ENTRIES * ENTRY.size
+
+# Decoded route entry, in wire order: (route tag, address, mask, next hop, metric)
+RouteEntry = Tuple[int, int, int, int, int]
+
+
+class RIPPacket(NamedTuple):
+    command: int
+    sender: int
+    entries: List[RouteEntry]
+
+
+class AddressBook:
+    """Maps router ids to the 32-bit addresses carried in RIP entries"""
+
+    def __init__(self, addresses: Optional[Mapping[str, Union[str, int]]] = None):
+        self._addresses: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+        for name, address in (addresses or {}).items():
+            self.assign(name, address)
+
+    def assign(self, name: str, address: Union[str, int]):
+        """Give a router id an IPv4 address (dotted string or integer)"""
+        value = int(ipaddress.IPv4Address(address))
+        self._addresses[name] = value
+        self._names[value] = name
+
+    def address(self, name: str) -> int:
+        """Return the address of a router id; ids that are IPv4 addresses map to themselves"""
+        value = self._addresses.get(name)
+        if value is not None:
+            return value
+        try:
+            return int(ipaddress.IPv4Address(name))
+        except ValueError:
+            raise ValueError(f"No address assigned to router {name}") from None
+
+    def name(self, address: int) -> str:
+        """Return the router id for an address, or the address in dotted form"""
+        name = self._names.get(address)
+        return name if name is not None else str(ipaddress.IPv4Address(address))
+
+
+def routes_from_table(routing_table: Mapping, book: AddressBook,
+                      prefixes: Optional[Mapping[str, Iterable[Prefix]]] = None, neighbor: Optional[str] = None,
+                      advertise_mode: str = ADVERTISE_ALL, infinity: int = INFINITY) -> List[RouteEntry]:
+    """
+    Convert a routing table into ``(route_tag, address, mask, next_hop, metric)`` entries
+
+    Every destination router is advertised as a host route tagged
+    ROUTER_TAG, so receivers do not mistake it for an originated /32. With ``prefixes``
+    the CIDR prefixes each destination originates are advertised as well, at
+    the cost and next hop of the route to it. When the entries are meant for
+    ``neighbor``, routes through that neighbor are left out under split
+    horizon and advertised at ``infinity`` under poison reverse.
+
+    Args:
+        routing_table (Mapping): A core RoutingTable or a legacy dict of
+            ``{dest: {"cost", "next_hop"}}`` keyed by router id
+        book (AddressBook): Router id to address mapping
+        prefixes (Mapping[str, Iterable[Prefix]], optional): ``(network, length)``
+            prefixes originated by each router id
+        neighbor (str, optional): Router id of the neighbor the entries are sent to
+        advertise_mode (str): Filtering applied towards ``neighbor`` (see ADVERTISE_MODES)
+        infinity (int): Metric of poisoned routes
+
+    Returns:
+        List[RouteEntry]: Routes ready for encode_response
+    """
+    if isinstance(routing_table, RoutingTable):
+        # Read the integer arrays instead of building a dict per route
+        name = router_ids.name
+        routes = [(name(dest), cost, name(next_hop)) for dest, cost, next_hop in routing_table.entries()]
+    else:
+        routes = [(dest, info["cost"], info.get("next_hop", dest)) for dest, info in routing_table.items()]
+
+    address = book.address
+    entries = []
+    for dest, cost, next_hop in routes:
+        if neighbor is not None and next_hop == neighbor:
+            if advertise_mode == SPLIT_HORIZON:
+                continue
+            if advertise_mode == POISON_REVERSE:
+                cost = infinity
+        next_hop_address = address(next_hop)
+        entries.append((ROUTER_TAG, address(dest), HOST_MASK, next_hop_address, cost))
+        if prefixes:
+            for network, length in prefixes.get(dest, ()):
+                entries.append((PREFIX_TAG, network, (HOST_MASK << (32 - length)) & HOST_MASK, next_hop_address,
+                                cost))
+    return entries
+
+
+def encode_response(sender: int, routes: Iterable[RouteEntry], command: int = COMMAND_RESPONSE) -> List[bytes]:
+    """
+    Pack routes into RIPv2-style datagrams of at most MAX_ENTRIES entries
+
+    Args:
+        sender (int): Address of the advertising router
+        routes (Iterable[RouteEntry]): ``(route_tag, address, mask, next_hop, metric)`` routes
+        command (int): COMMAND_RESPONSE or COMMAND_REQUEST
+
+    Returns:
+        List[bytes]: Datagrams; an empty table still produces one header-only datagram
+    """
+    datagrams = []
+    buffer = bytearray(MAX_DATAGRAM)
+    HEADER.pack_into(buffer, 0, command, RIP_VERSION, 0, sender)
+    offset = HEADER.size
+    pack_into = ENTRY.pack_into
+
+    for tag, address, mask, next_hop, metric in routes:
+        pack_into(buffer, offset, AFI_INET, tag, address, mask, next_hop, metric)
+        offset += ENTRY.size
+        if offset == MAX_DATAGRAM:
+            datagrams.append(bytes(buffer))
+            offset = HEADER.size
+
+    if offset > HEADER.size or not datagrams:
+        datagrams.append(bytes(buffer[:offset]))
+    return datagrams
+
+
+def is_rip_packet(data: bytes) -> bool:
+    """Tell a binary RIP datagram apart from the JSON update format"""
+    return len(data) >= HEADER.size and data[0] in (COMMAND_REQUEST, COMMAND_RESPONSE) and data[1] == RIP_VERSION
+
+
+def decode_packet(data: bytes) -> RIPPacket:
+    """
+    Unpack a datagram produced by encode_response
+
+    Entries come back as plain tuples straight from struct.iter_unpack, with
+    entries of other address families dropped.
+
+    Args:
+        data (bytes): One datagram
+
+    Returns:
+        RIPPacket: Command, sender address and ``(route_tag, address, mask, next_hop, metric)`` entries
+    """
+    if len(data) < HEADER.size or (len(data) - HEADER.size) % ENTRY.size:
+        raise ValueError(f"Malformed RIP datagram of {len(data)} bytes")
+    command, version, _, sender = HEADER.unpack_from(data)
+    if version != RIP_VERSION:
+        raise ValueError(f"Unsupported RIP version {version}")
+
+    entries = [entry[1:] for entry in ENTRY.iter_unpack(memoryview(data)[HEADER.size:]) if entry[0] == AFI_INET]
+    return RIPPacket(command, sender, entries)
+
+
+def entries_to_table(entries: Iterable[RouteEntry], book: AddressBook) -> Dict[str, Dict[str, int]]:
+    """Materialize the router routes among decoded entries as the legacy ``{dest: {"cost", "next_hop"}}`` dict"""
+    return {
+        book.name(address): {"cost": metric, "next_hop": book.name(next_hop)}
+        for tag, address, mask, next_hop, metric in entries
+        if tag == ROUTER_TAG
+    }
+
+
+def entries_to_prefixes(entries: Iterable[RouteEntry]) -> Dict[Prefix, Tuple[int, int]]:
+    """
+    Collect the CIDR prefixes among decoded entries
+
+    Receivers do not build their FIB from these yet; RIPSimulation.build_fib
+    takes the origins in process from prefix_origins.
+
+    Args:
+        entries (Iterable[RouteEntry]): Decoded ``(route_tag, address, mask, next_hop, metric)`` entries
+
+    Returns:
+        Dict[Prefix, Tuple[int, int]]: ``(next_hop, metric)`` per ``(network, length)`` prefix
+    """
+    prefixes: Dict[Prefix, Tuple[int, int]] = {}
+    for tag, address, mask, next_hop, metric in entries:
+        if tag == ROUTER_TAG:
+            continue
+        prefix = (address & mask, 32 - (~mask & HOST_MASK).bit_length())
+        # A prefix originated by several routers keeps the cheapest route
+        current = prefixes.get(prefix)
+        if current is None or metric < current[1]:
+            prefixes[prefix] = (next_hop, metric)
+    return prefixes
@@ -1,14 +1,86 @@
+import asyncio
+import hashlib
+import itertools
+import mmap
+import queue
 import socket
+import struct
+import threading
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+from network_utils.connection_pool import ConnectionPool
+from core.router import ADVERTISE_ALL
+from core.routing_table import ABSENT, RoutingTable, router_ids
+from network_utils.framing import (ACK, ACK_BAD_BLOCK, ACK_OK, ACK_RESYNC, BLOCK, BLOCK_EVENT, BLOCK_QUERY_EVENT,
+                                   FILE_DATA_EVENT, FILE_END_EVENT, FILE_START_EVENT, FRAME_ACK, FRAME_BLOCK,
+                                   FRAME_BLOCK_QUERY, FRAME_BLOCK_STATUS, FRAME_HEADER, FRAME_RIP_DELTA,
+                                   RIP_DELTA_EVENT, RIP_UPDATE_EVENT, SESSION, FrameParser, encode_frame,
+                                   file_frame_header, read_frame)
+from network_utils.rip_packet import (AddressBook, MAX_DATAGRAM, decode_packet, encode_response, is_rip_packet,
+                                      routes_from_table)
+from security.async_tls import DEFAULT_HANDSHAKE_TIMEOUT, open_tls_connection, start_tls_server
+
+# Message types of the legacy unframed protocol, still accepted by the servers
+RIP_UPDATE = b"RIP_UPDATE"
+FILE_TRANSFER = b"FILE_TRANSFER"
+
+# Received file data is buffered up to this size before each executor write
+FILE_WRITE_BUFFER = 1 << 20
+# The blocking servers receive file data into one preallocated buffer of this size
+FILE_RECEIVE_BUFFER = 1 << 22
+# Block size of parallel transfers, and how often a block failing its checksum is resent
+TRANSFER_BLOCK_SIZE = 1 << 20
+BLOCK_ATTEMPTS = 3
+# Persisted bitmap of a block transfer: transfer id, file size and block size, then one bit per block
+BITMAP_HEADER = struct.Struct("!16sQI")
 
 class RIPSocketHandler:
-    def __init__(self, router_id, host='127.0.0.1', port=65432, save_directory='server_files'):
+    def __init__(self, router_id, host='127.0.0.1', port=65432, save_directory='server_files',
+                 on_rip_update=None, backlog=1024, addresses=None, on_rip_datagram=None, persistent=False,
+                 mmap_files=False, on_file_received=None, tls=False, certfile=None, keyfile=None, cafile=None,
+                 handshake_timeout=DEFAULT_HANDSHAKE_TIMEOUT):
         """Initialize the socket handler for a router."""
         self.router_id = router_id
         self.host = host
         self.port = port
         self.save_directory = save_directory
+        # Called with every decoded JSON RIP packet, e.g. to feed a Router
+        self.on_rip_update = on_rip_update
+        # Called with every decoded binary RIPPacket
+        self.on_rip_datagram = on_rip_datagram
+        # Called with the path of every completely received file
+        self.on_file_received = on_file_received
+        # Receive files into a pre-sized memory-mapped output file instead of write() calls
+        self.mmap_files = mmap_files
+        # Router id <-> IPv4 address mapping used by the binary format
+        self.addresses = AddressBook(addresses)
+        self._udp_socket = None
+        # Long-lived session connections reused across sends; None keeps one connection per message
+        self.pool = ConnectionPool(greeting=SESSION) if persistent else None
+        # Request ids stamped on outgoing frames
+        self._request_ids = itertools.count(1)
+        # Per-neighbor delta update state: what the peer acknowledged, and on which connection
+        self._rip_sessions = {}
+        # Update frames and bytes sent as whole tables vs deltas, and resyncs requested by peers
+        self.update_stats = {"full_updates": 0, "full_bytes": 0, "delta_updates": 0, "delta_bytes": 0,
+                             "resyncs": 0}
+        # Block transfers being received, by transfer id, shared by all connections
+        self._block_transfers = {}
+        self._block_lock = threading.Lock()
+        # TLS on the asyncio server (certfile/keyfile) and async sends (server verified against cafile);
+        # peers that have not finished the handshake after handshake_timeout seconds are dropped
+        self.tls = tls
+        self.certfile = certfile
+        self.keyfile = keyfile
+        self.cafile = cafile
+        self.handshake_timeout = handshake_timeout
+        # Listen backlog of the asyncio server; hundreds of peers may connect at once
+        self.backlog = backlog
+        self.async_server = None
+        # Open peer connections of the asyncio server, closed when it stops
+        self._peer_writers = set()
         os.makedirs(save_directory, exist_ok=True)  # Ensure the save directory exists
 
     def start_server(self):
@@ -20,11 +92,18 @@ class RIPSocketHandler:
 
             while True:
                 conn, addr = server_socket.accept()
-                with conn:
-                    print(f"Router {self.router_id} connected by {addr}")
+                print(f"Router {self.router_id} connected by {addr}")
+                message_type = conn.recv(1024)
+                if message_type.startswith(SESSION):
+                    # Persistent peers get their own thread so they do not hold up the accept loop
+                    threading.Thread(
+                        target=self._serve_session, args=(conn, addr, message_type[len(SESSION):]), daemon=True
+                    ).start()
+                    continue
 
+                with conn:
                     # Receive the message type (RIP update or file transfer)
-                    message_type = conn.recv(1024).decode()
+                    message_type = message_type.decode()
 
                     if message_type == "RIP_UPDATE":
                         self._receive_rip_update(conn)
@@ -33,13 +112,314 @@ class RIPSocketHandler:
                     else:
                         print("Unknown message type received.")
 
+    def start_async_server(self):
+        """Start the asyncio server; blocks until interrupted."""
+        asyncio.run(self.serve_async())
+
+    def start_udp_server(self):
+        """Receive binary RIP datagrams over UDP; blocks until interrupted."""
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as udp_socket:
+            udp_socket.bind((self.host, self.port))
+            print(f"Router {self.router_id} listening for RIP datagrams on {self.host}:{self.port}")
+            while True:
+                data, addr = udp_socket.recvfrom(MAX_DATAGRAM)
+                self._receive_rip_datagram(data, addr)
+
+    async def serve_async(self, udp=True):
+        """Serve every peer concurrently on the running event loop until cancelled."""
+        transport = None
+        if udp:
+            transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+                lambda: _RIPDatagramProtocol(self), local_addr=(self.host, self.port)
+            )
+        if self.tls:
+            self.async_server = await start_tls_server(
+                self._handle_peer, self.host, self.port, self.certfile, self.keyfile,
+                handshake_timeout=self.handshake_timeout, backlog=self.backlog
+            )
+        else:
+            self.async_server = await asyncio.start_server(
+                self._handle_peer, self.host, self.port, backlog=self.backlog
+            )
+        print(f"Router {self.router_id} listening on {self.host}:{self.port} (asyncio{', TLS' if self.tls else ''})")
+        try:
+            async with self.async_server:
+                await self.async_server.serve_forever()
+        finally:
+            if transport is not None:
+                transport.close()
+            # Persistent sessions would otherwise outlive the server
+            for writer in list(self._peer_writers):
+                writer.close()
+
+    async def _handle_peer(self, reader, writer):
+        """Handle one peer connection without blocking the others."""
+        addr = writer.get_extra_info("peername")
+        self._peer_writers.add(writer)
+        try:
+            # Same message boundaries as start_server: the type arrives first,
+            # but any payload bytes that came with it are kept
+            data = await reader.read(1024)
+            if data.startswith(SESSION):
+                await self._serve_session_async(reader, writer, data[len(SESSION):])
+            elif data.startswith(RIP_UPDATE):
+                await self._receive_rip_update_async(reader, data[len(RIP_UPDATE):])
+            elif data.startswith(FILE_TRANSFER):
+                await self._receive_file_async(reader, data[len(FILE_TRANSFER):])
+            else:
+                print(f"Unknown message type received from {addr}.")
+        except (ConnectionError, ValueError, OSError, asyncio.IncompleteReadError) as e:
+            print(f"Error handling peer {addr}: {e}")
+        finally:
+            self._peer_writers.discard(writer)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _serve_session_async(self, reader, writer, data):
+        """Handle pipelined frames on a framed connection until the peer closes it."""
+        loop = asyncio.get_running_loop()
+        parser = FrameParser()
+        file = file_name = None
+        buffer = bytearray()
+        peers = {}
+        try:
+            # The greeting may arrive alone, so an empty first read is not the end
+            while True:
+                parser.feed(data)
+                for event, request_id, payload in parser.events():
+                    if event == RIP_UPDATE_EVENT:
+                        self._process_rip_update_payload(payload)
+                    elif event == RIP_DELTA_EVENT:
+                        writer.write(self._process_rip_delta(payload, request_id, peers))
+                        await writer.drain()
+                    elif event == BLOCK_QUERY_EVENT:
+                        writer.write(await loop.run_in_executor(None, self._process_block_query, payload, request_id))
+                        await writer.drain()
+                    elif event == BLOCK_EVENT:
+                        # Hashing and the positional write run off the event loop; the
+                        # payload stays valid because this session reads nothing meanwhile
+                        writer.write(await loop.run_in_executor(None, self._process_block, payload, request_id))
+                        await writer.drain()
+                    elif event == FILE_START_EVENT:
+                        file_name, file_size = payload
+                        print(f"Receiving file: {file_name} ({file_size} bytes, request {request_id})")
+                        file = await loop.run_in_executor(
+                            None, open, os.path.join(self.save_directory, file_name), 'wb'
+                        )
+                    elif event == FILE_DATA_EVENT:
+                        buffer += payload
+                        if len(buffer) >= FILE_WRITE_BUFFER:
+                            await loop.run_in_executor(None, file.write, bytes(buffer))
+                            buffer.clear()
+                    elif event == FILE_END_EVENT:
+                        await loop.run_in_executor(None, file.write, bytes(buffer))
+                        buffer.clear()
+                        await loop.run_in_executor(None, file.close)
+                        file = None
+                        print(f"File {file_name} received successfully.")
+                        self._file_received(file_name)
+                data = await reader.read(65536)
+                if not data:
+                    break
+            if not parser.idle:
+                raise ConnectionError("Connection closed in the middle of a frame")
+        finally:
+            if file is not None:
+                await loop.run_in_executor(None, file.close)
+
+    async def _receive_rip_update_async(self, reader, data):
+        """Receive a RIP update; the sender closes the connection after the packet."""
+        data += await reader.read()
+        self._process_rip_update_payload(data)
+
+    async def _receive_file_async(self, reader, data):
+        """Receive a file, writing it in an executor so the event loop keeps serving peers."""
+        file_name = (data or await reader.read(1024)).decode()
+        if not file_name:
+            print("No file name received. Closing connection.")
+            return
+
+        file_size = int((await reader.read(1024)).decode())
+        print(f"Receiving file: {file_name} ({file_size} bytes)")
+
+        loop = asyncio.get_running_loop()
+        file_path = os.path.join(self.save_directory, file_name)
+        file = await loop.run_in_executor(None, open, file_path, 'wb')
+        try:
+            received_size = 0
+            buffer = bytearray()
+            while received_size < file_size:
+                data = await reader.read(min(65536, file_size - received_size))
+                if not data:
+                    break
+                buffer += data
+                received_size += len(data)
+                if len(buffer) >= FILE_WRITE_BUFFER:
+                    await loop.run_in_executor(None, file.write, bytes(buffer))
+                    buffer.clear()
+            if buffer:
+                await loop.run_in_executor(None, file.write, bytes(buffer))
+        finally:
+            await loop.run_in_executor(None, file.close)
+
+        print(f"File {file_name} received successfully.")
+        self._file_received(file_name)
+
+    def _serve_session(self, conn, addr, data):
+        """Handle pipelined frames on a framed connection until the peer closes it."""
+        parser = FrameParser()
+        parser.feed(data)
+        receive_buffer = None
+        file = file_name = None
+        peers = {}
+        with conn:
+            try:
+                while True:
+                    for event, request_id, payload in parser.events():
+                        if event == RIP_UPDATE_EVENT:
+                            self._process_rip_update_payload(payload)
+                        elif event == RIP_DELTA_EVENT:
+                            conn.sendall(self._process_rip_delta(payload, request_id, peers))
+                        elif event == BLOCK_QUERY_EVENT:
+                            conn.sendall(self._process_block_query(payload, request_id))
+                        elif event == BLOCK_EVENT:
+                            conn.sendall(self._process_block(payload, request_id))
+                        elif event == FILE_START_EVENT:
+                            file_name, file_size = payload
+                            print(f"Receiving file: {file_name} ({file_size} bytes, request {request_id})")
+                            if receive_buffer is None and not self.mmap_files:
+                                receive_buffer = bytearray(FILE_RECEIVE_BUFFER)
+                            file = _FileReceiver(os.path.join(self.save_directory, file_name), file_size,
+                                                 self.mmap_files, receive_buffer)
+                        elif event == FILE_DATA_EVENT:
+                            file.write(payload)
+                        elif event == FILE_END_EVENT:
+                            file.close()
+                            file = None
+                            print(f"File {file_name} received successfully.")
+                            self._file_received(file_name)
+
+                    if parser.file_remaining:
+                        # The buffered start of the file is written; the rest bypasses the parser
+                        received = file.receive(conn, parser.file_remaining)
+                        parser.skip_file_data(received)
+                        if parser.file_remaining:
+                            raise ConnectionError("Connection closed in the middle of a frame")
+                        continue
+
+                    # Receive straight into the parser's buffer
+                    received = conn.recv_into(parser.get_buffer())
+                    if not received:
+                        if not parser.idle:
+                            raise ConnectionError("Connection closed in the middle of a frame")
+                        return
+                    parser.advance(received)
+            except (ConnectionError, ValueError, OSError) as e:
+                print(f"Error handling session from {addr}: {e}")
+            finally:
+                if file is not None:
+                    file.close()
+
     def _receive_rip_update(self, conn):
-        """Receive and process a RIP update."""
-        data = conn.recv(4096).decode()
-        rip_packet = json.loads(data)
+        """Receive and process a RIP update, either JSON or one binary datagram."""
+        self._process_rip_update_payload(conn.recv(4096))
+
+    def _process_rip_update_payload(self, data):
+        """Decode a RIP update payload in either the binary or the JSON format."""
+        if is_rip_packet(data):
+            self._receive_rip_datagram(data)
+            return
+        self._process_rip_packet(json.loads(bytes(data)))
+
+    def _process_rip_delta(self, payload, request_id, peers):
+        """Apply a delta update to the sender's table kept in peers and return the ack frame."""
+        delta = json.loads(bytes(payload))
+        router_id = delta["router_id"]
+        sequence = delta["sequence"]
+        peer = peers.get(router_id)
+        if delta["full"]:
+            routing_table = delta["routing_table"]
+        elif peer is not None and sequence == peer[0] + 1:
+            routing_table = peer[1]
+            routing_table.update(delta["routing_table"])
+            for dest in delta["withdrawn"]:
+                routing_table.pop(dest, None)
+        else:
+            # Missed an update (or never had the table on this connection); ask for all of it
+            print(f"Sequence gap from Router {router_id} at {sequence}; requesting a full update")
+            peers.pop(router_id, None)
+            return encode_frame(FRAME_ACK, request_id, ACK.pack(sequence, ACK_RESYNC))
+
+        peers[router_id] = (sequence, routing_table)
+        print(f"Received RIP update {sequence} from Router {router_id}: "
+              f"{'full table' if delta['full'] else 'delta'} of {len(delta['routing_table'])} routes, "
+              f"{len(delta['withdrawn'])} withdrawn")
+        if self.on_rip_update is not None:
+            # Later deltas patch the session's table in place; the callback gets its own copy of every route
+            snapshot = {dest: dict(route) for dest, route in routing_table.items()}
+            self.on_rip_update({"router_id": router_id, "routing_table": snapshot})
+        return encode_frame(FRAME_ACK, request_id, ACK.pack(sequence, ACK_OK))
+
+    def _process_block_query(self, payload, request_id):
+        """Open (or resume) a block transfer and return the bitmap of blocks already received."""
+        query = json.loads(bytes(payload))
+        transfer_id = bytes.fromhex(query["transfer"])
+        with self._block_lock:
+            transfer = self._block_transfers.get(transfer_id)
+            if transfer is None:
+                transfer = _BlockTransferFile(self.save_directory, query["name"], transfer_id, query["size"],
+                                              query["block_size"])
+                self._block_transfers[transfer_id] = transfer
+                print(f"Receiving file: {query['name']} ({query['size']} bytes in {transfer.blocks} blocks, "
+                      f"{transfer.blocks - transfer.missing} already received)")
+            bitmap = transfer.bitmap_snapshot()
+            if not transfer.missing:
+                # Every block arrived before the file could be moved into place
+                del self._block_transfers[transfer_id]
+                transfer.finish()
+                print(f"File {transfer.name} received successfully.")
+                self._file_received(transfer.name)
+        return encode_frame(FRAME_BLOCK_STATUS, request_id, bitmap)
+
+    def _process_block(self, payload, request_id):
+        """Verify one block, write it in place and return the ack frame."""
+        transfer_id, index, digest = BLOCK.unpack_from(payload)
+        data = payload[BLOCK.size:]
+        transfer = self._block_transfers.get(transfer_id)
+        if transfer is None:
+            raise ValueError(f"Block {index} of an unknown transfer")
+        if hashlib.sha256(data).digest() != digest:
+            print(f"Block {index} of {transfer.name} failed its checksum")
+            return encode_frame(FRAME_ACK, request_id, ACK.pack(index, ACK_BAD_BLOCK))
+
+        if transfer.write_block(index, data):
+            with self._block_lock:
+                self._block_transfers.pop(transfer_id, None)
+            print(f"File {transfer.name} received successfully.")
+            self._file_received(transfer.name)
+        return encode_frame(FRAME_ACK, request_id, ACK.pack(index, ACK_OK))
 
+    def _receive_rip_datagram(self, data, addr=None):
+        """Decode a binary RIP datagram without building a dict per route."""
+        try:
+            packet = decode_packet(data)
+        except ValueError as e:
+            print(f"Dropping RIP datagram from {addr}: {e}")
+            return
+        print(f"Received RIP update from Router {self.addresses.name(packet.sender)}: "
+              f"{len(packet.entries)} routes")
+        if self.on_rip_datagram is not None:
+            self.on_rip_datagram(packet)
+
+    def _process_rip_packet(self, rip_packet):
+        """Report a decoded RIP packet and hand it to on_rip_update."""
         print(f"Received RIP update from Router {rip_packet['router_id']}:")
         print(json.dumps(rip_packet['routing_table'], indent=2))
+        if self.on_rip_update is not None:
+            self.on_rip_update(rip_packet)
 
     def _receive_file(self, conn):
         """Receive a file and save it to the designated directory."""
@@ -53,17 +433,19 @@ class RIPSocketHandler:
         print(f"Receiving file: {file_name} ({file_size} bytes)")
 
         # Receive file data
-        file_path = os.path.join(self.save_directory, file_name)
-        with open(file_path, 'wb') as file:
-            received_size = 0
-            while received_size < file_size:
-                data = conn.recv(1024)
-                if not data:
-                    break
-                file.write(data)
-                received_size += len(data)
+        file = _FileReceiver(os.path.join(self.save_directory, file_name), file_size, self.mmap_files)
+        try:
+            file.receive(conn, file_size)
+        finally:
+            file.close()
 
         print(f"File {file_name} received successfully.")
+        self._file_received(file_name)
+
+    def _file_received(self, file_name):
+        """Hand the path of a completely received file to on_file_received."""
+        if self.on_file_received is not None:
+            self.on_file_received(os.path.join(self.save_directory, file_name))
 
     def send_file(self, file_path, target_host, target_port):
         """Send a file to another router."""
@@ -74,43 +456,381 @@ class RIPSocketHandler:
         file_name = os.path.basename(file_path)
         file_size = os.path.getsize(file_path)
 
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as client_socket:
-            client_socket.connect((target_host, target_port))
-            print(f"Router {self.router_id} connected to {target_host}:{target_port}")
-
-            # Send message type
-            client_socket.sendall(b"FILE_TRANSFER")
+        header = file_frame_header(next(self._request_ids), file_name, file_size)
 
-            # Send file metadata
-            client_socket.sendall(file_name.encode())
-            client_socket.sendall(str(file_size).encode())
-
-            # Send file data
+        def transfer(client_socket):
+            client_socket.sendall(header)
+            # The kernel copies the file to the socket (os.sendfile) without passing through Python
             with open(file_path, 'rb') as file:
-                while chunk := file.read(1024):
-                    client_socket.sendall(chunk)
+                client_socket.sendfile(file)
 
-            print(f"File {file_name} sent successfully.")
+        self._send_framed(target_host, target_port, transfer)
+        print(f"File {file_name} sent successfully.")
 
     def send_rip_update(self, target_host, target_port, routing_table):
-        """Send a RIP update to another router."""
-        rip_packet = {
+        """Send a RIP update to another router; on a persistent session only the routes changed since its last ack."""
+        peer = (target_host, target_port)
+
+        def exchange(client_socket):
+            session = self._rip_sessions.get(peer)
+            # Deltas are relative to what the peer acknowledged on this very connection; a
+            # RoutingTable's versions only mean something for that same table
+            if session is not None and (session.sock is not client_socket or (
+                    session.table is not routing_table and
+                    (isinstance(routing_table, RoutingTable) or isinstance(session.table, RoutingTable)))):
+                session = None
+            if self._send_rip_delta(client_socket, peer, routing_table, session) == ACK_RESYNC:
+                self.update_stats["resyncs"] += 1
+                if self._send_rip_delta(client_socket, peer, routing_table, None) == ACK_RESYNC:
+                    raise ConnectionError(f"Peer {target_host}:{target_port} rejected a full update")
+
+        self._send_framed(target_host, target_port, exchange)
+        print(f"RIP update sent successfully to {target_host}:{target_port}.")
+
+    def _send_rip_delta(self, client_socket, peer, routing_table, session):
+        """Send the changes since session (everything if None), wait for the ack and return its status."""
+        request_id, sequence, acked, frame = self._rip_delta_frame(routing_table, session)
+        client_socket.sendall(frame)
+        status = self._read_ack(client_socket, request_id, sequence)
+        if status == ACK_OK:
+            self._rip_sessions[peer] = _RIPSession(client_socket, routing_table, sequence, acked)
+        return status
+
+    def _rip_delta_frame(self, routing_table, session):
+        """Build the delta frame of the changes since session; returns request id, sequence, acked state and frame."""
+        sequence = session.sequence + 1 if session is not None else 1
+        if isinstance(routing_table, RoutingTable):
+            version = routing_table.version
+            name = router_ids.name
+            changed = {}
+            withdrawn = []
+            for dest, cost, next_hop in routing_table.changes_since(session.acked if session is not None else 0):
+                if cost == ABSENT:
+                    withdrawn.append(name(dest))
+                else:
+                    changed[name(dest)] = {"cost": cost, "next_hop": name(next_hop)}
+            acked = version
+        else:
+            # Keep a copy of what was sent to diff the next update against
+            acked = {dest: dict(route) for dest, route in routing_table.items()}
+            if session is None:
+                changed, withdrawn = routing_table, []
+            else:
+                changed = {dest: route for dest, route in routing_table.items() if session.acked.get(dest) != route}
+                withdrawn = [dest for dest in session.acked if dest not in routing_table]
+
+        delta = {
             "router_id": self.router_id,
-            "routing_table": routing_table
+            "sequence": sequence,
+            "full": session is None,
+            "routing_table": changed,
+            "withdrawn": withdrawn
         }
-        serialized_packet = json.dumps(rip_packet).encode('utf-8')
+        request_id = next(self._request_ids)
+        frame = encode_frame(FRAME_RIP_DELTA, request_id, json.dumps(delta).encode('utf-8'))
+        kind = "full" if session is None else "delta"
+        self.update_stats[f"{kind}_updates"] += 1
+        self.update_stats[f"{kind}_bytes"] += len(frame)
+        return request_id, sequence, acked, frame
+
+    @staticmethod
+    def _read_ack(client_socket, request_id, sequence):
+        """Wait for the ack of one request and return its status."""
+        frame_type, reply_id, reply = read_frame(client_socket)
+        if frame_type != FRAME_ACK or reply_id != request_id or len(reply) != ACK.size:
+            raise ConnectionError(f"Unexpected reply to request {request_id}")
+        acked, status = ACK.unpack(reply)
+        if acked != sequence:
+            raise ConnectionError(f"Reply to request {request_id} acknowledges {acked} instead of {sequence}")
+        return status
+
+    def send_file_parallel(self, file_path, target_host, target_port, connections=4,
+                           block_size=TRANSFER_BLOCK_SIZE):
+        """Send a file as checksummed blocks over parallel connections, skipping blocks the peer already has."""
+        if not os.path.exists(file_path):
+            print(f"File {file_path} does not exist.")
+            return None
+
+        file_name = os.path.basename(file_path)
+        file_stat = os.stat(file_path)
+        file_size = file_stat.st_size
+        blocks = max(1, -(-file_size // block_size))
+        # Same file, size, modification time and block size: same transfer, so it can be resumed
+        transfer_id = hashlib.blake2b(
+            f"{file_name}\0{file_size}\0{file_stat.st_mtime_ns}\0{block_size}".encode(), digest_size=16
+        ).digest()
+        summary = {"blocks": blocks, "sent": 0, "skipped": 0, "resent": 0, "bytes": 0}
+        lock = threading.Lock()
+        pending = queue.Queue()
+
+        def open_connection():
+            client_socket = socket.create_connection((target_host, target_port))
+            client_socket.sendall(SESSION)
+            return client_socket
+
+        with open_connection() as client_socket:
+            request_id = next(self._request_ids)
+            query = {"transfer": transfer_id.hex(), "name": file_name, "size": file_size, "block_size": block_size}
+            client_socket.sendall(encode_frame(FRAME_BLOCK_QUERY, request_id, json.dumps(query).encode('utf-8')))
+            frame_type, reply_id, bitmap = read_frame(client_socket)
+            if frame_type != FRAME_BLOCK_STATUS or reply_id != request_id:
+                raise ConnectionError(f"Unexpected reply to block query {request_id}")
+        for index in range(blocks):
+            if bitmap[index >> 3] & (1 << (index & 7)):
+                summary["skipped"] += 1
+            else:
+                pending.put(index)
+
+        file_descriptor = os.open(file_path, os.O_RDONLY)
+
+        def send_blocks():
+            with open_connection() as client_socket:
+                while True:
+                    try:
+                        index = pending.get_nowait()
+                    except queue.Empty:
+                        return
+                    data = os.pread(file_descriptor, block_size, index * block_size)
+                    digest = hashlib.sha256(data).digest()
+                    for attempt in range(BLOCK_ATTEMPTS):
+                        request_id = next(self._request_ids)
+                        # Header and block go out in one call without being joined into a new buffer
+                        client_socket.sendmsg([
+                            FRAME_HEADER.pack(FRAME_BLOCK, BLOCK.size + len(data), request_id),
+                            BLOCK.pack(transfer_id, index, digest), data
+                        ])
+                        if self._read_ack(client_socket, request_id, index) == ACK_OK:
+                            break
+                        with lock:
+                            summary["resent"] += 1
+                    else:
+                        raise ConnectionError(f"Block {index} of {file_name} failed its checksum "
+                                              f"{BLOCK_ATTEMPTS} times")
+                    with lock:
+                        summary["sent"] += 1
+                        summary["bytes"] += len(data)
+
+        workers = max(1, min(connections, pending.qsize()))
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for future in [executor.submit(send_blocks) for _ in range(workers)]:
+                    future.result()
+        finally:
+            os.close(file_descriptor)
+
+        print(f"File {file_name} sent successfully: {summary['sent']} blocks sent, "
+              f"{summary['skipped']} already at the receiver.")
+        return summary
+
+    def _send_framed(self, target_host, target_port, operation):
+        """Run ``operation`` on a framed connection: a pooled one, or a fresh one closed afterwards."""
+        if self.pool is not None:
+            # Frames go out back to back on the pooled connection without waiting for the peer
+            self.pool.run(target_host, target_port, operation)
+            return
 
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as client_socket:
             client_socket.connect((target_host, target_port))
             print(f"Router {self.router_id} connected to {target_host}:{target_port}")
+            client_socket.sendall(SESSION)
+            operation(client_socket)
+
+    async def send_rip_update_async(self, target_host, target_port, routing_table):
+        """Send a whole RIP update from the event loop, over TLS if enabled, and wait for the peer's ack."""
+        if self.tls:
+            reader, writer = await open_tls_connection(target_host, target_port, cafile=self.cafile,
+                                                       handshake_timeout=self.handshake_timeout)
+        else:
+            reader, writer = await asyncio.open_connection(target_host, target_port)
+        try:
+            request_id, sequence, _, frame = self._rip_delta_frame(routing_table, None)
+            writer.write(SESSION + frame)
+            await writer.drain()
+            frame_type, length, reply_id = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+            if frame_type != FRAME_ACK or reply_id != request_id or length != ACK.size:
+                raise ConnectionError(f"Unexpected reply to request {request_id}")
+            acked, status = ACK.unpack(await reader.readexactly(length))
+            if acked != sequence or status != ACK_OK:
+                raise ConnectionError(f"Peer {target_host}:{target_port} rejected request {request_id}")
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        print(f"RIP update sent successfully to {target_host}:{target_port}.")
+
+    def send_rip_update_udp(self, target_host, target_port, routing_table, prefixes=None, neighbor=None,
+                            advertise_mode=ADVERTISE_ALL):
+        """Send a RIP update and originated prefixes as UDP datagrams, filtered for neighbor; returns bytes sent."""
+        routes = routes_from_table(routing_table, self.addresses, prefixes, neighbor, advertise_mode)
+        datagrams = encode_response(self.addresses.address(self.router_id), routes)
+        if self._udp_socket is None:
+            self._udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        for datagram in datagrams:
+            self._udp_socket.sendto(datagram, (target_host, target_port))
+
+        print(f"RIP update sent in {len(datagrams)} datagrams to {target_host}:{target_port}.")
+        return sum(len(datagram) for datagram in datagrams)
+
+    def close(self):
+        """Close pooled connections and the UDP socket."""
+        if self.pool is not None:
+            self.pool.close()
+        if self._udp_socket is not None:
+            self._udp_socket.close()
+            self._udp_socket = None
 
-            # Send message type
-            client_socket.sendall(b"RIP_UPDATE")
 
-            # Send RIP packet
-            client_socket.sendall(serialized_packet)
+class _RIPSession:
+    """What a neighbor acknowledged: the table sent, its version or a copy, and the connection it came on."""
+
+    __slots__ = ("sock", "table", "sequence", "acked")
+
+    def __init__(self, sock, table, sequence, acked):
+        self.sock = sock
+        self.table = table
+        self.sequence = sequence
+        self.acked = acked
+
+
+class _BlockTransferFile:
+    """A file received as blocks in any order, with its block bitmap persisted next to it."""
+
+    def __init__(self, save_directory, name, transfer_id, size, block_size):
+        """Open the partial file and its bitmap, picking up an interrupted transfer with the same id."""
+        self.name = name
+        self.size = size
+        self.block_size = block_size
+        self.blocks = max(1, -(-size // block_size))
+        self.path = os.path.join(save_directory, name)
+        self.partial_path = os.path.join(save_directory, f".{name}.part")
+        self.bitmap_path = os.path.join(save_directory, f".{name}.blocks")
+        self._lock = threading.Lock()
+
+        header = BITMAP_HEADER.pack(transfer_id, size, block_size)
+        bitmap_length = (self.blocks + 7) // 8
+        self.bitmap = bytearray(bitmap_length)
+        resumed = False
+        if os.path.exists(self.bitmap_path) and os.path.exists(self.partial_path):
+            with open(self.bitmap_path, 'rb') as bitmap_file:
+                saved = bitmap_file.read()
+            if saved[:BITMAP_HEADER.size] == header and len(saved) == BITMAP_HEADER.size + bitmap_length:
+                self.bitmap[:] = saved[BITMAP_HEADER.size:]
+                resumed = True
+
+        self._fd = os.open(self.partial_path, os.O_RDWR | os.O_CREAT | (0 if resumed else os.O_TRUNC), 0o644)
+        os.ftruncate(self._fd, size)
+        self._bitmap_fd = os.open(self.bitmap_path, os.O_RDWR | os.O_CREAT | (0 if resumed else os.O_TRUNC), 0o644)
+        if not resumed:
+            os.pwrite(self._bitmap_fd, header + self.bitmap, 0)
+        self.missing = self.blocks - sum(bin(byte).count("1") for byte in self.bitmap)
+
+    def bitmap_snapshot(self):
+        """Return a copy of the bitmap of received blocks."""
+        with self._lock:
+            return bytes(self.bitmap)
+
+    def write_block(self, index, data):
+        """Write a verified block at its offset and mark it received; returns True once the file is complete."""
+        expected = min(self.block_size, self.size - index * self.block_size) if self.size else 0
+        if not 0 <= index < self.blocks or len(data) != expected:
+            raise ValueError(f"Block {index} of {self.name} has the wrong index or length")
+        os.pwrite(self._fd, data, index * self.block_size)
+
+        with self._lock:
+            byte, bit = index >> 3, 1 << (index & 7)
+            if self.bitmap[byte] & bit:
+                return False
+            self.bitmap[byte] |= bit
+            # Only the changed bitmap byte is rewritten, after the block itself
+            os.pwrite(self._bitmap_fd, self.bitmap[byte:byte + 1], BITMAP_HEADER.size + byte)
+            self.missing -= 1
+            if self.missing:
+                return False
+            self.finish()
+            return True
+
+    def finish(self):
+        """Move the complete file into place and drop its bitmap."""
+        os.close(self._fd)
+        os.close(self._bitmap_fd)
+        os.replace(self.partial_path, self.path)
+        os.remove(self.bitmap_path)
+
+
+class _FileReceiver:
+    """Writes one received file, from given chunks or straight off a socket."""
+
+    def __init__(self, path, size, use_mmap=False, buffer=None):
+        """Open the output file; with use_mmap it is pre-sized and mapped so data lands in it directly."""
+        self.size = size
+        self.received = 0
+        self._map = None
+        if use_mmap and size:
+            self._file = open(path, 'wb+')
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+            self._view = memoryview(self._map)
+        else:
+            self._file = open(path, 'wb')
+            self._view = memoryview(buffer if buffer is not None else bytearray(min(size, FILE_RECEIVE_BUFFER) or 1))
+
+    def write(self, data):
+        """Write file contents that were already received."""
+        if self._map is not None:
+            self._view[self.received:self.received + len(data)] = data
+        else:
+            self._file.write(data)
+        self.received += len(data)
+
+    def receive(self, conn, count):
+        """Receive up to count bytes of the file from conn with recv_into; returns the number received."""
+        end = min(self.received + count, self.size)
+        start = self.received
+        if self._map is not None:
+            while self.received < end:
+                received = conn.recv_into(self._view[self.received:end])
+                if not received:
+                    break
+                self.received += received
+            return self.received - start
+
+        while self.received < end:
+            # Fill the whole buffer before each write
+            filled = 0
+            wanted = min(len(self._view), end - self.received)
+            while filled < wanted:
+                received = conn.recv_into(self._view[filled:wanted])
+                if not received:
+                    break
+                filled += received
+            self._file.write(self._view[:filled])
+            self.received += filled
+            if filled < wanted:
+                break
+        return self.received - start
+
+    def close(self):
+        """Close the output file, cutting a pre-sized one short if the transfer was cut short."""
+        if self._map is not None:
+            self._view.release()
+            self._map.close()
+            self._map = None
+            if self.received < self.size:
+                self._file.truncate(self.received)
+        self._file.close()
+
+
+class _RIPDatagramProtocol(asyncio.DatagramProtocol):
+    """Feeds UDP datagrams received by serve_async to the handler."""
+
+    def __init__(self, handler):
+        self.handler = handler
+
+    def datagram_received(self, data, addr):
+        self.handler._receive_rip_datagram(data, addr)
 
-            print(f"RIP update sent successfully to {target_host}:{target_port}.")
 
 # Example Usage
 if __name__ == "__main__":
@@ -118,22 +838,47 @@ if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="RIP Socket Handler for File Transfer and Updates")
     parser.add_argument("role", choices=["server", "client"], help="Role: server or client")
+    parser.add_argument("--asyncio", action="store_true", help="Serve peers concurrently on an asyncio event loop, or send updates from one")
+    parser.add_argument("--udp", action="store_true", help="Use binary RIP datagrams over UDP for updates")
+    parser.add_argument("--persistent", action="store_true", help="Send over a persistent session connection (client only)")
+    parser.add_argument("--addresses", type=json.loads, help="Router id to IPv4 address map for --udp, as JSON")
     parser.add_argument("--router_id", default="R1", help="Router ID")
     parser.add_argument("--host", default="127.0.0.1", help="Host address")
     parser.add_argument("--port", type=int, default=65432, help="Port number")
     parser.add_argument("--file", help="Path to the file (client only)")
     parser.add_argument("--routing_table", type=json.loads, help="Routing table (client only, as JSON)")
     parser.add_argument("--save_dir", default="server_files", help="Directory to save received files (server only)")
+    parser.add_argument("--mmap", action="store_true", help="Receive files into memory-mapped output files (server only)")
+    parser.add_argument("--tls", action="store_true", help="Use TLS: on the asyncio server with --certfile/--keyfile, "
+                                                           "or for an asyncio client send verified with --cafile")
+    parser.add_argument("--certfile", help="Server certificate (PEM) for --tls")
+    parser.add_argument("--keyfile", help="Server private key (PEM) for --tls")
+    parser.add_argument("--cafile", help="CA bundle to verify the server against for --tls (client only)")
+    parser.add_argument("--parallel", type=int, help="Send --file as checksummed blocks over this many connections; "
+                                                     "an interrupted transfer resumes (client only)")
 
     args = parser.parse_args()
 
-    handler = RIPSocketHandler(router_id=args.router_id, host=args.host, port=args.port, save_directory=args.save_dir)
+    handler = RIPSocketHandler(router_id=args.router_id, host=args.host, port=args.port, save_directory=args.save_dir,
+                               addresses=args.addresses, persistent=args.persistent, mmap_files=args.mmap,
+                               tls=args.tls, certfile=args.certfile, keyfile=args.keyfile, cafile=args.cafile)
 
     if args.role == "server":
-        handler.start_server()
+        if args.asyncio or args.tls:
+            handler.start_async_server()
+        elif args.udp:
+            handler.start_udp_server()
+        else:
+            handler.start_server()
     elif args.role == "client":
-        if args.file:
+        if args.file and args.parallel:
+            handler.send_file_parallel(args.file, args.host, args.port, connections=args.parallel)
+        elif args.file:
             handler.send_file(args.file, args.host, args.port)
+        elif args.routing_table and args.udp:
+            handler.send_rip_update_udp(args.host, args.port, args.routing_table)
+        elif args.routing_table and (args.asyncio or args.tls):
+            asyncio.run(handler.send_rip_update_async(args.host, args.port, args.routing_table))
         elif args.routing_table:
             handler.send_rip_update(args.host, args.port, args.routing_table)
         else:
@@ -0,0 +1,109 @@
+import asyncio
+import concurrent.futures
+import socket
+from typing import Optional, Tuple
+
+from security.ssl_handler import SSLConnectionHandler
+
+# Seconds a peer gets to complete the TLS handshake before its connection is dropped
+DEFAULT_HANDSHAKE_TIMEOUT = 10.0
+
+
+async def start_tls_server(client_connected_cb, host: str, port: int, certfile: str, keyfile: str,
+                           handshake_timeout: float = DEFAULT_HANDSHAKE_TIMEOUT, backlog: int = 1024,
+                           **kwargs) -> asyncio.AbstractServer:
+    """
+    Start an asyncio TLS server whose handshakes never block the event loop.
+
+    Each handshake is driven by the loop as bytes arrive, so a slow or silent
+    peer only costs its own connection, which is aborted after
+    ``handshake_timeout`` seconds. ``client_connected_cb(reader, writer)`` runs
+    once a peer's handshake has completed. The server context comes from
+    SSLConnectionHandler.get_ssl_context, so it is shared and clients can resume.
+    """
+    context = SSLConnectionHandler.get_ssl_context(True, certfile, keyfile)
+    return await asyncio.start_server(client_connected_cb, host, port, ssl=context,
+                                      ssl_handshake_timeout=handshake_timeout, backlog=backlog, **kwargs)
+
+
+async def open_tls_connection(host: str, port: int, cafile: str = None, server_hostname: str = None,
+                              handshake_timeout: float = DEFAULT_HANDSHAKE_TIMEOUT,
+                              connect_timeout: Optional[float] = None,
+                              **kwargs) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """Connect to a TLS server without blocking the event loop; the server is verified against ``cafile``."""
+    context = SSLConnectionHandler.get_ssl_context(False, cafile=cafile)
+    return await asyncio.wait_for(
+        asyncio.open_connection(host, port, ssl=context, server_hostname=server_hostname or host,
+                                ssl_handshake_timeout=handshake_timeout, **kwargs),
+        connect_timeout
+    )
+
+
+class StreamSocket:
+    """
+    Blocking socket interface over an asyncio stream, for code written against sockets.
+
+    Methods must be called from a thread other than the event loop's, e.g. a
+    handler run with loop.run_in_executor; each call waits for the loop to
+    carry it out.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 loop: asyncio.AbstractEventLoop):
+        self._reader = reader
+        self._writer = writer
+        self._loop = loop
+        self._timeout: Optional[float] = None
+
+    def _call(self, coroutine):
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            return future.result(self._timeout)
+        except concurrent.futures.TimeoutError:
+            # Only an alias of the builtin TimeoutError from Python 3.11 on
+            future.cancel()
+            raise socket.timeout("timed out") from None
+
+    def settimeout(self, timeout: Optional[float]):
+        self._timeout = timeout
+
+    def gettimeout(self) -> Optional[float]:
+        return self._timeout
+
+    def getpeername(self):
+        return self._writer.get_extra_info("peername")
+
+    def recv(self, bufsize: int) -> bytes:
+        return self._call(self._reader.read(bufsize))
+
+    def recv_into(self, buffer, nbytes: int = 0) -> int:
+        view = memoryview(buffer).cast("B")
+        data = self.recv(nbytes or len(view))
+        view[:len(data)] = data
+        return len(data)
+
+    async def _send(self, data: bytes):
+        self._writer.write(data)
+        await self._writer.drain()
+
+    def send(self, data: bytes) -> int:
+        self._call(self._send(bytes(data)))
+        return len(data)
+
+    def sendall(self, data: bytes):
+        self._call(self._send(bytes(data)))
+
+    async def _close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+    def close(self):
+        if not self._writer.is_closing():
+            try:
+                self._call(self._close())
+            except socket.timeout:
+                # The peer never answered the TLS close; drop the connection instead of waiting on it
+                self._loop.call_soon_threadsafe(self._writer.transport.abort)
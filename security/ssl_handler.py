@@ -1,13 +1,26 @@
+import os
 import ssl
 import socket
-from typing import Tuple
+import threading
+from typing import Dict, Optional, Tuple
 
 
 class SSLConnectionHandler:
+    # Contexts by (is_server, certfile, keyfile, cafile), with the file stamps they were loaded from.
+    # A server context also holds the session cache and ticket keys, so reusing it is what lets
+    # clients resume.
+    _contexts: Dict[tuple, Tuple[ssl.SSLContext, tuple]] = {}
+    # Client sessions by (host, port, server_hostname), with the context that made them; a
+    # session is only offered again through that same context
+    _sessions: Dict[tuple, Tuple[ssl.SSLSession, ssl.SSLContext]] = {}
+    _lock = threading.Lock()
+
     @staticmethod
-    def create_ssl_context(is_server: bool = False, certfile: str = None, keyfile: str = None):
+    def create_ssl_context(is_server: bool = False, certfile: str = None, keyfile: str = None,
+                           cafile: str = None):
         context = ssl.create_default_context(
-            ssl.Purpose.CLIENT_AUTH if is_server else ssl.Purpose.SERVER_AUTH
+            ssl.Purpose.CLIENT_AUTH if is_server else ssl.Purpose.SERVER_AUTH,
+            cafile=cafile
         )
 
         if is_server and certfile and keyfile:
@@ -16,20 +29,96 @@ class SSLConnectionHandler:
         return context
 
     @staticmethod
-    def wrap_socket(sock: socket.socket, context: ssl.SSLContext, server_side: bool = False) -> ssl.SSLSocket:
+    def _file_stamp(*paths: Optional[str]) -> tuple:
+        stamp = []
+        for path in paths:
+            if path:
+                status = os.stat(path)
+                stamp.append((status.st_mtime_ns, status.st_size))
+        return tuple(stamp)
+
+    @classmethod
+    def get_ssl_context(cls, is_server: bool = False, certfile: str = None, keyfile: str = None,
+                        cafile: str = None) -> ssl.SSLContext:
+        """Return the shared context for these files, loading it again if any of them changed."""
+        key = (is_server, certfile, keyfile, cafile)
+        stamp = cls._file_stamp(certfile, keyfile, cafile)
+        cached = cls._contexts.get(key)
+        if cached is not None and cached[1] == stamp:
+            return cached[0]
+
+        with cls._lock:
+            cached = cls._contexts.get(key)
+            if cached is None or cached[1] != stamp:
+                if cached is not None:
+                    # Sessions from the replaced context cannot be resumed through the new one
+                    stale = cached[0]
+                    for session_key in [k for k, (_, context) in cls._sessions.items() if context is stale]:
+                        del cls._sessions[session_key]
+                cached = (cls.create_ssl_context(is_server, certfile, keyfile, cafile), stamp)
+                cls._contexts[key] = cached
+            return cached[0]
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._lock:
+            cls._contexts.clear()
+            cls._sessions.clear()
+
+    @staticmethod
+    def wrap_socket(sock: socket.socket, context: ssl.SSLContext, server_side: bool = False,
+                    server_hostname: str = None, session: ssl.SSLSession = None) -> ssl.SSLSocket:
         return context.wrap_socket(
             sock,
             server_side=server_side,
-            do_handshake_on_connect=True
+            do_handshake_on_connect=True,
+            server_hostname=server_hostname,
+            session=session
         )
 
     @staticmethod
-    def create_secure_socket(host: str, port: int, is_server: bool = False) -> Tuple[socket.socket, ssl.SSLContext]:
-        context = SSLConnectionHandler.create_ssl_context(is_server)
+    def create_secure_socket(host: str, port: int, is_server: bool = False, certfile: str = None,
+                             keyfile: str = None, cafile: str = None) -> Tuple[socket.socket, ssl.SSLContext]:
+        context = SSLConnectionHandler.get_ssl_context(is_server, certfile, keyfile, cafile)
         sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
 
         if is_server:
             sock.bind((host, port))
             sock.listen(5)
 
-        return sock, context
\ No newline at end of file
+        return sock, context
+
+    @classmethod
+    def connect(cls, host: str, port: int, cafile: str = None, server_hostname: str = None,
+                resume: bool = True, timeout: float = None) -> ssl.SSLSocket:
+        """Open a TLS client connection, resuming the last session with this server when possible."""
+        context = cls.get_ssl_context(False, cafile=cafile)
+        server_hostname = server_hostname or host
+        session_key = (host, port, server_hostname)
+        cached = cls._sessions.get(session_key) if resume else None
+        session = cached[0] if cached is not None and cached[1] is context else None
+
+        sock = socket.create_connection((host, port), timeout=timeout)
+        try:
+            secure_sock = cls.wrap_socket(sock, context, server_hostname=server_hostname, session=session)
+        except Exception:
+            sock.close()
+            # A rejected session must not fail every later connection too
+            cls._sessions.pop(session_key, None)
+            raise
+        if resume:
+            cls.remember_session(secure_sock, host, port, server_hostname)
+        return secure_sock
+
+    @classmethod
+    def remember_session(cls, secure_sock: ssl.SSLSocket, host: str, port: int, server_hostname: str = None):
+        """
+        Keep a client connection's session for the next connect().
+
+        TLS 1.3 servers send session tickets after the handshake, so call this
+        again once the connection has read data to keep a resumable session.
+        """
+        session = secure_sock.session
+        if session is not None and session.has_ticket:
+            with cls._lock:
+                cls._sessions[(host, port, server_hostname or host)] = (session, secure_sock.context)
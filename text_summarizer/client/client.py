@@ -1,3 +1,4 @@
+import argparse
 import sys
 import os
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QLabel, 
@@ -18,10 +19,10 @@ class ProcessingThread(QThread):
     error = pyqtSignal(str)
     progress = pyqtSignal(str)
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, cafile=None, server_hostname=None):
         super().__init__()
         self.file_path = file_path
-        self.connection = ClientConnection()
+        self.connection = ClientConnection(cafile=cafile, server_hostname=server_hostname)
         self.transfer = ClientFileTransfer()
 
     def log_progress(self, message):
@@ -126,6 +127,7 @@ class ProcessingThread(QThread):
             self.log_progress("Waiting for server response...")
             response = self.transfer.receive_from_server(self.connection._socket)
             self.log_progress("Received server response")
+            self.log_progress(f"Compression: {self.transfer.stats.summary()}")
             
             # Complete transfer
             self.complete_transfer()
@@ -211,8 +213,10 @@ class DropArea(QFrame):
                     break
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, cafile=None, server_hostname=None):
         super().__init__()
+        self.cafile = cafile
+        self.server_hostname = server_hostname
         self.setWindowTitle("Document Processor")
         self.setMinimumWidth(800)
         self.setMinimumHeight(600)
@@ -305,7 +309,7 @@ class MainWindow(QMainWindow):
         self.progress_bar.setFormat("Starting process...")
         self.progress_bar.setValue(0)
         
-        self.thread = ProcessingThread(self.current_file)
+        self.thread = ProcessingThread(self.current_file, self.cafile, self.server_hostname)
         self.thread.progress.connect(self.update_progress)
         self.thread.finished.connect(self.handle_result)
         self.thread.error.connect(self.handle_error)
@@ -344,7 +348,12 @@ class MainWindow(QMainWindow):
         """)
 
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    parser = argparse.ArgumentParser(description="Document summarization client")
+    parser.add_argument("--cafile", help="CA certificate (PEM) to verify a TLS server started with --certfile")
+    parser.add_argument("--server-hostname", help="Name the server certificate is checked against (default: host)")
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    window = MainWindow(args.cafile, args.server_hostname)
     window.show()
     sys.exit(app.exec_())   
\ No newline at end of file
@@ -1,11 +1,20 @@
 # client/connection.py
+import os
 import socket
+import sys
 from utils import format_error
 
+# The TLS helpers live in the repository's security package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from security.ssl_handler import SSLConnectionHandler
+
 class ClientConnection:
-    def __init__(self, host='127.0.0.1', port=65432):
+    def __init__(self, host='127.0.0.1', port=65432, cafile=None, server_hostname=None):
         self.host = host
         self.port = port
+        # With a CA file the connection is TLS, for a server started with --certfile
+        self.cafile = cafile
+        self.server_hostname = server_hostname
         self._socket = None
 
     def create_socket(self, timeout=30):
@@ -18,9 +27,17 @@ class ClientConnection:
             raise Exception(f"Failed to create client socket: {format_error(e)}")
 
     def connect_to_server(self):
-        """Connect to server"""
+        """Connect to server, over TLS when a CA file was given"""
         try:
-            self._socket.connect((self.host, self.port))
+            if self.cafile:
+                # SSLConnectionHandler opens its own socket so it can resume the last session
+                plain_socket = self._socket
+                self._socket = SSLConnectionHandler.connect(self.host, self.port, cafile=self.cafile,
+                                                            server_hostname=self.server_hostname,
+                                                            timeout=plain_socket.gettimeout())
+                plain_socket.close()
+            else:
+                self._socket.connect((self.host, self.port))
         except ConnectionRefusedError:
             raise Exception("Server is not running or connection was refused")
         except Exception as e:
@@ -29,5 +46,8 @@ class ClientConnection:
     def close(self):
         """Close client socket"""
         if self._socket:
+            if self.cafile and hasattr(self._socket, "session"):
+                # TLS 1.3 tickets arrive after the handshake; keep the latest for the next connection
+                SSLConnectionHandler.remember_session(self._socket, self.host, self.port, self.server_hostname)
             self._socket.close()
-            self._socket = None
\ No newline at end of file
+            self._socket = None
@@ -1,23 +1,73 @@
 # client/file_transfer.py
 from typing import BinaryIO, Any
 import json
+import struct
+import time
+import weakref
+import os
+import sys
 from utils import serialize_client_data, deserialize_client_data
 
+# Payload codecs are shared with the server side from text_summarizer/payload_codecs.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from payload_codecs import available_codecs, compress_data, decompress_data, CompressionStats
+
+# Windowed transfers: the receiver acknowledges the total payload bytes received so far
+WINDOW_ACK = struct.Struct("!Q")
+
 class ClientFileTransfer:
-    def __init__(self, chunk_size: int = 8192):
+    def __init__(self, chunk_size: int = 8192, window_size: int = 256 * 1024, ack_interval: int = 64 * 1024,
+                 codecs: list = None, compress_threshold: int = 1024):
         self.chunk_size = chunk_size
+        # Sliding window offered to the server in the HELLO header: up to window_size
+        # unacknowledged bytes in flight, acknowledged every ack_interval bytes. Servers
+        # that do not answer the offer in READY stay on per-chunk stop-and-wait, as does
+        # a window_size of 0.
+        self.window_size = window_size
+        self.ack_interval = ack_interval
+        # Per server socket: False for stop-and-wait, or the agreed {"window", "ack_every"}
+        self._flows = weakref.WeakKeyDictionary()
+        # Payload codecs offered in the HELLO header, most preferred first; the server picks
+        # one in READY. Payloads under compress_threshold bytes are always sent as they are.
+        self.codecs = available_codecs() if codecs is None else list(codecs)
+        self.compress_threshold = compress_threshold
+        # Per server socket: the agreed codec, or None
+        self._codecs = weakref.WeakKeyDictionary()
+        self.stats = CompressionStats()
+
+    @staticmethod
+    def _recv_exact(server_socket: Any, count: int) -> bytes:
+        data = b""
+        while len(data) < count:
+            chunk = server_socket.recv(count - len(data))
+            if not chunk:
+                raise Exception("Server connection closed prematurely")
+            data += chunk
+        return data
 
     def send_to_server(self, server_socket: Any, data: Any) -> None:
         """Send data to server using chunked protocol"""
         try:
-            serialized_data = serialize_client_data(data)
+            serialized_data, codec = self._compress(serialize_client_data(data), self._codecs.get(server_socket))
             total_length = len(serialized_data)
-            
-            # Send length header
-            length_info = serialize_client_data({"length": total_length})
+            flow = self._flows.get(server_socket)
+
+            # Send length header, offering a window and codecs until the server has answered
+            header = {"length": total_length}
+            if codec:
+                header["codec"] = codec
+            if flow is None and self.window_size:
+                header["window"] = {"window": self.window_size, "ack_every": self.ack_interval}
+            if flow is None and self.codecs:
+                header["compression"] = self.codecs
+            length_info = serialize_client_data(header)
             server_socket.send(f"{len(length_info):<10}".encode('utf-8'))
             server_socket.send(length_info)
-            
+
+            if flow:
+                self._send_windowed(server_socket, serialized_data, flow)
+                return
+
             # Send data chunks
             for i in range(0, total_length, self.chunk_size):
                 chunk = serialized_data[i:i + self.chunk_size]
@@ -28,23 +78,97 @@ class ClientFileTransfer:
         except Exception as e:
             raise Exception(f"Client send error: {str(e)}")
 
+    def _compress(self, serialized_data: bytes, codec: str) -> tuple:
+        """Compress a payload of at least compress_threshold bytes with the agreed codec, if that makes it smaller"""
+        if not codec:
+            return serialized_data, None
+        if len(serialized_data) < self.compress_threshold:
+            self.stats.record_skipped()
+            return serialized_data, None
+        start = time.thread_time()
+        compressed = compress_data(serialized_data, codec)
+        elapsed = time.thread_time() - start
+        if len(compressed) >= len(serialized_data):
+            self.stats.record_compressed(len(serialized_data), len(serialized_data), elapsed)
+            return serialized_data, None
+        self.stats.record_compressed(len(serialized_data), len(compressed), elapsed)
+        return compressed, codec
+
+    def _decompress(self, received_data: bytearray, codec: str) -> bytes:
+        start = time.thread_time()
+        data = decompress_data(received_data, codec)
+        self.stats.record_decompressed(len(received_data), len(data), time.thread_time() - start)
+        return data
+
+    def _send_windowed(self, server_socket: Any, serialized_data: bytes, flow: dict) -> None:
+        """Stream chunks while fewer than window bytes are unacknowledged, then wait for the final ack"""
+        total_length = len(serialized_data)
+        view = memoryview(serialized_data)
+        sent = acked = 0
+        while sent < total_length:
+            # Fill the window exactly, shortening the last chunk if need be: the receiver only
+            # acknowledges every ack_every bytes, so stopping short of a full window could stall
+            room = flow["window"] - (sent - acked)
+            if room <= 0:
+                acked = self._read_ack(server_socket, acked, total_length)
+                continue
+            end = min(sent + self.chunk_size, sent + room, total_length)
+            server_socket.sendall(view[sent:end])
+            sent = end
+        while acked < total_length:
+            acked = self._read_ack(server_socket, acked, total_length)
+
+    def _read_ack(self, server_socket: Any, acked: int, total_length: int) -> int:
+        (received,) = WINDOW_ACK.unpack(self._recv_exact(server_socket, WINDOW_ACK.size))
+        if not acked < received <= total_length:
+            raise Exception("Server acknowledgment error")
+        return received
+
     def receive_from_server(self, server_socket: Any) -> Any:
         """Receive data from server using chunked protocol"""
         try:
             # Get length header
-            length_header = server_socket.recv(10).decode('utf-8').strip()
-            length_info = server_socket.recv(int(length_header)).decode('utf-8')
-            total_length = json.loads(length_info)["length"]
-            
-            # Receive data chunks
-            received_data = b""
-            while len(received_data) < total_length:
-                chunk = server_socket.recv(min(self.chunk_size, total_length - len(received_data)))
-                if not chunk:
-                    raise Exception("Server connection closed prematurely")
-                received_data += chunk
-                server_socket.send(b'ok')
-            
+            length_header = self._recv_exact(server_socket, 10).decode('utf-8').strip()
+            length_info = json.loads(self._recv_exact(server_socket, int(length_header)).decode('utf-8'))
+            total_length = length_info["length"]
+
+            flow = self._flows.get(server_socket)
+            received_data = self._receive_payload(server_socket, total_length, flow)
+
+            if flow is None:
+                # The first reply (READY) carries the server's answer to our offer, if it understood it
+                accepted = length_info.get("window")
+                self._flows[server_socket] = {"window": int(accepted["window"]),
+                                              "ack_every": int(accepted["ack_every"])} if accepted else False
+                codec = length_info.get("compression")
+                self._codecs[server_socket] = codec if codec in self.codecs else None
+            if "codec" in length_info:
+                received_data = self._decompress(received_data, length_info["codec"])
+            # Decode straight from the receive buffer
             return deserialize_client_data(received_data)
         except Exception as e:
-            raise Exception(f"Client receive error: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Client receive error: {str(e)}")
+
+    def _receive_payload(self, server_socket: Any, total_length: int, flow) -> bytearray:
+        """Receive a payload into one buffer sized from the length header, acknowledging per flow"""
+        received_data = bytearray(total_length)
+        view = memoryview(received_data)
+        received = acked = 0
+        while received < total_length:
+            if flow:
+                count = server_socket.recv_into(view[received:])
+            else:
+                # Stop-and-wait: the server sends one chunk and waits for our ok
+                count = server_socket.recv_into(view[received:], min(self.chunk_size, total_length - received))
+            if not count:
+                raise Exception("Server connection closed prematurely")
+            received += count
+            if not flow:
+                # Send acknowledgment for the received chunk
+                server_socket.send(b'ok')
+            elif received - acked >= flow["ack_every"] or received == total_length:
+                # Cumulative acknowledgment, every ack_every bytes and at the end
+                acked = received
+                server_socket.sendall(WINDOW_ACK.pack(acked))
+        view.release()
+        return received_data
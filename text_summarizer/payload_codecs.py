@@ -0,0 +1,111 @@
+# payload_codecs.py
+# Payload codecs and compression stats shared by the client and server file transfers
+import threading
+import zlib
+
+# Optional payload codecs, negotiated in the handshake only when installed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+# Fastest zlib level: about 3x quicker than the default for a slightly lower ratio on text
+ZLIB_LEVEL = 1
+
+def available_codecs() -> list:
+    """Payload codecs installed on this side, most preferred first"""
+    codecs = []
+    if zstandard is not None:
+        codecs.append("zstd")
+    if lz4 is not None:
+        codecs.append("lz4")
+    codecs.append("zlib")
+    return codecs
+
+def compress_data(data: bytes, codec: str) -> bytes:
+    """Compress a serialized payload with a negotiated codec"""
+    if codec == "zlib":
+        return zlib.compress(data, ZLIB_LEVEL)
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor().compress(data)
+    if codec == "lz4" and lz4 is not None:
+        return lz4.frame.compress(data)
+    raise ValueError(f"Unsupported codec: {codec}")
+
+def decompress_data(data: bytes, codec: str) -> bytes:
+    """Decompress a payload received from the peer"""
+    if codec == "zlib":
+        return zlib.decompress(data)
+    if codec == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "lz4" and lz4 is not None:
+        return lz4.frame.decompress(data)
+    raise ValueError(f"Unsupported codec: {codec}")
+
+class CompressionStats:
+    """Running totals of payload compression: bytes before and after, and CPU seconds spent"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.compressed_messages = 0
+        self.skipped_messages = 0
+        self.sent_raw_bytes = 0
+        self.sent_wire_bytes = 0
+        self.compress_seconds = 0.0
+        self.decompressed_messages = 0
+        self.received_raw_bytes = 0
+        self.received_wire_bytes = 0
+        self.decompress_seconds = 0.0
+
+    def record_compressed(self, raw_bytes: int, wire_bytes: int, seconds: float) -> None:
+        """Count a payload that went through the codec; wire_bytes equals raw_bytes if it was sent as is"""
+        with self._lock:
+            self.compressed_messages += 1
+            self.sent_raw_bytes += raw_bytes
+            self.sent_wire_bytes += wire_bytes
+            self.compress_seconds += seconds
+
+    def record_skipped(self) -> None:
+        """Count a payload below the compression threshold"""
+        with self._lock:
+            self.skipped_messages += 1
+
+    def record_decompressed(self, wire_bytes: int, raw_bytes: int, seconds: float) -> None:
+        """Count a compressed payload received from the peer"""
+        with self._lock:
+            self.decompressed_messages += 1
+            self.received_wire_bytes += wire_bytes
+            self.received_raw_bytes += raw_bytes
+            self.decompress_seconds += seconds
+
+    def snapshot(self) -> dict:
+        """Totals with the compression ratio and the CPU time spent per megabyte saved"""
+        with self._lock:
+            raw_bytes = self.sent_raw_bytes + self.received_raw_bytes
+            wire_bytes = self.sent_wire_bytes + self.received_wire_bytes
+            cpu_seconds = self.compress_seconds + self.decompress_seconds
+            return {
+                "compressed_messages": self.compressed_messages,
+                "skipped_messages": self.skipped_messages,
+                "decompressed_messages": self.decompressed_messages,
+                "raw_bytes": raw_bytes,
+                "wire_bytes": wire_bytes,
+                "ratio": raw_bytes / wire_bytes if wire_bytes else 1.0,
+                "bytes_saved": raw_bytes - wire_bytes,
+                "compress_seconds": self.compress_seconds,
+                "decompress_seconds": self.decompress_seconds,
+                "cpu_ms_per_mb_saved": cpu_seconds * 1e3 / ((raw_bytes - wire_bytes) / 1e6)
+                if raw_bytes > wire_bytes else None,
+            }
+
+    def summary(self) -> str:
+        """One-line report for logs"""
+        stats = self.snapshot()
+        cost = stats["cpu_ms_per_mb_saved"]
+        return (f"ratio {stats['ratio']:.2f}x, {stats['bytes_saved']} bytes saved, "
+                f"{(stats['compress_seconds'] + stats['decompress_seconds']) * 1e3:.1f} ms CPU"
+                + (f" ({cost:.1f} ms per MB saved)" if cost is not None else ""))
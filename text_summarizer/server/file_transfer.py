@@ -1,54 +1,195 @@
 # file_transfer.py
 from typing import BinaryIO, Any
 import json
+import struct
+import time
+import weakref
+import os
+import sys
 from utils import serialize_server_data, deserialize_server_data
 
+# Payload codecs are shared with the client side from text_summarizer/payload_codecs.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from payload_codecs import available_codecs, compress_data, decompress_data, CompressionStats
+
+# Windowed transfers: the receiver acknowledges the total payload bytes received so far
+WINDOW_ACK = struct.Struct("!Q")
+
 # file_transfer.py
 class ServerFileTransfer:
-    def __init__(self, chunk_size: int = 8192):
+    def __init__(self, chunk_size: int = 8192, window_size: int = 256 * 1024, ack_interval: int = 64 * 1024,
+                 codecs: list = None, compress_threshold: int = 1024):
         self.chunk_size = chunk_size
+        # Sliding window offered by clients in their HELLO header and accepted in READY: up to
+        # window_size unacknowledged bytes in flight, acknowledged every ack_interval bytes.
+        # A window_size of 0 keeps every client on per-chunk stop-and-wait.
+        self.window_size = window_size
+        self.ack_interval = ack_interval
+        # Per client socket: False for stop-and-wait, or the agreed {"window", "ack_every"}
+        self._flows = weakref.WeakKeyDictionary()
+        # Terms accepted from a client's offer, announced in the header of the next reply
+        self._offers = weakref.WeakKeyDictionary()
+        # Payload codecs this server accepts; the first of a client's offered codecs found here
+        # is answered in READY. Payloads under compress_threshold bytes are always sent as they are.
+        self.codecs = available_codecs() if codecs is None else list(codecs)
+        self.compress_threshold = compress_threshold
+        # Per client socket: the agreed codec; _codec_offers holds it until READY has been sent
+        self._codecs = weakref.WeakKeyDictionary()
+        self._codec_offers = weakref.WeakKeyDictionary()
+        self.stats = CompressionStats()
+
+    def _accept_offer(self, offer: dict) -> dict:
+        """Agree on the smaller window and acknowledgement interval of both sides"""
+        # At least two chunks in flight, and an acknowledgement due before a full chunk no longer fits
+        window = max(2 * self.chunk_size, min(int(offer["window"]), self.window_size))
+        ack_every = max(1, min(int(offer["ack_every"]), self.ack_interval, window - self.chunk_size))
+        return {"window": window, "ack_every": ack_every}
+
+    @staticmethod
+    def _recv_exact(client_socket: Any, count: int) -> bytes:
+        data = b""
+        while len(data) < count:
+            chunk = client_socket.recv(count - len(data))
+            if not chunk:
+                raise Exception("Client connection closed prematurely")
+            data += chunk
+        return data
 
     def receive_from_client(self, client_socket: Any) -> Any:
         """Receive data from client using chunked protocol"""
         try:
             # Get length header
-            length_header = client_socket.recv(10).decode('utf-8').strip()
-            length_info = client_socket.recv(int(length_header)).decode('utf-8')
-            total_length = json.loads(length_info)["length"]
-            
-            # Receive data chunks
-            received_data = b""
-            while len(received_data) < total_length:
-                chunk = client_socket.recv(min(self.chunk_size, total_length - len(received_data)))
-                if not chunk:
-                    raise Exception("Client connection closed prematurely")
-                received_data += chunk
-                # Send acknowledgment for the received chunk
-                client_socket.send(b'ok')
-                print(f"Acknowledged receipt of chunk: {len(received_data)}/{total_length} bytes")
+            length_header = self._recv_exact(client_socket, 10).decode('utf-8').strip()
+            length_info = json.loads(self._recv_exact(client_socket, int(length_header)).decode('utf-8'))
+            total_length = length_info["length"]
 
+            flow = self._flows.get(client_socket)
+            if flow is None:
+                # First message: answer a window offer in the reply, otherwise stay on stop-and-wait
+                if "window" in length_info and self.window_size:
+                    self._offers[client_socket] = self._accept_offer(length_info["window"])
+                else:
+                    self._flows[client_socket] = False
+                codec = next((codec for codec in length_info.get("compression", []) if codec in self.codecs), None)
+                if codec:
+                    self._codec_offers[client_socket] = codec
+            received_data = self._receive_payload(client_socket, total_length, flow)
+            if "codec" in length_info:
+                received_data = self._decompress(received_data, length_info["codec"])
+            # Decode straight from the receive buffer
             return deserialize_server_data(received_data)
         except Exception as e:
             raise Exception(f"Server receive error: {str(e)}")
 
+    def _receive_payload(self, client_socket: Any, total_length: int, flow) -> bytearray:
+        """Receive a payload into one buffer sized from the length header, acknowledging per flow"""
+        received_data = bytearray(total_length)
+        view = memoryview(received_data)
+        received = acked = 0
+        while received < total_length:
+            if flow:
+                count = client_socket.recv_into(view[received:])
+            else:
+                # Stop-and-wait: the client sends one chunk and waits for our ok
+                count = client_socket.recv_into(view[received:], min(self.chunk_size, total_length - received))
+            if not count:
+                raise Exception("Client connection closed prematurely")
+            received += count
+            if not flow:
+                # Send acknowledgment for the received chunk
+                client_socket.send(b'ok')
+                print(f"Acknowledged receipt of chunk: {received}/{total_length} bytes")
+            elif received - acked >= flow["ack_every"] or received == total_length:
+                # Cumulative acknowledgment, every ack_every bytes and at the end
+                acked = received
+                client_socket.sendall(WINDOW_ACK.pack(acked))
+                print(f"Acknowledged receipt of data: {acked}/{total_length} bytes")
+        view.release()
+        return received_data
 
     def send_to_client(self, client_socket: Any, data: Any) -> None:
         """Send data to client using chunked protocol"""
         try:
-            serialized_data = serialize_server_data(data)
+            serialized_data, codec = self._compress(serialize_server_data(data), self._codecs.get(client_socket))
             total_length = len(serialized_data)
-            
+            flow = self._flows.get(client_socket)
+            accepted = self._offers.pop(client_socket, None)
+            accepted_codec = self._codec_offers.pop(client_socket, None)
+
             # Send length header
-            length_info = serialize_server_data({"length": total_length})
+            header = {"length": total_length}
+            if codec:
+                header["codec"] = codec
+            if accepted is not None:
+                header["window"] = accepted
+            if accepted_codec is not None:
+                header["compression"] = accepted_codec
+            length_info = serialize_server_data(header)
             client_socket.send(f"{len(length_info):<10}".encode('utf-8'))
             client_socket.send(length_info)
-            
-            # Send data chunks
-            for i in range(0, total_length, self.chunk_size):
-                chunk = serialized_data[i:i + self.chunk_size]
-                client_socket.send(chunk)
-                ack = client_socket.recv(2)
-                if ack != b'ok':
-                    raise Exception("Client acknowledgment error")
+
+            if flow:
+                self._send_windowed(client_socket, serialized_data, flow)
+            else:
+                # Send data chunks
+                for i in range(0, total_length, self.chunk_size):
+                    chunk = serialized_data[i:i + self.chunk_size]
+                    client_socket.send(chunk)
+                    ack = client_socket.recv(2)
+                    if ack != b'ok':
+                        raise Exception("Client acknowledgment error")
+
+            if accepted is not None:
+                # The reply announcing the terms went out stop-and-wait; everything after is windowed
+                self._flows[client_socket] = accepted
+            if accepted_codec is not None:
+                # Likewise, compression starts with the message after the one announcing the codec
+                self._codecs[client_socket] = accepted_codec
         except Exception as e:
-            raise Exception(f"Server send error: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Server send error: {str(e)}")
+
+    def _compress(self, serialized_data: bytes, codec: str) -> tuple:
+        """Compress a payload of at least compress_threshold bytes with the agreed codec, if that makes it smaller"""
+        if not codec:
+            return serialized_data, None
+        if len(serialized_data) < self.compress_threshold:
+            self.stats.record_skipped()
+            return serialized_data, None
+        start = time.thread_time()
+        compressed = compress_data(serialized_data, codec)
+        elapsed = time.thread_time() - start
+        if len(compressed) >= len(serialized_data):
+            self.stats.record_compressed(len(serialized_data), len(serialized_data), elapsed)
+            return serialized_data, None
+        self.stats.record_compressed(len(serialized_data), len(compressed), elapsed)
+        return compressed, codec
+
+    def _decompress(self, received_data: bytearray, codec: str) -> bytes:
+        start = time.thread_time()
+        data = decompress_data(received_data, codec)
+        self.stats.record_decompressed(len(received_data), len(data), time.thread_time() - start)
+        return data
+
+    def _send_windowed(self, client_socket: Any, serialized_data: bytes, flow: dict) -> None:
+        """Stream chunks while fewer than window bytes are unacknowledged, then wait for the final ack"""
+        total_length = len(serialized_data)
+        view = memoryview(serialized_data)
+        sent = acked = 0
+        while sent < total_length:
+            # Fill the window exactly, shortening the last chunk if need be: the receiver only
+            # acknowledges every ack_every bytes, so stopping short of a full window could stall
+            room = flow["window"] - (sent - acked)
+            if room <= 0:
+                acked = self._read_ack(client_socket, acked, total_length)
+                continue
+            end = min(sent + self.chunk_size, sent + room, total_length)
+            client_socket.sendall(view[sent:end])
+            sent = end
+        while acked < total_length:
+            acked = self._read_ack(client_socket, acked, total_length)
+
+    def _read_ack(self, client_socket: Any, acked: int, total_length: int) -> int:
+        (received,) = WINDOW_ACK.unpack(self._recv_exact(client_socket, WINDOW_ACK.size))
+        if not acked < received <= total_length:
+            raise Exception("Client acknowledgment error")
+        return received
@@ -1,10 +1,26 @@
 # server.py
+import argparse
+import asyncio
+import os
+import sys
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from connection import ServerConnection
 from file_transfer import ServerFileTransfer
 from utils import create_server_response
 from gemini_handler import GeminiHandler
 
+# The TLS helpers live in the repository's security package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+from security.async_tls import DEFAULT_HANDSHAKE_TIMEOUT, StreamSocket, start_tls_server
+
+# Seconds an asyncio client session may sit idle in one read or write before it is dropped
+DEFAULT_CLIENT_TIMEOUT = 30.0
+# Threads running client sessions for the asyncio server. Connections beyond this still complete
+# their TLS handshake on the loop and wait for a free thread; the client timeout bounds how long
+# an idle or stalled client can hold one.
+DEFAULT_WORKERS = 256
+
 class DocumentServer:
     def __init__(self, host='127.0.0.1', port=65432):
         self.connection = ServerConnection(host, port)
@@ -52,6 +68,7 @@ class DocumentServer:
                     raise Exception("Invalid transfer completion message")
                 self.transfer.send_to_client(client_socket, "TRANSFER ACKNOWLEDGED")
                 print(f"Transfer completion acknowledged for client {address}")
+                print(f"Compression so far: {self.transfer.stats.summary()}")
                 
             except Exception as e:
                 print(f"Error handling client {address}: {e}")
@@ -91,10 +108,60 @@ class DocumentServer:
         finally:
             self.connection.close()
 
+    async def serve_async(self, certfile=None, keyfile=None, handshake_timeout=DEFAULT_HANDSHAKE_TIMEOUT,
+                          workers=DEFAULT_WORKERS, client_timeout=DEFAULT_CLIENT_TIMEOUT):
+        """Accept clients on an asyncio loop, over TLS when given a certificate; handshakes never block it"""
+        loop = asyncio.get_running_loop()
+        # handle_client is blocking socket code; it runs on these threads against the client's stream
+        executor = ThreadPoolExecutor(max_workers=workers)
+
+        async def on_client(reader, writer):
+            address = writer.get_extra_info("peername")
+            client_socket = StreamSocket(reader, writer, loop)
+            # Like the client's socket timeout: a silent peer gives its thread back instead of holding it
+            client_socket.settimeout(client_timeout)
+            await loop.run_in_executor(executor, self.handle_client, client_socket, address)
+
+        host, port = self.connection.host, self.connection.port
+        if certfile and keyfile:
+            server = await start_tls_server(on_client, host, port, certfile, keyfile,
+                                            handshake_timeout=handshake_timeout)
+        else:
+            server = await asyncio.start_server(on_client, host, port, backlog=1024)
+        print(f"Server started successfully on {host}:{port} ({'TLS' if certfile else 'plain'}, asyncio)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            executor.shutdown(wait=False)
+
+    def start_async(self, certfile=None, keyfile=None, handshake_timeout=DEFAULT_HANDSHAKE_TIMEOUT,
+                    workers=DEFAULT_WORKERS, client_timeout=DEFAULT_CLIENT_TIMEOUT):
+        try:
+            asyncio.run(self.serve_async(certfile, keyfile, handshake_timeout, workers, client_timeout))
+        except KeyboardInterrupt:
+            print("\nReceived shutdown signal. Shutting down server...")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Document summarization server")
+    parser.add_argument("--asyncio", action="store_true", help="Accept clients on an asyncio event loop")
+    parser.add_argument("--certfile", help="Server certificate (PEM); serves TLS with --keyfile")
+    parser.add_argument("--keyfile", help="Server private key (PEM)")
+    parser.add_argument("--handshake-timeout", type=float, default=DEFAULT_HANDSHAKE_TIMEOUT,
+                        help="Seconds a client gets to complete the TLS handshake")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Client sessions handled at once in asyncio mode; later clients wait for a thread")
+    parser.add_argument("--client-timeout", type=float, default=DEFAULT_CLIENT_TIMEOUT,
+                        help="Seconds an asyncio client may stay silent before it is dropped")
+    args = parser.parse_args()
+
     try:
         server = DocumentServer()
         print("Starting document server...")
-        server.start()
+        if args.asyncio or args.certfile:
+            server.start_async(args.certfile, args.keyfile, args.handshake_timeout, args.workers,
+                               args.client_timeout)
+        else:
+            server.start()
     except Exception as e:
         print(f"Failed to start server: {e}")
\ No newline at end of file